@@ -0,0 +1,30 @@
+"""Add composite index on outages latitude/longitude
+
+Revision ID: 5d8e0b7c4a21
+Revises: c3f1a9e2d5b7
+Create Date: 2026-10-19 11:24:03.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8e0b7c4a21'
+down_revision: Union[str, Sequence[str], None] = 'c3f1a9e2d5b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    indexes = {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes('outages')}
+    if 'ix_outages_lat_lon' not in indexes:
+        op.create_index('ix_outages_lat_lon', 'outages', ['latitude', 'longitude'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outages_lat_lon', table_name='outages')
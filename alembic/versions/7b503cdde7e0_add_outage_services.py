@@ -0,0 +1,52 @@
+"""Add outage_services association table
+
+Revision ID: 7b503cdde7e0
+Revises: 4460b6562ead
+Create Date: 2026-10-19 09:12:40.114502
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b503cdde7e0'
+down_revision: Union[str, Sequence[str], None] = '4460b6562ead'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # init_db() may already have created the table via create_all()
+    if not sa.inspect(bind).has_table('outage_services'):
+        op.create_table('outage_services',
+        sa.Column('outage_id', sa.Integer(), nullable=False),
+        sa.Column('service', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['outage_id'], ['outages.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('outage_id', 'service')
+        )
+        op.create_index(op.f('ix_outage_services_service'), 'outage_services', ['service'], unique=False)
+
+    # Backfill from the JSON column
+    outages = sa.table('outages', sa.column('id', sa.Integer), sa.column('affected_services', sa.JSON))
+    outage_services = sa.table('outage_services', sa.column('outage_id', sa.Integer), sa.column('service', sa.String))
+    if bind.execute(sa.select(outage_services.c.outage_id).limit(1)).first() is not None:
+        return
+    rows = []
+    for outage_id, services in bind.execute(sa.select(outages.c.id, outages.c.affected_services)):
+        rows.extend(
+            {'outage_id': outage_id, 'service': s}
+            for s in {str(svc).lower() for svc in (services or [])}
+        )
+    if rows:
+        op.bulk_insert(outage_services, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_outage_services_service'), table_name='outage_services')
+    op.drop_table('outage_services')
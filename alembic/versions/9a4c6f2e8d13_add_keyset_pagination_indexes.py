@@ -0,0 +1,55 @@
+"""Add keyset pagination indexes and backfill outages.updated_at
+
+Revision ID: 9a4c6f2e8d13
+Revises: 5d8e0b7c4a21
+Create Date: 2026-10-19 13:40:51.276339
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c6f2e8d13'
+down_revision: Union[str, Sequence[str], None] = '5d8e0b7c4a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows inserted before updated_at had a server default were left NULL,
+    # which would drop them out of (updated_at, id) keyset pages.
+    op.execute(
+        "UPDATE outages SET updated_at = COALESCE(created_at, start_time, CURRENT_TIMESTAMP) "
+        "WHERE updated_at IS NULL"
+    )
+    if op.get_bind().dialect.name == 'sqlite':
+        # SQLite keeps DateTime as text: rewrite CURRENT_TIMESTAMP-style values
+        # ('YYYY-MM-DD HH:MM:SS') into SQLAlchemy's format so cursor comparisons
+        # against bound datetimes order correctly.
+        for table, column in (('outages', 'updated_at'), ('user_reports', 'created_at')):
+            op.execute(
+                f"UPDATE {table} SET {column} = strftime('%Y-%m-%d %H:%M:%f', {column}) || '000' "
+                f"WHERE length({column}) = 19"
+            )
+    with op.batch_alter_table('outages') as batch_op:
+        batch_op.alter_column('updated_at', server_default=sa.text('(CURRENT_TIMESTAMP)'),
+                              existing_type=sa.DateTime(timezone=True))
+
+    inspector = sa.inspect(op.get_bind())
+    if 'ix_outages_updated_at_id' not in {ix['name'] for ix in inspector.get_indexes('outages')}:
+        op.create_index('ix_outages_updated_at_id', 'outages', ['updated_at', 'id'], unique=False)
+    if 'ix_user_reports_created_at_id' not in {ix['name'] for ix in inspector.get_indexes('user_reports')}:
+        op.create_index('ix_user_reports_created_at_id', 'user_reports', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_reports_created_at_id', table_name='user_reports')
+    op.drop_index('ix_outages_updated_at_id', table_name='outages')
+    with op.batch_alter_table('outages') as batch_op:
+        batch_op.alter_column('updated_at', server_default=None,
+                              existing_type=sa.DateTime(timezone=True))
@@ -0,0 +1,137 @@
+"""Partition outages by start_time and raw_data by scraped_at (PostgreSQL)
+
+Revision ID: a7d3e5f9c214
+Revises: f4a2c8e61b93
+Create Date: 2026-10-19 21:12:45.903118
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from scrapers.db.partitions import (
+    PARTITION_KEYS, PARTITION_MONTHS_AHEAD, create_partition, default_partition_name,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e5f9c214'
+down_revision: Union[str, Sequence[str], None] = 'f4a2c8e61b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables whose foreign keys point at a table that gets partitioned; a foreign key
+# to a partitioned table would have to include its partition key
+REFERENCING_TABLES = {
+    'raw_data': ('outages',),
+    'outages': ('outage_services', 'outage_events'),
+}
+# Rows without a partition key get the closest timestamp we have
+BACKFILL = {
+    'outages': "COALESCE(created_at, updated_at, CURRENT_TIMESTAMP)",
+    'raw_data': "CURRENT_TIMESTAMP",
+}
+
+
+def _is_partitioned(bind, table) -> bool:
+    return bool(bind.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND c.relnamespace = 'public'::regnamespace"
+    ), {'table': table}).scalar())
+
+
+def _drop_foreign_keys_to(bind, table):
+    inspector = sa.inspect(bind)
+    for child in REFERENCING_TABLES[table]:
+        for fk in inspector.get_foreign_keys(child):
+            if fk['referred_table'] == table and fk['name']:
+                op.drop_constraint(fk['name'], child, type_='foreignkey')
+
+
+def _rebuild(bind, table, old, key, partitioned):
+    """Copy `old` into a new `table` (partitioned or plain), then drop `old`.
+
+    Indexes and foreign keys are read from `old` first and recreated after
+    the copy, under the same names. Unique indexes stay unique; on a
+    partitioned table PostgreSQL requires them to include the partition
+    key, so it is appended where missing.
+    """
+    inspector = sa.inspect(bind)
+    indexes = [ix for ix in inspector.get_indexes(old) if None not in ix['column_names']]
+    foreign_keys = [fk for fk in inspector.get_foreign_keys(old)
+                    if fk['referred_table'] not in PARTITION_KEYS or not partitioned]
+
+    if partitioned:
+        op.execute(f"UPDATE {old} SET {key} = {BACKFILL[table]} WHERE {key} IS NULL")
+        op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE ({key})")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {key} SET NOT NULL")
+    else:
+        op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {key} DROP NOT NULL")
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence(:table, 'id')"), {'table': old}).scalar()
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+
+    if partitioned:
+        op.execute(f"CREATE TABLE {default_partition_name(table)} PARTITION OF {table} DEFAULT")
+        current = datetime.now(timezone.utc)
+        current = current.year * 12 + current.month - 1
+        months = set(bind.execute(sa.text(
+            f"SELECT DISTINCT CAST(EXTRACT(YEAR FROM {key} AT TIME ZONE 'UTC') * 12 "
+            f"+ EXTRACT(MONTH FROM {key} AT TIME ZONE 'UTC') - 1 AS integer) FROM {old}"
+        )).scalars())
+        for month in sorted(months | set(range(current, current + PARTITION_MONTHS_AHEAD + 1))):
+            create_partition(bind, table, month)
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    op.drop_table(old)
+
+    op.create_primary_key(f"{table}_pkey", table, ['id', key] if partitioned else ['id'])
+    for ix in indexes:
+        columns = list(ix['column_names'])
+        if ix['unique'] and partitioned and key not in columns:
+            columns.append(key)
+        op.create_index(ix['name'], table, columns, unique=ix['unique'], **ix.get('dialect_options', {}))
+    for fk in foreign_keys:
+        op.create_foreign_key(fk['name'], table, fk['referred_table'],
+                              fk['constrained_columns'], fk['referred_columns'],
+                              ondelete=fk.get('options', {}).get('ondelete'))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    # raw_data first: outages holds the foreign key to it
+    for table in ('raw_data', 'outages'):
+        if _is_partitioned(bind, table):
+            continue
+        old = f"{table}_unpartitioned"
+        op.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        _drop_foreign_keys_to(bind, table)
+        op.rename_table(table, old)
+        _rebuild(bind, table, old, PARTITION_KEYS[table], partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    for table in ('outages', 'raw_data'):
+        if not _is_partitioned(bind, table):
+            continue
+        old = f"{table}_partitioned"
+        op.rename_table(table, old)
+        _rebuild(bind, table, old, PARTITION_KEYS[table], partitioned=False)
+    # Partition retention drops raw_data months independently of the outages pointing at them
+    op.execute(
+        "UPDATE outages SET raw_data_id = NULL WHERE raw_data_id IS NOT NULL "
+        "AND NOT EXISTS (SELECT 1 FROM raw_data WHERE raw_data.id = outages.raw_data_id)"
+    )
+    op.create_foreign_key('outages_raw_data_id_fkey', 'outages', 'raw_data', ['raw_data_id'], ['id'])
+    for child in REFERENCING_TABLES['outages']:
+        op.create_foreign_key(f"{child}_outage_id_fkey", child, 'outages', ['outage_id'], ['id'], ondelete='CASCADE')
@@ -0,0 +1,57 @@
+"""Add outages.dedup_key fingerprint column
+
+Revision ID: c3f1a9e2d5b7
+Revises: 7b503cdde7e0
+Create Date: 2026-10-19 10:02:17.530861
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from scrapers.db.models import outage_dedup_key
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f1a9e2d5b7'
+down_revision: Union[str, Sequence[str], None] = '7b503cdde7e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    columns = {c['name'] for c in sa.inspect(bind).get_columns('outages')}
+    if 'dedup_key' not in columns:
+        op.add_column('outages', sa.Column('dedup_key', sa.String(length=64), nullable=True))
+        op.create_index(op.f('ix_outages_dedup_key'), 'outages', ['dedup_key'], unique=False)
+
+    # Backfill existing rows with the same fingerprint the ORM computes on flush
+    outages = sa.table('outages',
+        sa.column('id', sa.Integer),
+        sa.column('title', sa.JSON),
+        sa.column('description', sa.JSON),
+        sa.column('location', sa.String),
+        sa.column('start_time', sa.DateTime(timezone=True)),
+        sa.column('end_time', sa.DateTime(timezone=True)),
+        sa.column('dedup_key', sa.String),
+    )
+    rows = bind.execute(sa.select(
+        outages.c.id, outages.c.title, outages.c.description,
+        outages.c.location, outages.c.start_time, outages.c.end_time,
+    ).where(outages.c.dedup_key.is_(None))).all()
+    for row in rows:
+        bind.execute(
+            outages.update().where(outages.c.id == row.id).values(
+                dedup_key=outage_dedup_key(row.title, row.description, row.location,
+                                           row.start_time, row.end_time)
+            )
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_outages_dedup_key'), table_name='outages')
+    op.drop_column('outages', 'dedup_key')
@@ -0,0 +1,61 @@
+"""Add outage_events transition log
+
+Revision ID: e1b7d94c2f60
+Revises: 9a4c6f2e8d13
+Create Date: 2026-10-19 15:02:17.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b7d94c2f60'
+down_revision: Union[str, Sequence[str], None] = '9a4c6f2e8d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # init_db() may already have created the table via create_all()
+    if not sa.inspect(bind).has_table('outage_events'):
+        op.create_table('outage_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('outage_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column('old_status', sa.String(), nullable=True),
+        sa.Column('new_status', sa.String(), nullable=True),
+        sa.Column('old_eta', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('new_eta', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['outage_id'], ['outages.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_outage_events_outage_id'), 'outage_events', ['outage_id'], unique=False)
+        op.create_index('ix_outage_events_occurred_at_id', 'outage_events', ['occurred_at', 'id'], unique=False)
+
+    # Seed history for existing outages: creation at start, resolution at end
+    events = sa.table('outage_events', sa.column('id', sa.Integer))
+    if bind.execute(sa.select(events.c.id).limit(1)).first() is not None:
+        return
+    op.execute(
+        "INSERT INTO outage_events (outage_id, event_type, new_status, new_eta, occurred_at) "
+        "SELECT id, 'created', CASE WHEN status = 'resolved' THEN 'active' ELSE status END, "
+        "estimated_fix_time, COALESCE(start_time, created_at, CURRENT_TIMESTAMP) FROM outages"
+    )
+    op.execute(
+        "INSERT INTO outage_events (outage_id, event_type, old_status, new_status, old_eta, new_eta, occurred_at) "
+        "SELECT id, 'resolved', 'active', 'resolved', estimated_fix_time, estimated_fix_time, "
+        "COALESCE(end_time, created_at, CURRENT_TIMESTAMP) FROM outages WHERE status = 'resolved'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outage_events_occurred_at_id', table_name='outage_events')
+    op.drop_index(op.f('ix_outage_events_outage_id'), table_name='outage_events')
+    op.drop_table('outage_events')
@@ -0,0 +1,42 @@
+"""Add research_snapshots table
+
+Revision ID: f4a2c8e61b93
+Revises: e1b7d94c2f60
+Create Date: 2026-10-19 17:41:08.214377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a2c8e61b93'
+down_revision: Union[str, Sequence[str], None] = 'e1b7d94c2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # init_db() may already have created the table via create_all()
+    if sa.inspect(op.get_bind()).has_table('research_snapshots'):
+        return
+    op.create_table('research_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('view', sa.String(), nullable=False),
+    sa.Column('days', sa.Integer(), nullable=False),
+    sa.Column('variant', sa.String(), nullable=False),
+    sa.Column('generation', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('duration_ms', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('view', 'days', 'variant', name='uq_research_snapshots_view_days_variant')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('research_snapshots')
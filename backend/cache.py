@@ -0,0 +1,133 @@
+"""
+In-memory response cache for read-only analytics and research endpoints.
+
+Entries are keyed by endpoint, normalized query parameters and the current
+data generation (see scrapers.db.generation), so a scraper commit invalidates
+everything at once without explicit purging; stale generations simply age out
+of the LRU. Entries also expire after a TTL, since several endpoints compute
+windows relative to "now". Concurrent misses for the same key are coalesced:
+one request computes, the others wait for its result (single-flight).
+
+Each entry also stores a hash of its serialized body, which doubles as the
+response ETag: a matching If-None-Match on a cache hit is answered with 304.
+"""
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from enum import Enum
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from scrapers.config import settings
+from scrapers.db.generation import current_generation
+from .etag import CACHE_CONTROL, body_etag, etag_matches, not_modified
+
+
+def _normalize(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_normalize(v) for v in value]
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else tuple(items)
+    return value
+
+
+class ResponseCache:
+    """Size-bounded LRU with single-flight computation of misses."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        """Return the value for key, computing it at most once concurrently."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            # Errors are not cached; waiting requests see the same exception.
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            del self._inflight[key]
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries,
+                    "hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+def _with_etag(value):
+    return value, body_etag(value)
+
+
+def cached_response(func):
+    """Cache a sync endpoint's return value per (endpoint, params, generation).
+
+    The endpoint must take its DB session as a keyword argument; every other
+    argument is treated as part of the cache key. The wrapper adds the request
+    and response to the signature FastAPI sees, to handle ETags.
+    """
+    endpoint = f"{func.__module__}.{func.__qualname__}"
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, _etag_request: Request, _etag_response: Response, **kwargs):
+        db = next((v for v in kwargs.values() if isinstance(v, Session)), None)
+        if db is None:
+            return func(*args, **kwargs)
+        params = tuple(sorted(
+            (name, _normalize(value)) for name, value in kwargs.items() if value is not db
+        ))
+        key = (endpoint, params, current_generation(db))
+        value, etag = response_cache.get_or_compute(key, lambda: _with_etag(func(*args, **kwargs)))
+        if etag_matches(_etag_request, etag):
+            return not_modified(etag)
+        _etag_response.headers["ETag"] = etag
+        _etag_response.headers["Cache-Control"] = CACHE_CONTROL
+        return value
+
+    wrapper.__signature__ = signature.replace(parameters=[
+        *signature.parameters.values(),
+        inspect.Parameter("_etag_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        inspect.Parameter("_etag_response", inspect.Parameter.KEYWORD_ONLY, annotation=Response),
+    ])
+    return wrapper
@@ -5,17 +5,10 @@ from jose import jwt, JWTError
 from .auth import SECRET_KEY, ALGORITHM
 from .schemas import TokenData
 from scrapers.db.models import User
-from scrapers.db.connection import SessionLocal
+from scrapers.db.connection import get_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
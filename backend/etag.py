@@ -0,0 +1,60 @@
+"""
+Strong ETags and If-None-Match handling for read endpoints.
+
+- Listings (outages, regions) derive the ETag from the request URL and the
+  database generation marker (the same in every worker and across restarts), so a matching poll is answered with 304 before any query
+  runs (`generation_etag` dependency).
+- Computed results (analytics, research) use a hash of the serialized body,
+  stored next to the cached value by `backend.cache.cached_response`.
+"""
+import hashlib
+import json
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from scrapers.db.connection import get_db
+from scrapers.db.generation import database_generation
+
+# Clients must revalidate on every use, which is what makes a poll cheap.
+CACHE_CONTROL = "no-cache"
+
+
+def _quote(digest: str) -> str:
+    return f'"{digest[:32]}"'
+
+
+def body_etag(value) -> str:
+    """Strong ETag over the JSON form of an endpoint's return value."""
+    payload = json.dumps(jsonable_encoder(value), sort_keys=True, separators=(",", ":"), default=str)
+    return _quote(hashlib.sha256(payload.encode("utf-8")).hexdigest())
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when If-None-Match lists `etag` (weak comparison, as RFC 9110 requires)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def generation_etag(request: Request, response: Response, db: Annotated[Session, Depends(get_db)]):
+    """Router dependency: short-circuit GETs with 304 while the data generation is unchanged."""
+    if request.method != "GET":
+        return
+    query = sorted(request.query_params.multi_items())
+    key = repr((request.url.path, query, database_generation(db)))
+    etag = _quote(hashlib.sha256(key.encode("utf-8")).hexdigest())
+    if etag_matches(request, etag):
+        raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -5,7 +5,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
-from .routers import outages, operators, reports, analytics, auth, regions, admin, research_analytics
+from .routers import outages, operators, reports, analytics, auth, regions, admin, research_analytics, stream, export
 from .middleware import LoggingMiddleware, SecurityHeadersMiddleware
 from contextlib import asynccontextmanager
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -20,6 +20,7 @@ from scrapers.config import settings
 from scrapers.db.connection import SessionLocal
 from scrapers.db.models import User
 from .auth import get_password_hash
+from .utils.stats_pool import StatsPoolError, stats_pool
 
 logger = logging.getLogger(__name__)
 
@@ -111,6 +112,7 @@ async def lifespan(app: FastAPI):
     if scheduler:
         scheduler.shutdown()
         logger.info("Background scheduler stopped")
+    stats_pool.shutdown()
 
 app = FastAPI(
     title="Telecom Outage API",
@@ -134,7 +136,8 @@ app.add_middleware(
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "OPTIONS"],
-    allow_headers=["Authorization", "Content-Type"],
+    allow_headers=["Authorization", "Content-Type", "If-None-Match", "Last-Event-ID"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Include Routers
@@ -146,6 +149,9 @@ app.include_router(analytics.router)
 app.include_router(regions.router, prefix="/api/v1")
 app.include_router(admin.router)
 app.include_router(research_analytics.router)
+app.add_exception_handler(StatsPoolError, research_analytics.stats_pool_error_handler)
+app.include_router(stream.router)
+app.include_router(export.router)
 
 @app.get("/")
 def read_root():
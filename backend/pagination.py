@@ -0,0 +1,106 @@
+"""
+Keyset (cursor) pagination and sparse fieldset helpers for listing endpoints.
+
+Pages are ordered newest-first on (timestamp, id). The cursor is an opaque
+base64url token holding the last row's key; the next page is fetched with a
+`(ts, id) < (cursor_ts, cursor_id)` predicate that stays index-backed no matter
+how deep the client pages, unlike OFFSET.
+
+Every listing endpoint is bounded: `limit` defaults to DEFAULT_PAGE_SIZE and
+is capped at MAX_PAGE_SIZE (declare it with `page_size_query`). When more
+rows remain, the X-Next-Cursor header carries the cursor for the next page.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+
+CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+
+
+def page_size_query(description: str = "Page size"):
+    """The shared `limit` parameter: DEFAULT_PAGE_SIZE by default, at most MAX_PAGE_SIZE."""
+    return Query(
+        default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE,
+        description=f"{description} (default {DEFAULT_PAGE_SIZE}, max {MAX_PAGE_SIZE})",
+    )
+
+
+def encode_cursor(ts: Optional[datetime], row_id: int) -> str:
+    payload = json.dumps([ts.isoformat() if ts else None, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Return (timestamp, id) from a cursor token, or raise 400 for a malformed one."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts_raw, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        ts = datetime.fromisoformat(ts_raw) if ts_raw else None
+        return ts, int(row_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_paginate(query, ts_col, id_col, limit: Optional[int], cursor: Optional[str],
+                    descending: bool = True):
+    """Order on (ts_col, id_col), resume after `cursor`, fetch limit + 1 rows.
+
+    Pages are newest-first by default, with rows whose timestamp is NULL
+    first on every dialect (PostgreSQL's own order for DESC, so the (ts, id)
+    index is still read backwards). `descending=False` walks oldest-first,
+    which is what change feeds need (rows with a NULL timestamp are skipped).
+    """
+    if not descending:
+        query = query.filter(ts_col.isnot(None))
+        if cursor:
+            ts, row_id = decode_cursor(cursor)
+            if ts is not None:
+                query = query.filter(or_(ts_col > ts, and_(ts_col == ts, id_col > row_id)))
+        return _limit(query.order_by(ts_col.asc(), id_col.asc()), limit)
+
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        if ts is None:
+            query = query.filter(or_(ts_col.isnot(None), and_(ts_col.is_(None), id_col < row_id)))
+        else:
+            query = query.filter(or_(ts_col < ts, and_(ts_col == ts, id_col < row_id)))
+    return _limit(query.order_by(ts_col.desc().nulls_first(), id_col.desc()), limit)
+
+
+def _limit(query, limit: Optional[int]):
+    if limit:
+        query = query.limit(limit + 1)
+    return query
+
+
+def finish_page(rows: list, limit: Optional[int], response: Response, key) -> list:
+    """Trim the look-ahead row and expose the next cursor in the X-Next-Cursor header.
+
+    `key(row)` must return the (timestamp, id) pair the page was ordered by.
+    """
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[CURSOR_HEADER] = encode_cursor(*key(rows[-1]))
+    return rows
+
+
+def parse_fields(fields: Optional[str], allowed: Dict[str, object]) -> Optional[List[str]]:
+    """Validate a comma-separated `fields=` list against the allowed column map."""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+        )
+    # id is always returned so clients can address rows
+    return ["id"] + [f for f in dict.fromkeys(requested) if f != "id"]
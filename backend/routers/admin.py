@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func
 from typing import List, Dict, Any, Optional, Annotated
 from datetime import datetime, timezone
 from ..dependencies import get_db, role_checker
+from ..pagination import finish_page, keyset_paginate, page_size_query
 from ..schemas import ReportResponse, OutageResponse, OutageUpdate, ResolvePlaceRequest, ResolvePlaceResponse
 from scrapers.db.models import RawData, Operator, UserReport, Outage
-from scrapers.db.crud import get_scraper_health
+from scrapers.db.crud import get_scraper_health, sync_outage_services
+from scrapers.db.generation import bump_generation
 from ..utils.geocoding import resolve_place
 from ..constants import OutageStatus
 import json
@@ -79,18 +81,20 @@ def _map_outage_to_response(o: Outage) -> OutageResponse:
         updated_at=o.updated_at
     )
 
-@router.get("/outages", response_model=List[OutageResponse])
+@router.get("/outages", response_model=List[OutageResponse], responses={400: {"description": "Invalid cursor"}})
 def admin_get_outages(
     db: Annotated[Session, Depends(get_db)],
+    response: Response,
     operator: Optional[str] = None,
     status: Optional[str] = None,
     search: Optional[str] = None,
     missing_coords: Annotated[Optional[bool], Query()] = None,
     missing_end_date: Annotated[Optional[bool], Query()] = None,
-    limit: int = 100,
-    offset: int = 0,
+    limit: int = page_size_query(),
+    offset: int = Query(default=0, ge=0, description="Deprecated: use cursor"),
+    cursor: Optional[str] = Query(default=None, description="Value of X-Next-Cursor from the previous page"),
 ):
-    """List outages for administrative editing with pagination and search."""
+    """List outages for administrative editing with keyset pagination and search."""
     query = db.query(Outage).join(Operator)
     
     if operator:
@@ -120,12 +124,14 @@ def admin_get_outages(
             )
         )
         
-    query = query.options(
+    query = keyset_paginate(query, Outage.updated_at, Outage.id, limit, cursor).options(
         joinedload(Outage.operator),
         joinedload(Outage.region)
-    ).order_by(Outage.updated_at.desc())
+    )
+    if offset and not cursor:
+        query = query.offset(offset)
     
-    outages = query.offset(offset).limit(limit).all()
+    outages = finish_page(query.all(), limit, response, lambda o: (o.updated_at, o.id))
     return [_map_outage_to_response(o) for o in outages]
 
 @router.put("/outages/{outage_id}", response_model=OutageResponse, responses={404: {"description": "Outage not found"}})
@@ -140,10 +146,14 @@ def update_outage(
         raise HTTPException(status_code=404, detail="Outage not found")
     
     # Update fields if provided
-    for field, value in update_data.model_dump(exclude_unset=True).items():
+    changes = update_data.model_dump(exclude_unset=True)
+    for field, value in changes.items():
         setattr(outage, field, value)
+    if "affected_services" in changes:
+        sync_outage_services(outage, outage.affected_services)
     
     db.commit()
+    bump_generation()
     db.refresh(outage)
     
     return _map_outage_to_response(outage)
@@ -1,13 +1,23 @@
 """
 Analytics endpoints.
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import String, cast, func
 from typing import List, Optional, Annotated
+from ..cache import cached_response
 from ..dependencies import get_db
-from ..schemas import MTTRResponse, ReliabilityResponse, HistoricalTrendResponse, DailyTrend
-from scrapers.db.models import Outage, Operator
+from ..schemas import (
+    MTTRResponse, ReliabilityResponse, HistoricalTrendResponse, DailyTrend,
+    ConcurrencyResponse, ConcurrencySeries, MTTRSeries, MTTRSeriesResponse,
+    RegionMatrixCell, RegionMatrixRow, RegionMatrixResponse,
+)
+from ..utils.intervals import outage_interval_index
+from ..utils.mttr import MTTR_SANITY_MAX_HOURS
+from ..utils.rolling import Coverage, rolling_median, window_bounds, window_sums
+from ..utils.timestamps import as_utc
+import numpy as np
+from scrapers.db.models import Outage, OutageService, Operator, Region
 from datetime import datetime, timedelta, timezone
 import re
 
@@ -43,6 +53,7 @@ def _calculate_mttr_hours(outage: Outage) -> float:
 
 
 @router.get("/mttr", response_model=List[MTTRResponse])
+@cached_response
 def get_mttr(db: Annotated[Session, Depends(get_db)]):
     """Calculate Mean Time To Recovery (MTTR) per operator (last 30 days)."""
     since_date = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=30)
@@ -93,6 +104,7 @@ def _merge_intervals_hours(intervals: list) -> float:
 
 
 @router.get("/reliability", response_model=List[ReliabilityResponse])
+@cached_response
 def get_reliability(db: Annotated[Session, Depends(get_db)]):
     """Compare operators by reliability.
 
@@ -134,6 +146,7 @@ def get_reliability(db: Annotated[Session, Depends(get_db)]):
 
 
 @router.get("/history", response_model=HistoricalTrendResponse)
+@cached_response
 def get_historical_trend(
     db: Annotated[Session, Depends(get_db)],
     days: int = Query(default=30, ge=DAYS_MIN, le=DAYS_MAX, description="Number of days of history to retrieve (1-365)")
@@ -169,58 +182,248 @@ def get_historical_trend(
     }
 
 
-def _filter_by_service(outages: List[Outage], service: str) -> List[Outage]:
-    """Filter outages by service name within affected_services JSON."""
-    s_lower = service.lower()
-    return [
-        o for o in outages 
-        if o.affected_services and any(s_lower in str(s).lower() for s in o.affected_services)
-    ]
+CONCURRENCY_MAX_POINTS = 5000
+CONCURRENCY_MIN_STEP_SECONDS = 60
+SERIES_MAX_POINTS = 5000
+_DURATION_RE = re.compile(r"^(\d+)([smhdw]?)$")
+_DURATION_UNIT_SECONDS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
 
 
-def _build_outage_key(o: Outage) -> tuple:
-    return (
-        str(o.title) if o.title else "",
-        str(o.description) if o.description else "",
-        str(o.location) if o.location else "",
-        o.start_time.isoformat() if o.start_time else "",
-        o.end_time.isoformat() if o.end_time else "",
-    )
+def _parse_duration(value: str, name: str) -> int:
+    """Seconds in a duration like '15m', '12h', '30d' or '2w'; a bare number is seconds."""
+    match = _DURATION_RE.match(value.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} '{value}': use e.g. 3600, 15m, 12h, 30d or 2w")
+    return int(match.group(1)) * _DURATION_UNIT_SECONDS[match.group(2)]
+
+
+@router.get("/concurrency", response_model=ConcurrencyResponse, responses={400: {"description": "Invalid time range or step"}})
+@cached_response
+def get_concurrency(
+    db: Annotated[Session, Depends(get_db)],
+    from_ts: datetime = Query(alias="from", description="Start of the range (ISO 8601, UTC if no offset)"),
+    to_ts: datetime = Query(alias="to", description="End of the range (inclusive)"),
+    step: str = Query(default="1h", description="Sampling step: seconds, or a duration with s, m, h, d or w suffix"),
+):
+    """Number of concurrent outages per operator, sampled every `step` (e.g. 3600 or 1h).
 
-def _merge_affected_services(existing: Outage, incoming: Outage) -> None:
-    if not incoming.affected_services:
-        return
-    if not existing.affected_services:
-        existing.affected_services = incoming.affected_services
-    else:
-        existing.affected_services = list(
-            set(existing.affected_services) | set(incoming.affected_services)
+    Each sample is two binary searches over the in-memory interval index, so
+    the cost does not depend on how many outages fall inside the range.
+    Duplicate rows (same dedup_key) are counted once.
+    """
+    step_s = _parse_duration(step, "step")
+    if step_s < CONCURRENCY_MIN_STEP_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Step must be at least {CONCURRENCY_MIN_STEP_SECONDS} seconds")
+    from_ts, to_ts = as_utc(from_ts), as_utc(to_ts)
+    span = (to_ts - from_ts).total_seconds()
+    if span < 0:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    points = int(span // step_s) + 1
+    if points > CONCURRENCY_MAX_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range too large for step: {points} points (max {CONCURRENCY_MAX_POINTS})",
         )
+    timestamps = [from_ts + timedelta(seconds=i * step_s) for i in range(points)]
+    counts = outage_interval_index.concurrency(db, timestamps)
 
-def _get_unique_outages(outages: List[Outage]) -> List[Outage]:
-    """Deduplicate outages based on title, description, location, and time."""
-    unique_outages_map: dict = {}
-    for o in outages:
-        if not o.start_time or not o.end_time:
+    series = []
+    for op in db.query(Operator).order_by(Operator.name).all():
+        op_counts = counts.get(op.id)
+        values = [int(c) for c in op_counts] if op_counts is not None else [0] * points
+        series.append(ConcurrencySeries(operator_name=op.name, counts=values, max_concurrent=max(values)))
+    return ConcurrencyResponse(step_seconds=step_s, timestamps=timestamps, series=series)
+
+
+def _round(values: np.ndarray) -> list:
+    return [None if np.isnan(v) else round(float(v), 2) for v in values]
+
+
+@router.get("/mttr-series", response_model=MTTRSeriesResponse, responses={400: {"description": "Invalid window or step"}})
+@cached_response
+def get_mttr_series(
+    db: Annotated[Session, Depends(get_db)],
+    window: str = Query(default="30d", description="Rolling window length (seconds, or s, m, h, d or w suffix)"),
+    step: str = Query(default="1d", description="Distance between points (seconds, or s, m, h, d or w suffix)"),
+    days: int = Query(default=365, ge=DAYS_MIN, le=DAYS_MAX, description="Length of the series in days (1-365)"),
+):
+    """Rolling MTTR (mean and median), outage count and merged downtime per operator.
+
+    Each point covers outages resolved in (t - window, t]; downtime is the
+    union of outage intervals clipped to the same window. Outages are read
+    in one query (deduplicated by dedup_key) and every point is computed
+    from sorted arrays, so a year of daily points costs about the same as one.
+    """
+    window_s = _parse_duration(window, "window")
+    step_s = _parse_duration(step, "step")
+    if window_s > DAYS_MAX * 86400:
+        raise HTTPException(status_code=400, detail=f"Window must not exceed {DAYS_MAX} days")
+    safe_days = _clamp_days(days)
+    points = safe_days * 86400 // step_s + 1
+    if points > SERIES_MAX_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range too large for step: {points} points (max {SERIES_MAX_POINTS})",
+        )
+
+    # Align the last point to a step boundary so repeated requests share timestamps
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    epoch = datetime(1970, 1, 1)
+    end = (now - epoch).total_seconds() // step_s * step_s
+    ticks = end - step_s * np.arange(points - 1, -1, -1, dtype=float)
+    since = epoch + timedelta(seconds=float(ticks[0] - window_s))
+
+    rows = db.query(
+        Outage.id, Outage.operator_id, Outage.start_time, Outage.end_time, Outage.dedup_key,
+    ).filter(
+        Outage.start_time.isnot(None),
+        Outage.end_time >= since,
+    ).order_by(Outage.id).all()
+
+    seen = set()
+    by_operator: dict = {}
+    for outage_id, operator_id, start_time, end_time, dedup_key in rows:
+        key = dedup_key or f"id:{outage_id}"
+        if key in seen:
             continue
-        key = _build_outage_key(o)
-        if key not in unique_outages_map:
-            unique_outages_map[key] = o
-        else:
-            _merge_affected_services(unique_outages_map[key], o)
-    return list(unique_outages_map.values())
+        seen.add(key)
+        st, et = (_strip_tz(start_time) - epoch).total_seconds(), (_strip_tz(end_time) - epoch).total_seconds()
+        if 0 < et - st <= MTTR_SANITY_MAX_HOURS * 3600:
+            by_operator.setdefault(operator_id, []).append((et, st))
+
+    series = []
+    for op in db.query(Operator).order_by(Operator.name).all():
+        spans = np.array(sorted(by_operator.get(op.id, [])), dtype=float).reshape(-1, 2)
+        ends, starts = spans[:, 0], spans[:, 1]
+        hours = (ends - starts) / 3600.0
+        lo, hi = window_bounds(ends, ticks, window_s)
+        counts = hi - lo
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = window_sums(hours, lo, hi) / counts
+        downtime = Coverage(starts, ends).between(ticks - window_s, ticks) / 3600.0
+        series.append(MTTRSeries(
+            operator_name=op.name,
+            outage_count=counts.tolist(),
+            mean_mttr_hours=_round(means),
+            median_mttr_hours=_round(rolling_median(hours, lo, hi)),
+            downtime_hours=[round(float(h), 2) for h in downtime],
+        ))
+    timestamps = [epoch + timedelta(seconds=float(t)) for t in ticks]
+    return MTTRSeriesResponse(window=window, step=step, timestamps=timestamps, series=series)
+
+
+@router.get("/region-matrix", response_model=RegionMatrixResponse)
+@cached_response
+def get_region_matrix(
+    db: Annotated[Session, Depends(get_db)],
+    days: int = Query(default=30, ge=DAYS_MIN, le=DAYS_MAX, description="Lookback period in days (1-365)"),
+):
+    """County x operator matrix of outage count, merged downtime and median MTTR.
+
+    One query reads the window's outages (deduplicated by dedup_key); the
+    cells are then filled with grouped NumPy reductions instead of a
+    per-region `location` scan. Downtime and median only use resolved
+    outages with a sane MTTR, clipped to the window like /reliability.
+    """
+    safe_days = _clamp_days(days)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    since = now - timedelta(days=safe_days)
+
+    operators = db.query(Operator).order_by(Operator.name).all()
+    regions = db.query(Region).order_by(Region.id).all()
+    op_index = {op.id: i for i, op in enumerate(operators)}
+    region_index = {r.id: i for i, r in enumerate(regions)}
+    n_cells = len(regions) * len(operators)
+
+    rows = db.query(
+        Outage.id, Outage.region_id, Outage.operator_id, Outage.start_time, Outage.end_time, Outage.dedup_key,
+    ).filter(
+        Outage.start_time >= since,
+        Outage.region_id.isnot(None),
+    ).order_by(Outage.id).all()
+
+    seen = set()
+    cells, starts, ends = [], [], []
+    for outage_id, region_id, operator_id, start_time, end_time, dedup_key in rows:
+        key = dedup_key or f"id:{outage_id}"
+        if key in seen or region_id not in region_index or operator_id not in op_index:
+            continue
+        seen.add(key)
+        cells.append(region_index[region_id] * len(operators) + op_index[operator_id])
+        starts.append((_strip_tz(start_time) - since).total_seconds())
+        ends.append((_strip_tz(end_time) - since).total_seconds() if end_time else np.nan)
+    cells = np.array(cells, dtype=np.int64)
+    starts, ends = np.array(starts, dtype=float), np.array(ends, dtype=float)
+    counts = np.bincount(cells, minlength=n_cells)
+
+    with np.errstate(invalid="ignore"):
+        hours = (ends - starts) / 3600.0
+        valid = (hours > 0) & (hours <= MTTR_SANITY_MAX_HOURS)
+    cells, starts, ends, hours = cells[valid], starts[valid], ends[valid], hours[valid]
+
+    # Median per cell: sort by (cell, hours) and average the middle element(s) of each run
+    order = np.lexsort((hours, cells))
+    sorted_hours = hours[order]
+    valid_counts = np.bincount(cells, minlength=n_cells)
+    first = np.concatenate(([0], np.cumsum(valid_counts)[:-1]))
+    has = valid_counts > 0
+    medians = np.full(n_cells, np.nan)
+    lo_mid = first[has] + (valid_counts[has] - 1) // 2
+    hi_mid = first[has] + valid_counts[has] // 2
+    medians[has] = (sorted_hours[lo_mid] + sorted_hours[hi_mid]) / 2
+
+    # Merged downtime per cell: offset each cell past the previous one's time range so a single
+    # running max over (cell, start)-sorted intervals never merges across cells
+    span = safe_days * 86400.0 + 1.0
+    clipped_end = np.minimum(ends, (now - since).total_seconds())
+    past = clipped_end > starts  # planned work can start in the future
+    d_cells, d_starts, d_ends = cells[past], starts[past], clipped_end[past]
+    order = np.lexsort((d_starts, d_cells))
+    s = d_starts[order] + d_cells[order] * span
+    e = d_ends[order] + d_cells[order] * span
+    downtime = np.zeros(n_cells)
+    if len(s):
+        reach = np.maximum.accumulate(e)
+        block = np.flatnonzero(np.concatenate(([True], s[1:] > reach[:-1])))
+        block_len = np.maximum.reduceat(e, block) - s[block]
+        downtime = np.bincount(d_cells[order][block], weights=block_len, minlength=n_cells) / 3600.0
+
+    matrix = []
+    for r_i, region in enumerate(regions):
+        row_cells = []
+        for o_i in range(len(operators)):
+            c = r_i * len(operators) + o_i
+            row_cells.append(RegionMatrixCell(
+                outage_count=int(counts[c]),
+                downtime_hours=round(float(downtime[c]), 2),
+                median_mttr_hours=None if np.isnan(medians[c]) else round(float(medians[c]), 2),
+            ))
+        matrix.append(RegionMatrixRow(region_id=region.id, name=region.name or {}, cells=row_cells))
+    return RegionMatrixResponse(days=safe_days, operators=[op.name for op in operators], regions=matrix)
+
+
+def _service_filter(db: Session, service: str):
+    """Build an indexed predicate matching outages whose services contain `service`.
+
+    Substring semantics ("5g" matches "5g" and "5g+") are resolved against the
+    small set of distinct service names, so the outage filter itself is an
+    equality lookup on outage_services.
+    """
+    s_lower = service.lower()
+    known = [row[0] for row in db.query(OutageService.service).distinct()]
+    matches = [s for s in known if s_lower in s]
+    return Outage.services.any(OutageService.service.in_(matches))
+
 
-def _calculate_avg_mttr(outages: List[Outage]) -> float:
-    """Calculate average MTTR in hours for a list of outages."""
-    if not outages:
+def _calculate_avg_mttr(intervals: List[tuple]) -> float:
+    """Calculate average MTTR in hours for a list of (start_time, end_time) pairs."""
+    if not intervals:
         return 0.0
     total_hours = 0.0
     valid_count = 0
-    for o in outages:
-        if not o.end_time:
-            continue
-        st = _strip_tz(o.start_time)
-        res = _strip_tz(o.end_time)
+    for start_time, end_time in intervals:
+        st = _strip_tz(start_time)
+        res = _strip_tz(end_time)
         duration_hours = (res - st).total_seconds() / 3600.0
         # Sanity check: 0 < duration < 1 year
         if 0 < duration_hours < 8760:
@@ -230,45 +433,56 @@ def _calculate_avg_mttr(outages: List[Outage]) -> float:
 
 
 @router.get("/mttr-dynamic", response_model=List[MTTRResponse])
+@cached_response
 def get_dynamic_mttr(
     db: Annotated[Session, Depends(get_db)],
     days: int = Query(default=365, ge=DAYS_MIN, le=DAYS_MAX, description="Lookback period in days (1-365)"),
     location: Optional[str] = None, 
     service: Optional[str] = None
 ):
-    """Refined MTTR calculation with deduplication and granular filters."""
+    """Refined MTTR calculation with deduplication and granular filters.
+
+    Duplicate rows share a write-time `dedup_key`, so deduplication is a
+    GROUP BY in SQL: each group contributes one (start, end) interval.
+    """
     # S6680: Clamp validated user input before using in date arithmetic
     safe_days = _clamp_days(days)
     since_date = datetime.now(timezone.utc) - timedelta(days=safe_days)
-    operators = db.query(Operator).all()
+
+    query = db.query(
+        Outage.operator_id,
+        func.min(Outage.start_time),
+        func.min(Outage.end_time),
+    ).filter(
+        Outage.start_time >= since_date,
+        Outage.end_time.isnot(None),
+    )
+    if location:
+        query = query.filter(Outage.location.ilike(f"%{location}%"))
+    if service:
+        query = query.filter(_service_filter(db, service))
+
+    intervals_by_op: dict = {}
+    # Rows without a key (raw SQL writes) are their own group, as in the other endpoints
+    dedup_group = func.coalesce(Outage.dedup_key, cast(Outage.id, String))
+    for operator_id, start_time, end_time in query.group_by(Outage.operator_id, dedup_group):
+        intervals_by_op.setdefault(operator_id, []).append((start_time, end_time))
+
     results = []
-    
-    for op in operators:
-        query = db.query(Outage).filter(
-            Outage.operator_id == op.id,
-            Outage.start_time >= since_date
-        )
-        if location:
-            query = query.filter(Outage.location.ilike(f"%{location}%"))
-            
-        outages = query.all()
-        
-        if service:
-            outages = _filter_by_service(outages, service)
-            
-        outages = _get_unique_outages(outages)
-        avg_h = _calculate_avg_mttr(outages)
+    for op in db.query(Operator).all():
+        intervals = intervals_by_op.get(op.id, [])
+        avg_h = _calculate_avg_mttr(intervals)
         results.append(MTTRResponse(
             operator_name=op.name.upper(),
             average_mttr_hours=round(avg_h, 2),
-            outage_count=len(outages)
+            outage_count=len(intervals)
         ))
         
     return results
 
 
-
 @router.get("/locations", response_model=List[str])
+@cached_response
 def get_locations(
     db: Annotated[Session, Depends(get_db)],
     operator_id: Optional[int] = None
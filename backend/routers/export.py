@@ -0,0 +1,290 @@
+"""
+Bulk outage export as CSV, NDJSON or Parquet.
+
+Rows are read with a server-side cursor (`yield_per`) and encoded one chunk
+at a time, so memory stays flat however many years are exported. CSV and
+NDJSON are gzip-compressed on the fly when the client sends
+`Accept-Encoding: gzip`; Parquet is written one row group per chunk and is
+already compressed.
+
+Each download holds a database connection until it finishes. Exports use
+their own unpooled connections, so they never starve the API's request
+pool, and at most EXPORT_MAX_CONCURRENT run at once; beyond that the
+endpoint returns 429 with Retry-After.
+
+Parquet needs the optional `pyarrow` package; without it that format
+returns 501 and the text formats keep working.
+"""
+import csv
+import io
+import json
+import threading
+import zlib
+from datetime import datetime
+from typing import Annotated, Iterator, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from scrapers.config import settings
+from scrapers.db.connection import ExportSessionLocal
+from scrapers.db.models import Operator, Outage
+from ..utils.timestamps import as_utc
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+router = APIRouter(prefix="/api/v1/export", tags=["export"])
+
+EXPORT_CHUNK_ROWS = 2000
+EXPORT_RETRY_AFTER_SECONDS = 30
+GZIP_LEVEL = 6
+
+COLUMNS = (
+    "id", "incident_id", "operator", "region_id", "status", "severity",
+    "start_time", "end_time", "estimated_fix_time", "location", "latitude", "longitude",
+    "title_sv", "title_en", "description_sv", "description_en", "affected_services",
+    "created_at", "updated_at",
+)
+TIMESTAMP_COLUMNS = ("start_time", "end_time", "estimated_fix_time", "created_at", "updated_at")
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+_export_slots = threading.BoundedSemaphore(settings.EXPORT_MAX_CONCURRENT)
+
+
+class _ExportSlot:
+    """A held export slot, released once when the body finishes or is discarded unstarted."""
+
+    def __init__(self):
+        self._held = True
+
+    def release(self):
+        if self._held:
+            self._held = False
+            _export_slots.release()
+
+    def __del__(self):
+        self.release()
+
+
+def _text(value, lang: str) -> Optional[str]:
+    if isinstance(value, dict):
+        return value.get(lang)
+    return value if lang == "sv" else None
+
+
+def _record(row) -> dict:
+    (outage_id, incident_id, operator, region_id, status, severity, start_time, end_time, eta,
+     location, latitude, longitude, title, description, services, created_at, updated_at) = row
+    return {
+        "id": outage_id, "incident_id": incident_id, "operator": operator, "region_id": region_id,
+        "status": status, "severity": severity,
+        "start_time": start_time, "end_time": end_time, "estimated_fix_time": eta,
+        "location": location, "latitude": latitude, "longitude": longitude,
+        "title_sv": _text(title, "sv"), "title_en": _text(title, "en"),
+        "description_sv": _text(description, "sv"), "description_en": _text(description, "en"),
+        "affected_services": [str(s) for s in services or []],
+        "created_at": created_at, "updated_at": updated_at,
+    }
+
+
+def _isoformat(record: dict) -> dict:
+    """Timestamps as ISO 8601 strings, for the text formats."""
+    for name in TIMESTAMP_COLUMNS:
+        if record[name] is not None:
+            record[name] = record[name].isoformat()
+    return record
+
+
+def _chunks(slot: _ExportSlot, from_ts: Optional[datetime], to_ts: Optional[datetime],
+            operator: Optional[str]) -> Iterator[list]:
+    """Lists of up to EXPORT_CHUNK_ROWS records, streamed from a server-side cursor.
+
+    Opens its own session: the response body is produced after the request's
+    dependencies have finished. Releases `slot` when done.
+    """
+    db = ExportSessionLocal()
+    try:
+        query = db.query(
+            Outage.id, Outage.incident_id, Operator.name, Outage.region_id, Outage.status, Outage.severity,
+            Outage.start_time, Outage.end_time, Outage.estimated_fix_time,
+            Outage.location, Outage.latitude, Outage.longitude,
+            Outage.title, Outage.description, Outage.affected_services,
+            Outage.created_at, Outage.updated_at,
+        ).outerjoin(Operator, Outage.operator_id == Operator.id)
+        if from_ts is not None:
+            query = query.filter(Outage.start_time >= from_ts)
+        if to_ts is not None:
+            query = query.filter(Outage.start_time <= to_ts)
+        if operator:
+            query = query.filter(Operator.name == operator.lower())
+
+        chunk = []
+        for row in query.order_by(Outage.id).yield_per(EXPORT_CHUNK_ROWS):
+            chunk.append(_record(row))
+            if len(chunk) == EXPORT_CHUNK_ROWS:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        db.close()
+        slot.release()
+
+
+def _csv(chunks: Iterator[list]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    for chunk in chunks:
+        for record in chunk:
+            _isoformat(record)["affected_services"] = ";".join(record["affected_services"])
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _ndjson(chunks: Iterator[list]) -> Iterator[bytes]:
+    for chunk in chunks:
+        lines = (json.dumps(_isoformat(r), ensure_ascii=False, separators=(",", ":")) for r in chunk)
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _Sink:
+    """Write-only file object whose contents are drained after every row group."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def _parquet_schema():
+    fields = []
+    for name in COLUMNS:
+        if name in ("id", "region_id"):
+            fields.append(pa.field(name, pa.int64()))
+        elif name in ("latitude", "longitude"):
+            fields.append(pa.field(name, pa.float64()))
+        elif name == "affected_services":
+            fields.append(pa.field(name, pa.list_(pa.string())))
+        elif name in TIMESTAMP_COLUMNS:
+            fields.append(pa.field(name, pa.timestamp("us", tz="UTC")))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields)
+
+
+def _parquet(chunks: Iterator[list]) -> Iterator[bytes]:
+    schema = _parquet_schema()
+    sink = _Sink()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            columns = {name: [r[name] for r in chunk] for name in COLUMNS}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether Accept-Encoding allows gzip: listed (or covered by `*`) with a non-zero q-value."""
+    weights = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights.get("gzip", weights.get("x-gzip", weights.get("*", 0.0))) > 0
+
+
+def _gzip(body: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for data in body:
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+@router.get(
+    "/outages",
+    response_class=StreamingResponse,
+    responses={
+        400: {"description": "Invalid time range"},
+        429: {"description": "Too many exports running"},
+        501: {"description": "Parquet support not installed"},
+    },
+)
+def export_outages(
+    export_format: str = Query(default="csv", alias="format", pattern="^(csv|ndjson|parquet)$"),
+    from_ts: Optional[datetime] = Query(default=None, alias="from", description="Earliest start_time (ISO 8601, UTC if no offset)"),
+    to_ts: Optional[datetime] = Query(default=None, alias="to", description="Latest start_time (inclusive)"),
+    operator: Optional[str] = Query(default=None, description="Operator name, e.g. telia"),
+    accept_encoding: Annotated[Optional[str], Header()] = None,
+):
+    """Stream every matching outage, ordered by id, as a file download.
+
+    Timestamps are ISO 8601 as stored (UTC timestamps in Parquet); bilingual title and description
+    are split into `_sv` / `_en` columns.
+    """
+    from_ts, to_ts = as_utc(from_ts), as_utc(to_ts)
+    if from_ts is not None and to_ts is not None and from_ts > to_ts:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if export_format == "parquet" and not PYARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Parquet export requires the pyarrow package")
+
+    if not _export_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many exports in progress, please retry shortly",
+            headers={"Retry-After": str(EXPORT_RETRY_AFTER_SECONDS)},
+        )
+
+    encoders = {"csv": _csv, "ndjson": _ndjson, "parquet": _parquet}
+    body = encoders[export_format](_chunks(_ExportSlot(), from_ts, to_ts, operator))
+    headers = {
+        "Content-Disposition": f'attachment; filename="outages.{export_format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if export_format != "parquet" and _accepts_gzip(accept_encoding):
+        body = _gzip(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=MEDIA_TYPES[export_format], headers=headers)
@@ -1,16 +1,28 @@
 """
 Outage endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional, Annotated
 from ..dependencies import get_db
-from ..schemas import OutageResponse, OutageStatus
+from ..etag import generation_etag
+from ..pagination import decode_cursor, encode_cursor, finish_page, keyset_paginate, page_size_query, parse_fields
+from ..schemas import OutageResponse, OutageStatus, ClusterFeatureCollection, OutageChangesResponse
 from scrapers.db.models import Outage, Operator, Region
-import math
+from ..utils.intervals import outage_interval_index
+from ..utils.spatial import (
+    active_outage_clusters, active_outage_index, bounding_box, haversine_km, longitude_between, CLUSTER_MAX_ZOOM,
+)
+from ..utils.timestamps import as_utc
 from datetime import datetime, timedelta, timezone
+import numpy as np
 
-router = APIRouter(prefix="/api/v1/outages", tags=["outages"])
+router = APIRouter(prefix="/api/v1/outages", tags=["outages"], dependencies=[Depends(generation_etag)])
+
+# How far the caught-up /changes cursor is rewound; same margin as the SSE stream
+CHANGES_LAG_SECONDS = 300
 
 def _safe_val(v):
     """Safely extract the value from an Enum or return as is."""
@@ -46,14 +58,82 @@ def _map_to_outage_response(o: Outage) -> OutageResponse:
         updated_at=o.updated_at
     )
 
-@router.get("/history", response_model=List[OutageResponse])
+# Columns selectable through `fields=`; only these are fetched from the database.
+OUTAGE_FIELD_COLUMNS = {
+    "id": Outage.id,
+    "incident_id": Outage.incident_id,
+    "operator_id": Outage.operator_id,
+    "operator_name": Operator.name,
+    "region_id": Outage.region_id,
+    "region_name": Region.name,
+    "raw_data_id": Outage.raw_data_id,
+    "title": Outage.title,
+    "description": Outage.description,
+    "status": Outage.status,
+    "severity": Outage.severity,
+    "start_time": Outage.start_time,
+    "end_time": Outage.end_time,
+    "estimated_fix_time": Outage.estimated_fix_time,
+    "location": Outage.location,
+    "latitude": Outage.latitude,
+    "longitude": Outage.longitude,
+    "affected_services": Outage.affected_services,
+    "updated_at": Outage.updated_at,
+}
+
+def _sparse_row(row, columns: List[str]) -> dict:
+    """Project a labelled column row or an OutageResponse onto `columns`.
+
+    Both the SQL and the geo listing go through here, so the same `fields=`
+    gives the same keys, in the same order, with OutageResponse's defaults.
+    """
+    item = {name: getattr(row, name) for name in columns}
+    if "status" in item:
+        item["status"] = _safe_val(item["status"]) or "active"
+    if "severity" in item:
+        item["severity"] = _safe_val(item["severity"])
+    if "title" in item and not item["title"]:
+        item["title"] = {}
+    if "affected_services" in item and not item["affected_services"]:
+        item["affected_services"] = []
+    return item
+
+def _sparse_response(items: List[dict], response: Response) -> JSONResponse:
+    # Returning a Response bypasses the injected one, so carry its headers (cursor, ETag) over
+    return JSONResponse(content=jsonable_encoder(items), headers=dict(response.headers))
+
+def _list_outages(query, response: Response, limit: int, cursor: Optional[str],
+                  fields: Optional[str]):
+    """Run an outage listing query one keyset page at a time, with optional sparse fields."""
+    columns = parse_fields(fields, OUTAGE_FIELD_COLUMNS)
+    if columns and "region_name" in columns:
+        query = query.outerjoin(Region, Outage.region_id == Region.id)
+    query = keyset_paginate(query, Outage.updated_at, Outage.id, limit, cursor)
+
+    if columns is None:
+        outages = query.options(joinedload(Outage.operator), joinedload(Outage.region)).all()
+        outages = finish_page(outages, limit, response, lambda o: (o.updated_at, o.id))
+        return [_map_to_outage_response(o) for o in outages]
+
+    rows = query.with_entities(
+        *(OUTAGE_FIELD_COLUMNS[name].label(name) for name in columns),
+        Outage.updated_at.label("_cursor_ts"),
+    ).all()
+    rows = finish_page(rows, limit, response, lambda r: (r._cursor_ts, r.id))
+    return _sparse_response([_sparse_row(r, columns) for r in rows], response)
+
+@router.get("/history", response_model=List[OutageResponse], responses={400: {"description": "Invalid cursor or fields"}})
 def get_outage_history(
     db: Annotated[Session, Depends(get_db)],
+    response: Response,
     operator: Optional[str] = None,
-    days: int = 7
+    days: int = 7,
+    limit: int = page_size_query(),
+    cursor: Optional[str] = Query(default=None, description="Value of X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated subset of response fields"),
 ):
     """
-    Get resolved outages history.
+    Get resolved outages history, newest first, one keyset page at a time.
     """
     since_date = datetime.now(timezone.utc) - timedelta(days=days)
     query = db.query(Outage).join(Operator).filter(
@@ -64,44 +144,182 @@ def get_outage_history(
     if operator:
         query = query.filter(Operator.name == operator.lower())
         
-    outages = query.options(joinedload(Outage.operator), joinedload(Outage.region)).all()
-    
-    return [_map_to_outage_response(o) for o in outages]
+    return _list_outages(query, response, limit, cursor, fields)
 
-@router.get("", response_model=List[OutageResponse])
+def _nearest_active_outages(db: Session, operator: Optional[str], status: str,
+                            lat: float, lon: float, radius_km: float, limit: int) -> List[Outage]:
+    """Serve a non-resolved status search from the in-memory KD-tree."""
+    operator_id = None
+    if operator:
+        operator_id = db.query(Operator.id).filter(Operator.name == operator.lower()).scalar()
+        if operator_id is None:
+            return []
+    hits = active_outage_index.nearest(db, lat, lon, radius_km, k=limit,
+                                       operator_id=operator_id, status=status)
+    if not hits:
+        return []
+    rows = db.query(Outage).options(joinedload(Outage.operator), joinedload(Outage.region)).filter(
+        Outage.id.in_([outage_id for outage_id, _ in hits])
+    ).all()
+    by_id = {o.id: o for o in rows}
+    return [by_id[outage_id] for outage_id, _ in hits if outage_id in by_id]
+
+@router.get("", response_model=List[OutageResponse], responses={400: {"description": "Invalid cursor or fields"}})
 def get_outages(
     db: Annotated[Session, Depends(get_db)],
+    response: Response,
     operator: Optional[str] = None,
     status: Optional[str] = None,
     lat: Optional[float] = None,
     lon: Optional[float] = None,
-    radius_km: float = 10.0
+    radius_km: float = Query(default=10.0, gt=0),
+    limit: int = page_size_query("Page size; with lat/lon: the N nearest outages"),
+    cursor: Optional[str] = Query(default=None, description="Value of X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated subset of response fields"),
 ):
     """
     Get outages with optional filtering and geospatial search.
+
+    Without lat/lon, `limit`/`cursor` page through the list newest-first on
+    (updated_at, id); the next cursor is returned in the X-Next-Cursor header.
+    With lat/lon set, the `limit` nearest outages within the radius are
+    returned: candidates are prefiltered by a bounding box on the indexed
+    coordinate columns and then checked with a vectorized haversine.
+    Non-resolved status searches are answered from an in-memory KD-tree.
     """
+    if lat is None or lon is None:
+        query = db.query(Outage).join(Operator)
+        if operator:
+            query = query.filter(Operator.name == operator.lower())
+        if status:
+            query = query.filter(Outage.status == status)
+        return _list_outages(query, response, limit, cursor, fields)
+
+    columns = parse_fields(fields, OUTAGE_FIELD_COLUMNS)
+    outages = _nearby_outages(db, operator, status, lat, lon, radius_km, limit)
+    if columns is None:
+        return [_map_to_outage_response(o) for o in outages]
+    return _sparse_response([_sparse_row(_map_to_outage_response(o), columns) for o in outages], response)
+
+def _nearby_outages(db: Session, operator: Optional[str], status: Optional[str],
+                    lat: float, lon: float, radius_km: float, limit: int) -> List[Outage]:
+    if status and status != "resolved":
+        return _nearest_active_outages(db, operator, status, lat, lon, radius_km, limit)
+
     query = db.query(Outage).join(Operator)
-    
     if operator:
         query = query.filter(Operator.name == operator.lower())
-    
     if status:
         query = query.filter(Outage.status == status)
-        
-    outages = query.options(joinedload(Outage.operator), joinedload(Outage.region)).all()
-    
-    results = []
-    if lat is not None and lon is not None:
-        for outage in outages:
-            if outage.latitude is None or outage.longitude is None:
-                continue
-            dist = haversine(lat, lon, outage.latitude, outage.longitude)
-            if dist <= radius_km:
-                results.append(outage)
-    else:
-        results = outages
-        
-    return [_map_to_outage_response(o) for o in results]
+
+    min_lat, max_lat, west, east = bounding_box(lat, lon, radius_km)
+    candidates = query.filter(
+        Outage.latitude.between(min_lat, max_lat),
+        longitude_between(Outage.longitude, west, east),
+    ).options(joinedload(Outage.operator), joinedload(Outage.region)).all()
+    if not candidates:
+        return []
+
+    dists = haversine_km(lat, lon, [o.latitude for o in candidates], [o.longitude for o in candidates])
+    within = np.flatnonzero(dists <= radius_km)
+    within = within[np.argsort(dists[within], kind="stable")[:limit]]
+    return [candidates[i] for i in within]
+
+def _parse_bbox(bbox: Optional[str]):
+    """Parse a GeoJSON-style "min_lon,min_lat,max_lon,max_lat" string."""
+    if not bbox:
+        return None
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="bbox must be 'min_lon,min_lat,max_lon,max_lat'")
+    if min_lat > max_lat:
+        raise HTTPException(status_code=422, detail="bbox min_lat must not exceed max_lat")
+    return (min_lon, min_lat, max_lon, max_lat)
+
+@router.get("/clusters", response_model=ClusterFeatureCollection, response_model_exclude_none=True,
+            responses={422: {"description": "Invalid bbox"}})
+def get_outage_clusters(
+    db: Annotated[Session, Depends(get_db)],
+    zoom: int = Query(default=5, ge=0, le=CLUSTER_MAX_ZOOM),
+    bbox: Optional[str] = Query(default=None, description="min_lon,min_lat,max_lon,max_lat"),
+):
+    """
+    Pre-clustered GeoJSON of active outages for the map.
+
+    Served from an in-memory hierarchical grid that is rebuilt only when the
+    active outage set changes, so the payload scales with the number of
+    clusters on screen rather than the number of outages.
+    """
+    features = active_outage_clusters.query(db, zoom, _parse_bbox(bbox))
+    return {"type": "FeatureCollection", "zoom": zoom, "features": features}
+
+@router.get("/changes", response_model=OutageChangesResponse, responses={400: {"description": "Invalid cursor"}})
+def get_outage_changes(
+    db: Annotated[Session, Depends(get_db)],
+    since: Optional[str] = Query(default=None, description="Cursor from the previous response; omit for a full sync"),
+    limit: int = page_size_query(),
+):
+    """
+    Outages inserted, updated or resolved after `since`, oldest change first.
+
+    Walks the (updated_at, id) index forwards. Store the returned `cursor` and
+    pass it back as `since`; while `has_more` is true, call again right away.
+    Rows removed by retention cleanup are not reported.
+
+    Writers stamp updated_at before they commit, so a slower concurrent writer
+    can commit a row behind a cursor that was already handed out. Once the
+    feed is caught up (`has_more` false), the cursor is therefore rewound by
+    CHANGES_LAG_SECONDS and the next call sends that window again. Apply
+    changes as upserts keyed by outage id. A writer transaction open longer
+    than the lag can still be missed.
+    """
+    query = keyset_paginate(
+        db.query(Outage).options(joinedload(Outage.operator), joinedload(Outage.region)),
+        Outage.updated_at, Outage.id, limit, since, descending=False,
+    )
+    outages = query.all()
+    has_more = len(outages) > limit
+    outages = outages[:limit]
+    cursor = since
+    if outages and has_more:
+        cursor = encode_cursor(outages[-1].updated_at, outages[-1].id)
+    elif outages:
+        rewound = as_utc(outages[-1].updated_at) - timedelta(seconds=CHANGES_LAG_SECONDS)
+        since_ts = decode_cursor(since)[0] if since else None
+        # Never move behind `since`, or a late row older than the window would pull it back each call
+        if since_ts is None or rewound > as_utc(since_ts):
+            cursor = encode_cursor(rewound, 0)
+    return OutageChangesResponse(
+        changes=[_map_to_outage_response(o) for o in outages],
+        cursor=cursor,
+        has_more=has_more,
+    )
+
+@router.get("/at", response_model=List[OutageResponse])
+def get_outages_at(
+    db: Annotated[Session, Depends(get_db)],
+    ts: datetime = Query(description="Point in time (ISO 8601, UTC if no offset)"),
+    operator: Optional[str] = None,
+):
+    """
+    Outages that were active at `ts` (start_time <= ts < end_time).
+
+    Served from an in-memory interval tree rebuilt once per data generation,
+    so only the k matching rows are loaded.
+    """
+    operator_id = None
+    if operator:
+        operator_id = db.query(Operator.id).filter(Operator.name == operator.lower()).scalar()
+        if operator_id is None:
+            return []
+    ids = outage_interval_index.active_at(db, ts, operator_id)
+    if not ids:
+        return []
+    outages = db.query(Outage).options(joinedload(Outage.operator), joinedload(Outage.region)).filter(
+        Outage.id.in_(ids)
+    ).order_by(Outage.start_time, Outage.id).all()
+    return [_map_to_outage_response(o) for o in outages]
 
 @router.get("/{outage_id}", response_model=OutageResponse, responses={404: {"description": "Outage not found"}})
 def get_outage_detail(outage_id: int, db: Annotated[Session, Depends(get_db)]):
@@ -110,20 +328,3 @@ def get_outage_detail(outage_id: int, db: Annotated[Session, Depends(get_db)]):
         raise HTTPException(status_code=404, detail="Outage not found")
         
     return _map_to_outage_response(outage)
-
-def haversine(lat1, lon1, lat2, lon2):
-    """
-    Calculate the great circle distance between two points 
-    on the earth (specified in decimal degrees)
-    Result in Kilometers
-    """
-    # convert decimal degrees to radians 
-    lon1, lat1, lon2, lat2 = map(math.radians, [lon1, lat1, lon2, lat2])
-
-    # haversine formula 
-    dlon = lon2 - lon1 
-    dlat = lat2 - lat1 
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a)) 
-    r = 6371 # Radius of earth in kilometers
-    return c * r
@@ -3,12 +3,14 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Annotated
 from ..dependencies import get_db
+from ..etag import generation_etag
 from .. import schemas
 from scrapers.db.models import Region, Outage
 
 router = APIRouter(
     prefix="/regions",
-    tags=["Regions"]
+    tags=["Regions"],
+    dependencies=[Depends(generation_etag)],
 )
 
 @router.get("", response_model=List[schemas.RegionResponse])
@@ -1,10 +1,11 @@
 """
 User report endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List, Annotated
+from typing import List, Optional, Annotated
 from ..dependencies import get_db
+from ..pagination import finish_page, keyset_paginate, page_size_query
 from ..schemas import ReportCreate, ReportResponse, HotspotResponse
 from scrapers.db.models import UserReport, Operator
 from scrapers.common.crowd_engine import detect_hotspots, aggregate_external_signals
@@ -50,11 +51,25 @@ def create_report(report: ReportCreate, db: Annotated[Session, Depends(get_db)])
         created_at=new_report.created_at
     )
 
-@router.get("", response_model=List[ReportResponse])
-def get_reports(db: Annotated[Session, Depends(get_db)]):
-    """List all user reports."""
+@router.get("", response_model=List[ReportResponse], responses={400: {"description": "Invalid cursor"}})
+def get_reports(
+    db: Annotated[Session, Depends(get_db)],
+    response: Response,
+    operator: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = page_size_query(),
+    cursor: Optional[str] = Query(default=None, description="Value of X-Next-Cursor from the previous page"),
+):
+    """List user reports, newest first, one keyset page at a time."""
     from sqlalchemy.orm import joinedload
-    reports = db.query(UserReport).options(joinedload(UserReport.operator)).all()
+    query = db.query(UserReport)
+    if operator:
+        query = query.join(Operator, UserReport.operator_id == Operator.id).filter(Operator.name == operator.lower())
+    if status:
+        query = query.filter(UserReport.status == status.lower())
+    query = keyset_paginate(query, UserReport.created_at, UserReport.id, limit, cursor)
+    reports = query.options(joinedload(UserReport.operator)).all()
+    reports = finish_page(reports, limit, response, lambda r: (r.created_at, r.id))
     return [
         ReportResponse(
             id=r.id,
@@ -11,159 +11,173 @@ References:
   [2] ETSI EG 202 057-1 (2013) - User QoS parameters
   [3] PTSFS 2014:1 - Swedish telecom reporting regulations
 """
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional, Annotated, Tuple
 from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from typing import List, Annotated, Optional
 import numpy as np
-from scipy import stats as scistats
+from scipy.stats import t as student_t
 
+from ..cache import cached_response
 from ..dependencies import get_db
 from ..schemas_research import (
+    ConfidenceInterval,
     PercentileStats,
     DistributionResponse,
-    HistogramBin,
     SLAComplianceResult,
     ValueScoreResult,
-    ValueScoreComponent,
     StatisticalTestResult,
+    ResearchBundle,
+    SurvivalCurve,
+    LogRankResult,
+    SurvivalResponse,
+    SLAMatrixResponse,
+    OperatorRankStability,
+    ValueScoreSensitivity,
 )
 from ..sla_standards import (
     SLA_THRESHOLDS_HOURS,
     SEVERITY_TO_SLA_TIER,
     DEFAULT_BENCHMARK,
     CVS_WEIGHTS,
-    get_threshold,
     list_benchmarks,
 )
-from scrapers.db.models import Outage, Operator
+from ..utils import research
+from ..utils.bootstrap import METHODS as CI_METHODS, STATISTICS as CI_STATISTICS
+from ..utils.posthoc import CORRECTIONS
+from ..utils.mttr import MTTR_SANITY_MAX_HOURS, load_mttr_dataset
+from ..utils.research import BOOTSTRAP_ITERATIONS, CVS_COMPONENTS, HISTOGRAM_BINS, RANDOM_SEED
+from ..utils.sketch import mttr_sketch_index
+from ..utils.stats_pool import RETRY_AFTER_SECONDS, StatsPoolError, StatsPoolTimeout
+from ..utils.survival import KMCurve, holm, logrank
+from .analytics import _strip_tz
+from scrapers.db.models import Outage
 
 router = APIRouter(prefix="/api/v1/research", tags=["research"])
 
 DAYS_MIN = 1
 DAYS_MAX = 730
 DEFAULT_DAYS = 365
-BOOTSTRAP_ITERATIONS = 1000
-RANDOM_SEED = 42
-MTTR_SANITY_MAX_HOURS = 720.0  # 30 days — exclude data artifacts from end_time bug
-HISTOGRAM_BINS = 20
+BOOTSTRAP_MAX_ITERATIONS = 20000
+SURVIVAL_MIN_SAMPLES = 5
+SURVIVAL_MAX_POINTS = 200
+SENSITIVITY_SAMPLES = 20000
+SENSITIVITY_MAX_SAMPLES = 200000
+PERMUTATIONS_MAX = 10000
+
+
+async def stats_pool_error_handler(request: Request, exc: StatsPoolError) -> JSONResponse:
+    """Registered on the app: a timed-out job is 504, a busy or restarting pool 503 with Retry-After."""
+    if isinstance(exc, StatsPoolTimeout):
+        return JSONResponse(status_code=504, content={"detail": str(exc)})
+    return JSONResponse(
+        status_code=503, content={"detail": str(exc)},
+        headers={"Retry-After": str(getattr(exc, "retry_after", RETRY_AFTER_SECONDS))},
+    )
 
 
 def _clamp_days(days: int) -> int:
     return max(DAYS_MIN, min(days, DAYS_MAX))
 
 
-def _strip_tz(dt: datetime) -> datetime:
-    return dt.replace(tzinfo=None) if dt and dt.tzinfo else dt
-
-
-def _calculate_mttr_hours(outage) -> Optional[float]:
-    if not outage.start_time or not outage.end_time:
-        return None
-    st = _strip_tz(outage.start_time)
-    et = _strip_tz(outage.end_time)
-    duration_hours = (et - st).total_seconds() / 3600.0
-    if 0 < duration_hours <= MTTR_SANITY_MAX_HOURS:
-        return duration_hours
-    return None
-
-
-def _fetch_operator_mttrs(db, operator_id, since):
-    outages = db.query(Outage).filter(
-        Outage.operator_id == operator_id,
-        Outage.start_time.isnot(None),
-        Outage.end_time.isnot(None),
-        Outage.start_time >= since,
-    ).all()
-    result = []
-    for o in outages:
-        m = _calculate_mttr_hours(o)
-        if m is not None:
-            result.append(m)
-    return result
-
-
-def _bootstrap_ci(values, confidence=0.95):
-    if len(values) < 2:
-        return (0.0, 0.0)
-    rng = np.random.default_rng(RANDOM_SEED)
-    arr = np.array(values)
-    means = [rng.choice(arr, size=len(arr), replace=True).mean()
-             for _ in range(BOOTSTRAP_ITERATIONS)]
-    alpha = (1 - confidence) / 2
-    low = float(np.percentile(means, alpha * 100))
-    high = float(np.percentile(means, (1 - alpha) * 100))
-    return (low, high)
-
-
-def _normalize_score(value, best, worst, lower_is_better=True):
-    if worst == best:
-        return 100.0
-    if lower_is_better:
-        score = (worst - value) / (worst - best) * 100
-    else:
-        score = (value - worst) / (best - worst) * 100
-    return float(max(0.0, min(100.0, score)))
-
-
-def _interpret_score(score):
-    if score >= 80:
-        return "Excellent"
-    if score >= 60:
-        return "Good"
-    if score >= 40:
-        return "Fair"
-    return "Poor"
-
-
 @router.get("/benchmarks", response_model=List[str])
 def get_benchmarks():
     """List supported SLA benchmark identifiers."""
     return list_benchmarks()
 
 
-@router.get("/mttr-percentiles", response_model=List[PercentileStats])
-def get_mttr_percentiles(
-    db: Annotated[Session, Depends(get_db)],
-    days: int = Query(default=DEFAULT_DAYS, ge=DAYS_MIN, le=DAYS_MAX),
-):
-    """RQ1: Return distribution percentiles for MTTR per operator."""
-    safe_days = _clamp_days(days)
+def _parse_ci_statistics(ci_statistics: str) -> List[str]:
+    statistics = [st.strip() for st in ci_statistics.split(",") if st.strip()]
+    unknown = [st for st in statistics if st not in CI_STATISTICS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown CI statistics: {', '.join(unknown)}. Allowed: {', '.join(CI_STATISTICS)}",
+        )
+    return list(dict.fromkeys(["mean"] + statistics))
+
+
+def _sketch_percentiles(db, operators, safe_days, region_id=None):
+    """Percentiles from the per-month t-digests; the mean CI is a t-interval."""
     since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=safe_days)
-    operators = db.query(Operator).all()
     results = []
     for op in operators:
-        if op.name and op.name.lower() == "tele2":
-            continue
-        mttrs = _fetch_operator_mttrs(db, op.id, since)
-        if not mttrs:
+        digest = mttr_sketch_index.window(db, op.id, since, region_id)
+        n = digest.count
+        if n == 0:
             results.append(PercentileStats(
                 operator_name=op.name, sample_size=0,
                 mean=0.0, median=0.0, p75=0.0, p90=0.0, p95=0.0, p99=0.0,
                 std_dev=0.0, min_value=0.0, max_value=0.0,
                 ci_95_low=0.0, ci_95_high=0.0,
+                ci_method="t", bootstrap_iterations=0, exact=False,
             ))
             continue
-        arr = np.array(mttrs)
-        ci_low, ci_high = _bootstrap_ci(mttrs)
+        mean, std = digest.mean, digest.std
+        half = float(student_t.ppf(0.975, n - 1)) * std / np.sqrt(n) if n > 1 else 0.0
+        # MTTR is positive, so the interval never extends below zero
+        ci_low, ci_high = (max(mean - half, 0.0), mean + half) if n > 1 else (0.0, 0.0)
         results.append(PercentileStats(
             operator_name=op.name,
-            sample_size=len(mttrs),
-            mean=round(float(arr.mean()), 2),
-            median=round(float(np.percentile(arr, 50)), 2),
-            p75=round(float(np.percentile(arr, 75)), 2),
-            p90=round(float(np.percentile(arr, 90)), 2),
-            p95=round(float(np.percentile(arr, 95)), 2),
-            p99=round(float(np.percentile(arr, 99)), 2),
-            std_dev=round(float(arr.std(ddof=1)) if len(arr) > 1 else 0.0, 2),
-            min_value=round(float(arr.min()), 2),
-            max_value=round(float(arr.max()), 2),
+            sample_size=n,
+            mean=round(mean, 2),
+            median=round(digest.quantile(0.50), 2),
+            p75=round(digest.quantile(0.75), 2),
+            p90=round(digest.quantile(0.90), 2),
+            p95=round(digest.quantile(0.95), 2),
+            p99=round(digest.quantile(0.99), 2),
+            std_dev=round(std, 2),
+            min_value=round(digest.min, 2),
+            max_value=round(digest.max, 2),
             ci_95_low=round(ci_low, 2),
             ci_95_high=round(ci_high, 2),
+            ci_method="t",
+            bootstrap_iterations=0,
+            confidence_intervals={"mean": ConfidenceInterval(low=round(ci_low, 2), high=round(ci_high, 2))},
+            exact=False,
         ))
     return results
 
+
+@router.get("/mttr-percentiles", response_model=List[PercentileStats], responses={400: {"description": "Unknown CI statistic"}})
+@cached_response
+def get_mttr_percentiles(
+    db: Annotated[Session, Depends(get_db)],
+    days: int = Query(default=DEFAULT_DAYS, ge=DAYS_MIN, le=DAYS_MAX),
+    iterations: int = Query(default=BOOTSTRAP_ITERATIONS, ge=100, le=BOOTSTRAP_MAX_ITERATIONS),
+    ci_method: str = Query(default="percentile", pattern=f"^({'|'.join(CI_METHODS)})$"),
+    ci_statistics: str = Query(default="mean", description="Comma-separated subset of mean,median,p95"),
+    exact: bool = Query(default=False, description="Recompute from raw samples (for publication figures)"),
+    region_id: Optional[int] = Query(default=None),
+):
+    """RQ1: Return distribution percentiles for MTTR per operator.
+
+    By default percentiles come from mergeable t-digest sketches (per
+    operator, month and region), so any window costs about the same.
+    `exact=true` uses the raw samples with bootstrap CIs (served from the
+    precomputed snapshot when one is current, which holds the same
+    values): the mean's 95% CI is always reported in ci_95_low/ci_95_high,
+    and `ci_statistics` adds CIs for the median and/or P95. Bootstrap
+    options need the raw samples and imply exact=true. Each row's `exact`
+    field states which source produced it.
+    """
+    statistics = _parse_ci_statistics(ci_statistics)
+    safe_days = _clamp_days(days)
+    default_ci = statistics == ["mean"] and iterations == BOOTSTRAP_ITERATIONS and ci_method == "percentile"
+    if default_ci and not exact:
+        return _sketch_percentiles(db, research.research_operators(db), safe_days, region_id)
+    if default_ci and region_id is None:
+        snapshot = research.stored_snapshot(db, "percentiles", safe_days)
+        if snapshot is not None:
+            return snapshot
+    data = load_mttr_dataset(db, safe_days)
+    return research.percentiles(data, research.research_operators(db), iterations, ci_method, statistics, region_id)
+
+
 @router.get("/mttr-distribution", response_model=List[DistributionResponse])
+@cached_response
 def get_mttr_distribution(
     db: Annotated[Session, Depends(get_db)],
     days: int = Query(default=DEFAULT_DAYS, ge=DAYS_MIN, le=DAYS_MAX),
@@ -171,50 +185,16 @@ def get_mttr_distribution(
 ):
     """RQ1: Histogram bins of MTTR for visualization."""
     safe_days = _clamp_days(days)
-    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=safe_days)
-    operators = db.query(Operator).all()
-    results = []
-    for op in operators:
-        if op.name and op.name.lower() == "tele2":
-            continue
-        mttrs = _fetch_operator_mttrs(db, op.id, since)
-        if len(mttrs) < 5:
-            results.append(DistributionResponse(
-                operator_name=op.name, sample_size=len(mttrs), bins=[],
-                distribution_fit=None,
-            ))
-            continue
-        arr = np.array(mttrs)
-        counts, edges = np.histogram(arr, bins=bins)
-        hist_bins = [
-            HistogramBin(
-                bin_start=round(float(edges[i]), 2),
-                bin_end=round(float(edges[i+1]), 2),
-                count=int(counts[i]),
-            )
-            for i in range(len(counts))
-        ]
-        fit_label = None
-        try:
-            arr_pos = arr[arr > 0]
-            if len(arr_pos) >= 10:
-                ln_params = scistats.lognorm.fit(arr_pos, floc=0)
-                ln_ll = float(scistats.lognorm.logpdf(arr_pos, *ln_params).sum())
-                ex_params = scistats.expon.fit(arr_pos, floc=0)
-                ex_ll = float(scistats.expon.logpdf(arr_pos, *ex_params).sum())
-                fit_label = "lognormal" if ln_ll > ex_ll else "exponential"
-        except Exception:
-            fit_label = None
-        results.append(DistributionResponse(
-            operator_name=op.name,
-            sample_size=len(mttrs),
-            bins=hist_bins,
-            distribution_fit=fit_label,
-        ))
-    return results
+    if bins == HISTOGRAM_BINS:
+        snapshot = research.stored_snapshot(db, "distribution", safe_days)
+        if snapshot is not None:
+            return snapshot
+    data = load_mttr_dataset(db, safe_days)
+    return research.distribution(data, research.research_operators(db), bins)
 
 
 @router.get("/sla-compliance", response_model=List[SLAComplianceResult])
+@cached_response
 def get_sla_compliance(
     db: Annotated[Session, Depends(get_db)],
     days: int = Query(default=DEFAULT_DAYS, ge=DAYS_MIN, le=DAYS_MAX),
@@ -224,96 +204,36 @@ def get_sla_compliance(
     if benchmark not in SLA_THRESHOLDS_HOURS:
         benchmark = DEFAULT_BENCHMARK
     safe_days = _clamp_days(days)
-    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=safe_days)
-    operators = db.query(Operator).all()
-    results = []
-    for op in operators:
-        if op.name and op.name.lower() == "tele2":
-            continue
-        outages = db.query(Outage).filter(
-            Outage.operator_id == op.id,
-            Outage.start_time.isnot(None),
-            Outage.end_time.isnot(None),
-            Outage.start_time >= since,
-        ).all()
-        total = 0
-        compliant = 0
-        by_sev = {}
-        for o in outages:
-            mttr = _calculate_mttr_hours(o)
-            if mttr is None:
-                continue
-            severity = (o.severity or "unknown").lower()
-            threshold = get_threshold(benchmark, severity)
-            is_compliant = mttr <= threshold
-            total += 1
-            if is_compliant:
-                compliant += 1
-            if severity not in by_sev:
-                by_sev[severity] = {"threshold": threshold, "actual_mttrs": [], "compliant": 0, "total": 0}
-            by_sev[severity]["actual_mttrs"].append(mttr)
-            by_sev[severity]["total"] += 1
-            if is_compliant:
-                by_sev[severity]["compliant"] += 1
-        by_severity_out = {}
-        for sev, d in by_sev.items():
-            mean_actual = float(np.mean(d["actual_mttrs"])) if d["actual_mttrs"] else 0.0
-            rate = (d["compliant"] / d["total"] * 100) if d["total"] > 0 else 0.0
-            by_severity_out[sev] = {
-                "threshold_hours": round(d["threshold"], 2),
-                "actual_mean_hours": round(mean_actual, 2),
-                "compliance_pct": round(rate, 2),
-                "incidents": float(d["total"]),
-            }
-        rate_total = (compliant / total * 100) if total > 0 else 0.0
-        results.append(SLAComplianceResult(
-            operator_name=op.name,
-            benchmark=benchmark,
-            total_incidents=total,
-            compliant_count=compliant,
-            non_compliant_count=total - compliant,
-            compliance_rate_pct=round(rate_total, 2),
-            by_severity=by_severity_out,
-        ))
-    return results
+    snapshot = research.stored_snapshot(db, "sla_compliance", safe_days, benchmark)
+    if snapshot is not None:
+        return snapshot
+    data = load_mttr_dataset(db, safe_days)
+    return research.sla_compliance(data, research.research_operators(db), benchmark)
 
 
-def _calculate_operator_metrics(db, op, since, safe_days):
-    """Compute raw metrics for one operator (helper for value-score)."""
-    outages = db.query(Outage).filter(
-        Outage.operator_id == op.id,
-        Outage.start_time.isnot(None),
-        Outage.end_time.isnot(None),
-        Outage.start_time >= since,
-    ).all()
-    mttrs = []
-    services_set = set()
-    sla_compliant = 0
-    sla_total = 0
-    for o in outages:
-        m = _calculate_mttr_hours(o)
-        if m is None:
-            continue
-        mttrs.append(m)
-        if o.affected_services:
-            for svc in o.affected_services:
-                services_set.add(str(svc).lower())
-        threshold = get_threshold(DEFAULT_BENCHMARK, (o.severity or "unknown").lower())
-        sla_total += 1
-        if m <= threshold:
-            sla_compliant += 1
-    months = max(safe_days / 30.0, 0.1)
-    return {
-        "mean_mttr": float(np.mean(mttrs)) if mttrs else 0.0,
-        "frequency": len(mttrs) / months,
-        "total_downtime": float(sum(mttrs)),
-        "service_coverage": len(services_set),
-        "sla_compliance": (sla_compliant / sla_total * 100) if sla_total > 0 else 0.0,
-        "sample_size": len(mttrs),
-    }
+@router.get("/sla-matrix", response_model=SLAMatrixResponse)
+@cached_response
+def get_sla_matrix(
+    db: Annotated[Session, Depends(get_db)],
+    days: int = Query(default=DEFAULT_DAYS, ge=DAYS_MIN, le=DAYS_MAX),
+):
+    """RQ3: SLA compliance against every benchmark at once.
+
+    Same per-benchmark payload as /sla-compliance, for all entries of
+    SLA_THRESHOLDS_HOURS, so benchmarks can be compared side by side
+    from one request and one pass over the durations.
+    """
+    safe_days = _clamp_days(days)
+    benchmarks = list(SLA_THRESHOLDS_HOURS)
+    snapshots = {b: research.stored_snapshot(db, "sla_compliance", safe_days, b) for b in benchmarks}
+    if all(snapshot is not None for snapshot in snapshots.values()):
+        return SLAMatrixResponse(days=safe_days, benchmarks=snapshots)
+    data = load_mttr_dataset(db, safe_days)
+    return SLAMatrixResponse(days=safe_days, benchmarks=research.sla_matrix(data, research.research_operators(db), benchmarks))
 
 
 @router.get("/value-score", response_model=List[ValueScoreResult])
+@cached_response
 def get_value_score(
     db: Annotated[Session, Depends(get_db)],
     days: int = Query(default=DEFAULT_DAYS, ge=DAYS_MIN, le=DAYS_MAX),
@@ -326,135 +246,249 @@ def get_value_score(
     per CVS_WEIGHTS to yield a 0-100 score.
     """
     safe_days = _clamp_days(days)
-    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=safe_days)
-    operators = [op for op in db.query(Operator).all()
-                 if not (op.name and op.name.lower() == "tele2")]
-    raw = {op.name: _calculate_operator_metrics(db, op, since, safe_days) for op in operators}
-    if not raw:
-        return []
-    # Determine best/worst per metric for normalization
-    def _bw(key, lower_is_better):
-        vals = [m[key] for m in raw.values() if m["sample_size"] > 0]
-        if not vals:
-            return (0.0, 0.0)
-        return (min(vals), max(vals)) if lower_is_better else (max(vals), min(vals))
-    bw = {
-        "mttr": _bw("mean_mttr", True),
-        "frequency": _bw("frequency", True),
-        "downtime": _bw("total_downtime", True),
-        "service_coverage": _bw("service_coverage", False),
-        "sla_compliance": _bw("sla_compliance", False),
-    }
-    scored = []
-    for op_name, m in raw.items():
-        if m["sample_size"] == 0:
-            scored.append(ValueScoreResult(
-                operator_name=op_name, composite_score=0.0, rank=0,
-                components=[], interpretation="Insufficient data",
-            ))
-            continue
-        components = []
-        composite = 0.0
-        mappings = [
-            ("mttr", "mean_mttr", True),
-            ("frequency", "frequency", True),
-            ("downtime", "total_downtime", True),
-            ("service_coverage", "service_coverage", False),
-            ("sla_compliance", "sla_compliance", False),
-        ]
-        for weight_key, raw_key, lower_better in mappings:
-            best, worst = bw[weight_key]
-            norm = _normalize_score(m[raw_key], best, worst, lower_better)
-            w = CVS_WEIGHTS[weight_key]
-            weighted = norm * w
-            composite += weighted
-            components.append(ValueScoreComponent(
-                metric=weight_key,
-                raw_value=round(m[raw_key], 2),
-                normalized_score=round(norm, 2),
-                weight=w,
-                weighted_score=round(weighted, 2),
-            ))
-        scored.append(ValueScoreResult(
-            operator_name=op_name,
-            composite_score=round(composite, 2),
-            rank=0,
-            components=components,
-            interpretation=_interpret_score(composite),
-        ))
-    # Assign ranks (1 = best)
-    scored.sort(key=lambda r: r.composite_score, reverse=True)
-    for i, r in enumerate(scored):
-        r.rank = i + 1
-    return scored
+    snapshot = research.stored_snapshot(db, "value_score", safe_days)
+    if snapshot is not None:
+        return snapshot
+    data = load_mttr_dataset(db, safe_days)
+    return research.value_score(data, research.research_operators(db), safe_days)
+
+
+@router.get("/value-score/sensitivity", response_model=ValueScoreSensitivity)
+@cached_response
+def get_value_score_sensitivity(
+    db: Annotated[Session, Depends(get_db)],
+    days: int = Query(default=DEFAULT_DAYS, ge=DAYS_MIN, le=DAYS_MAX),
+    samples: int = Query(default=SENSITIVITY_SAMPLES, ge=1000, le=SENSITIVITY_MAX_SAMPLES),
+    concentration: Optional[float] = Query(
+        default=None, gt=0, le=10000,
+        description="Omit for uniform weights over the simplex; otherwise Dirichlet centred on CVS_WEIGHTS",
+    ),
+):
+    """RQ2: How stable is the CVS ranking under other weightings?
+
+    Draws `samples` weight vectors from a Dirichlet distribution (uniform,
+    or with mean CVS_WEIGHTS and total concentration `concentration`) and
+    scores every operator under all of them with one (samples x
+    components) @ (components x operators) product. Reports, per
+    operator, the probability of each rank and of keeping its
+    CVS_WEIGHTS rank.
+    """
+    safe_days = _clamp_days(days)
+    data = load_mttr_dataset(db, safe_days)
+    raw = {op.name: research.operator_metrics(data, op, safe_days) for op in research.research_operators(db)}
+    names, normalized = research.cvs_components(raw)
+    n_ops = len(names)
+    if n_ops == 0:
+        return ValueScoreSensitivity(days=safe_days, samples=samples, concentration=concentration,
+                                     seed=RANDOM_SEED, p_ranking_unchanged=1.0, operators=[])
+
+    base_weights = np.array([CVS_WEIGHTS[key] for key, _, _ in CVS_COMPONENTS])
+    alpha = np.ones(len(base_weights)) if concentration is None else concentration * base_weights / base_weights.sum()
+    weights = np.random.default_rng(RANDOM_SEED).dirichlet(alpha, size=samples)
+    scores = weights @ normalized.T                          # samples x operators
+    ranks = np.argsort(np.argsort(-scores, axis=1, kind="stable"), axis=1, kind="stable")  # 0 = best
+
+    baseline_scores = normalized @ base_weights
+    baseline_ranks = np.argsort(np.argsort(-baseline_scores, kind="stable"), kind="stable")
+    rank_probabilities = np.stack([np.bincount(ranks[:, i], minlength=n_ops) for i in range(n_ops)]) / samples
+    score_quantiles = np.percentile(scores, [5, 50, 95], axis=0)
+
+    operators_out = [
+        OperatorRankStability(
+            operator_name=name,
+            baseline_rank=int(baseline_ranks[i]) + 1,
+            baseline_score=round(float(baseline_scores[i]), 2),
+            rank_probabilities=[round(float(p), 4) for p in rank_probabilities[i]],
+            p_baseline_rank=round(float(rank_probabilities[i, baseline_ranks[i]]), 4),
+            expected_rank=round(float(ranks[:, i].mean()) + 1, 3),
+            score_p05=round(float(score_quantiles[0, i]), 2),
+            score_p50=round(float(score_quantiles[1, i]), 2),
+            score_p95=round(float(score_quantiles[2, i]), 2),
+        )
+        for i, name in enumerate(names)
+    ]
+    operators_out.sort(key=lambda o: o.baseline_rank)
+    return ValueScoreSensitivity(
+        days=safe_days,
+        samples=samples,
+        concentration=concentration,
+        seed=RANDOM_SEED,
+        p_ranking_unchanged=round(float((ranks == baseline_ranks[None, :]).all(axis=1).mean()), 4),
+        operators=operators_out,
+    )
 
 
 @router.get("/statistical-test", response_model=StatisticalTestResult)
+@cached_response
 def get_statistical_test(
     db: Annotated[Session, Depends(get_db)],
     days: int = Query(default=DEFAULT_DAYS, ge=DAYS_MIN, le=DAYS_MAX),
     test: str = Query(default="kruskal", pattern="^(kruskal|anova)$"),
+    correction: str = Query(default="holm", pattern=f"^({'|'.join(CORRECTIONS)})$"),
+    permutations: int = Query(default=0, ge=0, le=PERMUTATIONS_MAX,
+                              description="Label permutations for an exact-style omnibus p-value; 0 skips it"),
 ):
     """Non-parametric (Kruskal-Wallis H) or parametric (one-way ANOVA)
     test for differences in MTTR between operators.
 
     Default is Kruskal-Wallis because MTTR distributions are typically
     skewed (log-normal) and ANOVA assumptions of normality are violated.
-    Effect size reported as eta-squared (eta^2).
+    Effect size reported as eta-squared (eta^2). Every operator pair also
+    gets a Dunn test (Holm or Bonferroni adjusted) and Cliff's delta.
     """
     safe_days = _clamp_days(days)
-    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=safe_days)
-    operators = db.query(Operator).all()
-    groups = []
-    labels = []
-    sample_sizes = {}
-    for op in operators:
-        if op.name and op.name.lower() == "tele2":
+    if correction == "holm" and permutations == 0:
+        snapshot = research.stored_snapshot(db, "statistical_test", safe_days, test)
+        if snapshot is not None:
+            return snapshot
+    data = load_mttr_dataset(db, safe_days)
+    return research.statistical_test(data, research.research_operators(db), test, correction, permutations)
+
+
+BUNDLE_SECTIONS = ("percentiles", "distribution", "sla_compliance", "value_score", "statistical_test")
+
+
+@router.get("/bundle", response_model=ResearchBundle, responses={400: {"description": "Unknown section"}})
+@cached_response
+def get_research_bundle(
+    db: Annotated[Session, Depends(get_db)],
+    days: int = Query(default=DEFAULT_DAYS, ge=DAYS_MIN, le=DAYS_MAX),
+    benchmark: str = Query(default=DEFAULT_BENCHMARK),
+    sections: str = Query(default=",".join(BUNDLE_SECTIONS), description="Comma-separated subset of sections"),
+    bins: int = Query(default=HISTOGRAM_BINS, ge=5, le=50),
+    test: str = Query(default="kruskal", pattern="^(kruskal|anova)$"),
+):
+    """Everything the research dashboard shows, in one request.
+
+    Sections with a current snapshot are served from it; the rest share
+    one load of the MTTR dataset and the operator list, so the whole page
+    costs at most one DB scan. Section payloads match the individual
+    endpoints with their default parameters, except `percentiles`, which
+    is always the exact variant (`/mttr-percentiles?exact=true`).
+    """
+    requested = [s.strip() for s in sections.split(",") if s.strip()]
+    unknown = [s for s in requested if s not in BUNDLE_SECTIONS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown sections: {', '.join(unknown) or '(none)'}. Allowed: {', '.join(BUNDLE_SECTIONS)}",
+        )
+    if benchmark not in SLA_THRESHOLDS_HOURS:
+        benchmark = DEFAULT_BENCHMARK
+    safe_days = _clamp_days(days)
+    variants = {"sla_compliance": benchmark, "statistical_test": test}
+    results = {}
+    for section in dict.fromkeys(requested):
+        if section == "distribution" and bins != HISTOGRAM_BINS:
             continue
-        mttrs = _fetch_operator_mttrs(db, op.id, since)
-        if len(mttrs) >= 5:
-            groups.append(mttrs)
-            labels.append(op.name)
-            sample_sizes[op.name] = len(mttrs)
+        snapshot = research.stored_snapshot(db, section, safe_days, variants.get(section, ""))
+        if snapshot is not None:
+            results[section] = snapshot
+    missing = [section for section in dict.fromkeys(requested) if section not in results]
+    if missing:
+        data = load_mttr_dataset(db, safe_days)
+        computed = research.views(data, research.research_operators(db), safe_days, bins=bins, benchmark=benchmark, test=test)
+        for section in missing:
+            results[section] = computed[section]()
+    return ResearchBundle(days=safe_days, benchmark=benchmark, **results)
+
+
+def _survival_data(db, safe_days):
+    """Restoration times in the window, with active outages right-censored at their age.
+
+    Returns (operator_ids, severities, hours, events); the MTTR sanity
+    rule (0 < hours <= MTTR_SANITY_MAX_HOURS) applies to both kinds.
+    Resolved outages without an end_time carry no duration and are skipped.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    since = now - timedelta(days=safe_days)
+    rows = db.query(
+        Outage.operator_id, Outage.severity, Outage.status, Outage.start_time, Outage.end_time,
+    ).filter(
+        Outage.start_time.isnot(None),
+        Outage.start_time >= since,
+        Outage.end_time.isnot(None) | (Outage.status != "resolved") | Outage.status.is_(None),
+    ).all()
+    starts = np.array([_strip_tz(r.start_time) for r in rows], dtype="datetime64[us]")
+    ends = np.array([_strip_tz(r.end_time) if r.end_time else now for r in rows], dtype="datetime64[us]")
+    events = np.array([r.end_time is not None for r in rows], dtype=bool)
+    hours = ((ends - starts).astype(np.int64) / 1e6) / 3600.0
+    valid = (hours > 0) & (hours <= MTTR_SANITY_MAX_HOURS)
+    operator_ids = np.array([r.operator_id or 0 for r in rows], dtype=np.int64)
+    severities = np.array([(r.severity or "unknown").lower() for r in rows], dtype=object)
+    return operator_ids[valid], severities[valid], hours[valid], events[valid]
+
+
+def _survival_curve(name, severity, hours, events, max_points):
+    km = KMCurve(hours, events)
+    idx = km.thinned(max_points)
+    median = km.median()
+    return SurvivalCurve(
+        operator_name=name,
+        severity=severity,
+        sample_size=km.n,
+        events=km.events,
+        censored=km.censored,
+        median_hours=round(median, 2) if median is not None else None,
+        times=[round(float(t), 3) for t in km.times[idx]],
+        survival=[round(float(v), 4) for v in km.survival[idx]],
+        ci_low=[round(float(v), 4) for v in km.ci_low[idx]],
+        ci_high=[round(float(v), 4) for v in km.ci_high[idx]],
+        at_risk=[int(v) for v in km.at_risk[idx]],
+    )
+
+
+@router.get("/survival", response_model=SurvivalResponse)
+@cached_response
+def get_survival(
+    db: Annotated[Session, Depends(get_db)],
+    days: int = Query(default=DEFAULT_DAYS, ge=DAYS_MIN, le=DAYS_MAX),
+    by_severity: bool = Query(default=True, description="Also return one curve per operator and severity"),
+    max_points: int = Query(default=SURVIVAL_MAX_POINTS, ge=10, le=2000),
+):
+    """RQ1: Kaplan-Meier restoration curves per operator, censoring active outages.
+
+    Dropping unresolved outages (as MTTR does) biases toward short
+    incidents; here they count as "not restored after t hours". Curves
+    are thinned to at most `max_points` step vertices. Operators are
+    compared with a k-sample log-rank test plus pairwise log-rank tests
+    (Holm-adjusted).
+    """
+    safe_days = _clamp_days(days)
+    operator_ids, severities, hours, events = _survival_data(db, safe_days)
+    order = np.argsort(operator_ids, kind="stable")
+    operator_ids, severities, hours, events = operator_ids[order], severities[order], hours[order], events[order]
+
+    curves, groups = [], []
+    for op in research.research_operators(db):
+        lo, hi = np.searchsorted(operator_ids, [op.id, op.id + 1])
+        if hi - lo < SURVIVAL_MIN_SAMPLES:
+            continue
+        op_hours, op_events, op_severities = hours[lo:hi], events[lo:hi], severities[lo:hi]
+        curves.append(_survival_curve(op.name, None, op_hours, op_events, max_points))
+        groups.append((op.name, op_hours, op_events))
+        if by_severity:
+            for sev in dict.fromkeys(op_severities):
+                mask = op_severities == sev
+                if mask.sum() >= SURVIVAL_MIN_SAMPLES:
+                    curves.append(_survival_curve(op.name, sev, op_hours[mask], op_events[mask], max_points))
+
     if len(groups) < 2:
-        return StatisticalTestResult(
-            test_name=test,
-            statistic=0.0, p_value=1.0, significant=False,
-            interpretation="Insufficient operators with data (need >=2).",
-            sample_sizes=sample_sizes, effect_size=None,
-        )
-    if test == "anova":
-        stat, p = scistats.f_oneway(*groups)
-        test_name = "One-way ANOVA (F-test)"
-    else:
-        stat, p = scistats.kruskal(*groups)
-        test_name = "Kruskal-Wallis H test"
-    # Eta-squared effect size: H / (n - 1) for Kruskal; SS_between/SS_total for ANOVA
-    total_n = sum(len(g) for g in groups)
-    if test == "kruskal":
-        eta_sq = float(stat / (total_n - 1)) if total_n > 1 else None
-    else:
-        grand_mean = float(np.mean([v for g in groups for v in g]))
-        ss_between = sum(len(g) * (float(np.mean(g)) - grand_mean) ** 2 for g in groups)
-        ss_total = sum((v - grand_mean) ** 2 for g in groups for v in g)
-        eta_sq = float(ss_between / ss_total) if ss_total > 0 else None
-    sig = bool(p < 0.05)
-    if sig:
-        interp = (
-            f"Significant difference in MTTR between operators (p={p:.4f} < 0.05). "
-            f"Reject H0: at least one operator's distribution differs."
-        )
-    else:
-        interp = (
-            f"No significant difference detected (p={p:.4f} >= 0.05). "
-            f"Fail to reject H0: MTTR distributions are statistically similar."
-        )
-    return StatisticalTestResult(
-        test_name=test_name,
-        statistic=round(float(stat), 4),
-        p_value=round(float(p), 6),
-        significant=sig,
-        interpretation=interp,
-        sample_sizes=sample_sizes,
-        effect_size=round(eta_sq, 4) if eta_sq is not None else None,
+        return SurvivalResponse(days=safe_days, curves=curves)
+    statistic, df, p = logrank([(h, e) for _, h, e in groups])
+    overall = LogRankResult(
+        groups=[name for name, _, _ in groups],
+        statistic=round(statistic, 4), df=df, p_value=round(p, 6), significant=bool(p < 0.05),
     )
+    pairs = [(a, b) for i, a in enumerate(groups) for b in groups[i + 1:]]
+    tests = [logrank([(a[1], a[2]), (b[1], b[2])]) for a, b in pairs]
+    adjusted = holm([p for _, _, p in tests])
+    pairwise = [
+        LogRankResult(
+            groups=[a[0], b[0]],
+            statistic=round(stat, 4), df=df_pair, p_value=round(p, 6),
+            p_adjusted=round(p_adj, 6), significant=bool(p_adj < 0.05),
+        )
+        for (a, b), (stat, df_pair, p), p_adj in zip(pairs, tests, adjusted)
+    ]
+    return SurvivalResponse(days=safe_days, curves=curves, overall=overall, pairwise=pairwise)
@@ -0,0 +1,238 @@
+"""
+Server-Sent Events stream of live outage changes.
+
+A single in-process broadcaster tails the outage_events log whenever the data
+generation moves and fans each new transition out to every connected client:
+
+- Several writers (scheduler, Actions runner, admin edits) can commit
+  concurrently, so a lower event id may become visible after a higher one.
+  The tail therefore re-reads a trailing window of STREAM_LAG_SECONDS of
+  occurred_at on every poll and skips ids it has already published, and it
+  keeps polling for that long after the last new event even if the
+  generation looks unchanged. A writer transaction open longer than the lag
+  can still be missed.
+- `created`, `status_changed`, `resolved` and `eta_changed` events carry the
+  outage and its previous status.
+- Polling runs only while someone is subscribed. When it starts (or resumes
+  after the last subscriber left) the tail is seeded from the newest
+  occurred_at minus STREAM_LAG_SECONDS, so neither the whole log nor the
+  backlog of the pause is published as live events.
+- Event ids are "<epoch>-<seq>"; reconnecting clients send Last-Event-ID and
+  are replayed what they missed from a bounded buffer, or get a `resync` event
+  when that is no longer possible (buffer overrun, server restart, or a pause
+  in polling since their last event).
+- Each subscriber has a bounded queue. A client that falls behind is
+  disconnected instead of buffering without limit; EventSource reconnects
+  and resumes from its Last-Event-ID.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from datetime import timedelta
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from scrapers.db.connection import SessionLocal
+from scrapers.db.generation import current_generation
+from scrapers.db.models import Outage, OutageEvent
+from .outages import _map_to_outage_response
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/stream", tags=["stream"])
+
+POLL_SECONDS = 2
+HEARTBEAT_SECONDS = 15
+RETRY_MS = 3000
+REPLAY_BUFFER_SIZE = 1000
+SUBSCRIBER_QUEUE_SIZE = 256
+CHANGE_BATCH = 500
+STREAM_LAG_SECONDS = 300
+
+
+class _Subscriber:
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+
+class OutageBroadcaster:
+    """Fans outage change events out to SSE subscribers. Runs on the event loop."""
+
+    def __init__(self):
+        self._epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._buffer = deque(maxlen=REPLAY_BUFFER_SIZE)
+        self._subscribers = set()
+        self._task = None
+        self._needs_seed = True  # set when polling (re)starts, cleared by the poll
+        # Tail state, only touched by the poll running in the worker thread
+        self._seen = {}  # event id -> occurred_at, for the trailing window
+        self._high_water = None
+        self._settle_until = 0.0
+        self._generation = None
+
+    def _frame(self, seq: int, event: str, data: dict) -> str:
+        return f"id: {self._epoch}-{seq}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+    def _replay(self, last_event_id: Optional[str]):
+        """Frames after last_event_id, or None when the gap cannot be filled."""
+        if not last_event_id:
+            return []
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self._epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        oldest = self._buffer[0][0] if self._buffer else self._seq + 1
+        if seq < oldest - 1 or seq > self._seq:
+            return None
+        return [frame for s, frame in self._buffer if s > seq]
+
+    def subscribe(self, last_event_id: Optional[str]):
+        subscriber = _Subscriber()
+        paused = self._task is None or self._task.done()
+        replay = self._replay(last_event_id)
+        if replay is None or (paused and last_event_id):
+            # Events committed while nobody was polling are never published
+            replay = [self._frame(self._seq, "resync", {})]
+        self._subscribers.add(subscriber)
+        if paused:
+            self._needs_seed = True
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return subscriber, replay
+
+    def unsubscribe(self, subscriber: _Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def publish(self, event: str, data: dict):
+        self._seq += 1
+        frame = self._frame(self._seq, event, data)
+        self._buffer.append((self._seq, frame))
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                subscriber.overflowed = True
+                self._subscribers.discard(subscriber)
+
+    async def _run(self):
+        while self._subscribers:
+            try:
+                events = await run_in_threadpool(self._poll)
+            except Exception:
+                logger.exception("Outage stream poll failed")
+                events = []
+            for event, data in events:
+                self.publish(event, data)
+            await asyncio.sleep(POLL_SECONDS)
+
+    def _seed(self, db):
+        """Start the tail at the newest event: the trailing window counts as published."""
+        self._seen = {}
+        self._settle_until = 0.0
+        self._high_water = db.query(func.max(OutageEvent.occurred_at)).scalar()
+        if self._high_water is not None:
+            self._new_event_ids(db)
+
+    def _new_event_ids(self, db):
+        """Ids in the trailing window not published yet, oldest first; updates the window."""
+        query = db.query(OutageEvent.id, OutageEvent.occurred_at)
+        if self._high_water is not None:
+            query = query.filter(OutageEvent.occurred_at >= self._high_water - timedelta(seconds=STREAM_LAG_SECONDS))
+        new_ids = []
+        for event_id, occurred_at in query.order_by(OutageEvent.occurred_at, OutageEvent.id):
+            if event_id not in self._seen:
+                self._seen[event_id] = occurred_at
+                new_ids.append(event_id)
+            if self._high_water is None or occurred_at > self._high_water:
+                self._high_water = occurred_at
+        if self._high_water is not None:
+            horizon = self._high_water - timedelta(seconds=STREAM_LAG_SECONDS)
+            self._seen = {i: ts for i, ts in self._seen.items() if ts >= horizon}
+        return new_ids
+
+    def _poll(self):
+        db = SessionLocal()
+        try:
+            generation = current_generation(db)
+            if self._needs_seed:
+                self._needs_seed = False
+                self._seed(db)
+                self._generation = generation
+                return []
+            if generation == self._generation and time.monotonic() >= self._settle_until:
+                return []
+
+            events = []
+            new_ids = self._new_event_ids(db)
+            if new_ids:
+                # A writer that started earlier may still commit events inside the window
+                self._settle_until = time.monotonic() + STREAM_LAG_SECONDS
+            for i in range(0, len(new_ids), CHANGE_BATCH):
+                batch = new_ids[i:i + CHANGE_BATCH]
+                rows = db.query(OutageEvent).options(
+                    joinedload(OutageEvent.outage).joinedload(Outage.operator),
+                    joinedload(OutageEvent.outage).joinedload(Outage.region),
+                ).filter(OutageEvent.id.in_(batch)).all()
+                by_id = {e.id: e for e in rows}
+                for event_id in batch:
+                    e = by_id.get(event_id)
+                    if e is None or e.outage is None:
+                        continue
+                    events.append((e.event_type, {
+                        "outage": jsonable_encoder(_map_to_outage_response(e.outage)),
+                        "previous_status": e.old_status,
+                    }))
+            self._generation = generation
+            return events
+        finally:
+            db.close()
+
+
+broadcaster = OutageBroadcaster()
+
+
+@router.get("/outages", response_class=StreamingResponse)
+async def stream_outages(
+    request: Request,
+    last_event_id: Annotated[Optional[str], Header()] = None,
+):
+    """
+    Live outage created / status_changed / resolved / eta_changed events (text/event-stream).
+
+    A comment line is sent every 15 s when idle to keep proxies from closing
+    the connection.
+    """
+    subscriber, replay = broadcaster.subscribe(last_event_id)
+
+    async def events():
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            for frame in replay:
+                yield frame
+            while not subscriber.overflowed:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield frame
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
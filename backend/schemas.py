@@ -74,6 +74,37 @@ class OutageResponse(BaseModel):
 
     model_config = {"extra": "ignore"}
 
+class PointGeometry(BaseModel):
+    type: str = "Point"
+    coordinates: List[float] # [lon, lat]
+
+class ClusterProperties(BaseModel):
+    cluster: bool
+    point_count: int
+    operators: Dict[str, int] # operator name -> outage count
+    cluster_id: Optional[str] = None # "zoom/x/y" grid cell, clusters only
+    expansion_zoom: Optional[int] = None # unset at the max zoom, where outage_ids lists the members
+    outage_ids: Optional[List[int]] = None # co-located outages of a cluster at the max zoom
+    outage_id: Optional[int] = None # single outages only
+    operator_name: Optional[str] = None
+    status: Optional[str] = None
+    severity: Optional[str] = None
+
+class ClusterFeature(BaseModel):
+    type: str = "Feature"
+    geometry: PointGeometry
+    properties: ClusterProperties
+
+class ClusterFeatureCollection(BaseModel):
+    type: str = "FeatureCollection"
+    zoom: int
+    features: List[ClusterFeature]
+
+class OutageChangesResponse(BaseModel):
+    changes: List[OutageResponse]
+    cursor: Optional[str] = None
+    has_more: bool = False
+
 class ReportCreate(BaseModel):
     operator_name: Optional[str] = Field(default=None, max_length=50)
     title: str = Field(min_length=3, max_length=160)
@@ -111,6 +142,44 @@ class HistoricalTrendResponse(BaseModel):
     total_count: int
     trend: List[DailyTrend]
 
+class ConcurrencySeries(BaseModel):
+    operator_name: str
+    counts: List[int]
+    max_concurrent: int
+
+class ConcurrencyResponse(BaseModel):
+    step_seconds: int
+    timestamps: List[datetime]
+    series: List[ConcurrencySeries]
+
+class MTTRSeries(BaseModel):
+    operator_name: str
+    outage_count: List[int]                   # outages resolved in the window
+    mean_mttr_hours: List[Optional[float]]    # None when nothing was resolved
+    median_mttr_hours: List[Optional[float]]
+    downtime_hours: List[float]               # overlapping outages merged
+
+class RegionMatrixCell(BaseModel):
+    outage_count: int
+    downtime_hours: float                     # overlapping outages merged
+    median_mttr_hours: Optional[float] = None
+
+class RegionMatrixRow(BaseModel):
+    region_id: int
+    name: Dict[str, str]
+    cells: List[RegionMatrixCell]             # one per operator, in `operators` order
+
+class RegionMatrixResponse(BaseModel):
+    days: int
+    operators: List[str]
+    regions: List[RegionMatrixRow]
+
+class MTTRSeriesResponse(BaseModel):
+    window: str
+    step: str
+    timestamps: List[datetime]                # window end of each point
+    series: List[MTTRSeries]
+
 class Token(BaseModel):
     access_token: str
     token_type: str
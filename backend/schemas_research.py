@@ -8,13 +8,19 @@ from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 
+class ConfidenceInterval(BaseModel):
+    low: float
+    high: float
+
+
 class PercentileStats(BaseModel):
     """Distribution percentiles for MTTR analysis.
 
     Used in /analytics/mttr-percentiles. Reports central tendency,
     dispersion (std_dev), and 95% confidence intervals computed via
-    bootstrap resampling (n=1000) to support inferential claims in the
-    research paper.
+    bootstrap resampling (percentile or BCa, 1000 resamples by default)
+    to support inferential claims in the research paper. Sketch-based
+    results (`exact=False`) report a t-interval for the mean instead.
     """
     operator_name: str
     sample_size: int
@@ -27,8 +33,12 @@ class PercentileStats(BaseModel):
     std_dev: float
     min_value: float
     max_value: float
-    ci_95_low: float       # 95% CI lower bound
+    ci_95_low: float       # 95% CI lower bound (mean)
     ci_95_high: float
+    ci_method: str = "percentile"
+    bootstrap_iterations: int = 1000
+    confidence_intervals: Dict[str, ConfidenceInterval] = {}  # keyed by mean / median / p95
+    exact: bool = True     # False: percentiles estimated from quantile sketches
 
 
 class HistogramBin(BaseModel):
@@ -73,6 +83,18 @@ class ValueScoreResult(BaseModel):
     interpretation: str              # Excellent / Good / Fair / Poor
 
 
+class PairwiseComparison(BaseModel):
+    """Dunn post-hoc test and Cliff's delta for one pair of operators."""
+    operator_a: str
+    operator_b: str
+    z: float
+    p_value: float
+    p_adjusted: float
+    significant: bool
+    cliffs_delta: float              # > 0: operator_a tends to restore slower
+    effect_magnitude: str            # negligible | small | medium | large
+
+
 class StatisticalTestResult(BaseModel):
     """Result of a between-operator statistical comparison."""
     test_name: str
@@ -82,3 +104,85 @@ class StatisticalTestResult(BaseModel):
     interpretation: str
     sample_sizes: Dict[str, int]
     effect_size: Optional[float] = None
+    correction: Optional[str] = None
+    pairwise: List[PairwiseComparison] = []
+    permutations: int = 0
+    permutation_p_value: Optional[float] = None
+
+
+class ResearchBundle(BaseModel):
+    """All research results for one window, computed from a single dataset load.
+
+    Sections not requested via `?sections=` are null.
+    """
+    days: int
+    benchmark: str
+    percentiles: Optional[List[PercentileStats]] = None
+    distribution: Optional[List[DistributionResponse]] = None
+    sla_compliance: Optional[List[SLAComplianceResult]] = None
+    value_score: Optional[List[ValueScoreResult]] = None
+    statistical_test: Optional[StatisticalTestResult] = None
+
+
+class SurvivalCurve(BaseModel):
+    """Kaplan-Meier restoration curve for one operator (and severity).
+
+    Active outages are right-censored at their current age. `survival[i]`
+    is the probability an outage is still unresolved after `times[i]`
+    hours, with a 95% log(-log) Greenwood band.
+    """
+    operator_name: str
+    severity: Optional[str] = None   # None = all severities
+    sample_size: int
+    events: int                      # restored outages
+    censored: int                    # still active
+    median_hours: Optional[float] = None  # None when S(t) never reaches 0.5
+    times: List[float]
+    survival: List[float]
+    ci_low: List[float]
+    ci_high: List[float]
+    at_risk: List[int]
+
+
+class LogRankResult(BaseModel):
+    groups: List[str]
+    statistic: float                 # chi-square
+    df: int
+    p_value: float
+    p_adjusted: Optional[float] = None  # Holm, for pairwise comparisons
+    significant: bool
+
+
+class SurvivalResponse(BaseModel):
+    days: int
+    curves: List[SurvivalCurve]
+    overall: Optional[LogRankResult] = None
+    pairwise: List[LogRankResult] = []
+
+
+class SLAMatrixResponse(BaseModel):
+    """SLA compliance for every benchmark, keyed by benchmark id."""
+    days: int
+    benchmarks: Dict[str, List[SLAComplianceResult]]
+
+
+class OperatorRankStability(BaseModel):
+    operator_name: str
+    baseline_rank: int               # rank under CVS_WEIGHTS (1 = best)
+    baseline_score: float
+    rank_probabilities: List[float]  # [P(rank 1), P(rank 2), ...]
+    p_baseline_rank: float
+    expected_rank: float
+    score_p05: float
+    score_p50: float
+    score_p95: float
+
+
+class ValueScoreSensitivity(BaseModel):
+    """Monte Carlo stability of the CVS ranking under Dirichlet-sampled weights."""
+    days: int
+    samples: int
+    concentration: Optional[float] = None  # None = uniform over the weight simplex
+    seed: int
+    p_ranking_unchanged: float       # share of samples reproducing the whole baseline ranking
+    operators: List[OperatorRankStability]
@@ -0,0 +1,139 @@
+"""
+Point-in-time queries over outage history.
+
+`OutageIntervalIndex` keeps every outage's [start_time, end_time) interval in
+memory and rebuilds it once per data generation:
+
+- a centered interval tree answers "what was active at T?" in O(log n + k);
+- per-operator sorted start/end arrays give the number of concurrent outages
+  at any instant with two binary searches, so a whole step function is one
+  vectorized `searchsorted` per operator.
+
+Outages without an end_time count as ongoing unless they are resolved (then
+the end is unknown and they are left out).
+"""
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from scrapers.db.generation import current_generation
+from scrapers.db.models import Outage
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(dt: datetime) -> float:
+    """Seconds since the epoch; naive datetimes are taken to be UTC."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH).total_seconds()
+
+
+class _Node:
+    __slots__ = ("center", "starts", "by_start", "ends", "by_end", "left", "right")
+
+
+def _build_tree(starts: np.ndarray, ends: np.ndarray, idx: np.ndarray) -> Optional[_Node]:
+    if len(idx) == 0:
+        return None
+    node = _Node()
+    # Median start: at most half of idx starts after it, and at most half ends
+    # at or before it (those intervals start before it too), so each child gets
+    # at most half and the depth is O(log n). For an even count the center is
+    # the mean of the two middle starts and may lie in no interval at all.
+    node.center = float(np.median(starts[idx]))
+    here = (starts[idx] <= node.center) & (ends[idx] > node.center)
+    mine = idx[here]
+    order = np.argsort(starts[mine], kind="stable")
+    node.starts, node.by_start = starts[mine][order], mine[order]
+    order = np.argsort(ends[mine], kind="stable")
+    node.ends, node.by_end = ends[mine][order], mine[order]
+    node.left = _build_tree(starts, ends, idx[ends[idx] <= node.center])
+    node.right = _build_tree(starts, ends, idx[starts[idx] > node.center])
+    return node
+
+
+class OutageIntervalIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = None
+        self._snapshot = None
+
+    def _fresh_snapshot(self, db: Session):
+        generation = current_generation(db)
+        if generation == self._generation:
+            return self._snapshot
+        with self._lock:
+            if generation != self._generation:
+                self._snapshot = self._build(db)
+                self._generation = generation
+            return self._snapshot
+
+    @staticmethod
+    def _build(db: Session):
+        rows = db.query(
+            Outage.id, Outage.operator_id, Outage.start_time, Outage.end_time,
+            Outage.status, Outage.dedup_key,
+        ).filter(Outage.start_time.isnot(None)).all()
+
+        ids, operator_ids, starts, ends, keys = [], [], [], [], []
+        for outage_id, operator_id, start, end, status, dedup_key in rows:
+            if end is None and status == "resolved":
+                continue
+            st = to_epoch(start)
+            et = to_epoch(end) if end is not None else np.inf
+            if et <= st:
+                continue
+            ids.append(outage_id)
+            operator_ids.append(operator_id or 0)
+            starts.append(st)
+            ends.append(et)
+            keys.append(dedup_key or f"id:{outage_id}")
+
+        ids = np.array(ids, dtype=np.int64)
+        operator_ids = np.array(operator_ids, dtype=np.int64)
+        starts = np.array(starts, dtype=float)
+        ends = np.array(ends, dtype=float)
+        tree = _build_tree(starts, ends, np.arange(len(ids)))
+
+        # Duplicate rows (same dedup_key) would double-count concurrency
+        per_operator = {}
+        for operator_id in np.unique(operator_ids):
+            sel = np.flatnonzero(operator_ids == operator_id)
+            _, first = np.unique(np.array([keys[i] for i in sel], dtype=object), return_index=True)
+            sel = sel[first]
+            per_operator[int(operator_id)] = (np.sort(starts[sel]), np.sort(ends[sel]))
+        return tree, ids, operator_ids, per_operator
+
+    def active_at(self, db: Session, ts: datetime, operator_id: Optional[int] = None) -> List[int]:
+        """Ids of outages active at ts (start <= ts < end)."""
+        tree, ids, operator_ids, _ = self._fresh_snapshot(db)
+        t = to_epoch(ts)
+        found = []
+        node = tree
+        while node is not None:
+            if t < node.center:
+                found.append(node.by_start[:np.searchsorted(node.starts, t, side="right")])
+                node = node.left
+            else:
+                found.append(node.by_end[np.searchsorted(node.ends, t, side="right"):])
+                node = node.right
+        idx = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        if operator_id is not None:
+            idx = idx[operator_ids[idx] == operator_id]
+        return sorted(int(i) for i in ids[idx])
+
+    def concurrency(self, db: Session, timestamps: List[datetime]) -> Dict[int, np.ndarray]:
+        """Concurrent (deduplicated) outages per operator id at each timestamp."""
+        _, _, _, per_operator = self._fresh_snapshot(db)
+        t = np.array([to_epoch(ts) for ts in timestamps], dtype=float)
+        return {
+            operator_id: np.searchsorted(starts, t, side="right") - np.searchsorted(ends, t, side="right")
+            for operator_id, (starts, ends) in per_operator.items()
+        }
+
+
+outage_interval_index = OutageIntervalIndex()
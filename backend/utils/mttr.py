@@ -0,0 +1,116 @@
+"""
+Columnar MTTR dataset shared by the research endpoints.
+
+`load_mttr_dataset` runs one query selecting only the columns the statistics
+need, computes durations with NumPy and keeps the rows grouped by operator.
+Service coverage comes from a second query over the indexed outage_services
+table, the same source the service filters use.
+The result is cached per (days, data generation), so percentiles,
+distribution, SLA compliance, value score and the statistical test all reuse
+a single load.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Set
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from scrapers.config import settings
+from scrapers.db.generation import current_generation
+from scrapers.db.models import Outage, OutageService
+from ..cache import ResponseCache
+
+MTTR_SANITY_MAX_HOURS = 720.0  # 30 days — exclude data artifacts from end_time bug
+DATASET_CACHE_MAX_ENTRIES = 16
+
+_dataset_cache = ResponseCache(DATASET_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+def _naive(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=None) if dt.tzinfo else dt
+
+
+class MTTRDataset:
+    """Outages with a valid MTTR in the window, as arrays sorted by (operator, id).
+
+    Attributes are parallel arrays: `outage_ids`, `operator_ids`,
+    `region_ids` (0 when unknown), `hours` (MTTR), `severities` (lowercase,
+    "unknown" when missing) and `start_hours` (start time, hours since the
+    window start). `service_rows` are (outage_id, service) pairs from
+    outage_services; only those of outages kept here count.
+    """
+
+    def __init__(self, days: int, since: datetime, rows, service_rows=()):
+        self.days = days
+        self.since = since
+        outage_ids = np.array([r[0] for r in rows], dtype=np.int64)
+        operator_ids = np.array([r[1] or 0 for r in rows], dtype=np.int64)
+        starts = np.array([_naive(r[2]) for r in rows], dtype="datetime64[us]")
+        ends = np.array([_naive(r[3]) for r in rows], dtype="datetime64[us]")
+        # Same arithmetic as timedelta.total_seconds() / 3600, so results match the row-wise code
+        hours = ((ends - starts).astype(np.int64) / 1e6) / 3600.0
+        valid = (hours > 0) & (hours <= MTTR_SANITY_MAX_HOURS)
+
+        # Stable sort keeps id order within each operator
+        order = np.flatnonzero(valid)
+        order = order[np.argsort(operator_ids[order], kind="stable")]
+        self.outage_ids = outage_ids[order]
+        self.operator_ids = operator_ids[order]
+        self.region_ids = np.array([rows[i][5] or 0 for i in order], dtype=np.int64)
+        self.hours = hours[order]
+        self.start_hours = ((starts[order] - np.datetime64(since, "us")).astype(np.int64) / 1e6) / 3600.0
+        self.severities = np.array([(rows[i][4] or "unknown").lower() for i in order], dtype=object)
+
+        uniq, first, counts = np.unique(self.operator_ids, return_index=True, return_counts=True)
+        self._slices = {int(op): slice(int(f), int(f + c)) for op, f, c in zip(uniq, first, counts)}
+
+        operator_of = dict(zip(self.outage_ids.tolist(), self.operator_ids.tolist()))
+        self._services: Dict[int, Set[str]] = {}
+        for outage_id, service in service_rows:
+            operator_id = operator_of.get(outage_id)
+            if operator_id is not None:
+                self._services.setdefault(operator_id, set()).add(service)
+
+    def __len__(self) -> int:
+        return len(self.hours)
+
+    def rows_for(self, operator_id: int) -> slice:
+        return self._slices.get(operator_id, slice(0, 0))
+
+    def hours_for(self, operator_id: int, region_id: Optional[int] = None) -> np.ndarray:
+        rows = self.rows_for(operator_id)
+        if region_id is None:
+            return self.hours[rows]
+        return self.hours[rows][self.region_ids[rows] == region_id]
+
+    def severities_for(self, operator_id: int) -> np.ndarray:
+        return self.severities[self.rows_for(operator_id)]
+
+    def services_for(self, operator_id: int) -> Set[str]:
+        return self._services.get(operator_id, set())
+
+    def by_operator(self) -> Dict[int, np.ndarray]:
+        return {op: self.hours[rows] for op, rows in self._slices.items()}
+
+
+def _load(db: Session, days: int) -> MTTRDataset:
+    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
+    in_window = (
+        Outage.start_time.isnot(None),
+        Outage.end_time.isnot(None),
+        Outage.start_time >= since,
+    )
+    rows = db.query(
+        Outage.id, Outage.operator_id, Outage.start_time, Outage.end_time,
+        Outage.severity, Outage.region_id,
+    ).filter(*in_window).order_by(Outage.id).all()
+    service_rows = db.query(OutageService.outage_id, OutageService.service).join(
+        Outage, OutageService.outage_id == Outage.id,
+    ).filter(*in_window).all()
+    return MTTRDataset(days, since, rows, service_rows)
+
+
+def load_mttr_dataset(db: Session, days: int) -> MTTRDataset:
+    """Return the (cached) MTTR dataset for the last `days` days."""
+    key = ("mttr", days, current_generation(db))
+    return _dataset_cache.get_or_compute(key, lambda: _load(db, days))
@@ -0,0 +1,112 @@
+"""
+Post-hoc comparisons between operator MTTR groups.
+
+The pooled sample is ranked once (`rankdata`, average ties) and every
+pairwise Dunn z-score is read off the per-group mean ranks, so k groups
+cost one sort regardless of the number of pairs. Cliff's delta uses one
+sort of the second group per pair and `searchsorted` for the dominance
+counts.
+
+For the omnibus permutation test, both Kruskal-Wallis H and the ANOVA F
+are monotone in sum_g(S_g^2 / n_g) for a fixed pooled sample (S_g =
+group sum of ranks or of values), so each permutation only needs its
+group sums: a batch of shuffled rows of the pooled scores is reduced
+over the fixed group segments with one `np.add.reduceat`.
+"""
+from itertools import combinations
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from scipy.stats import norm, rankdata
+
+from .survival import holm
+
+CORRECTIONS = ("holm", "bonferroni")
+PERMUTATION_BATCH_ELEMENTS = 2_000_000  # scores shuffled per batch (rows x pooled n)
+
+
+def adjust(p_values: Sequence[float], correction: str) -> List[float]:
+    if correction == "bonferroni":
+        return np.minimum(np.asarray(p_values, dtype=float) * len(p_values), 1.0).tolist()
+    return holm(p_values)
+
+
+def _pooled(groups: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(pooled values, group label per value, group sizes)."""
+    sizes = np.array([len(g) for g in groups])
+    return np.concatenate(groups), np.repeat(np.arange(len(groups)), sizes), sizes
+
+
+def dunn(groups: Sequence[np.ndarray], correction: str = "holm") -> List[Tuple[int, int, float, float, float]]:
+    """Dunn's test for every pair (i < j): (i, j, z, p, adjusted p), tie-corrected."""
+    pooled, labels, sizes = _pooled(groups)
+    n = len(pooled)
+    ranks = rankdata(pooled)
+    mean_ranks = np.bincount(labels, weights=ranks) / sizes
+    _, ties = np.unique(pooled, return_counts=True)
+    tie_term = float((ties ** 3 - ties).sum()) / (12 * (n - 1))
+    variance = n * (n + 1) / 12 - tie_term
+
+    i, j = np.triu_indices(len(groups), k=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (mean_ranks[i] - mean_ranks[j]) / np.sqrt(variance * (1 / sizes[i] + 1 / sizes[j]))
+    z = np.nan_to_num(z)
+    p = 2 * norm.sf(np.abs(z))
+    adjusted = adjust(p, correction)
+    return [(int(a), int(b), float(zz), float(pp), float(pa))
+            for a, b, zz, pp, pa in zip(i, j, z, p, adjusted)]
+
+
+def cliffs_delta(x: np.ndarray, y: np.ndarray) -> float:
+    """P(X > Y) - P(X < Y); positive when x tends to be larger (slower restoration)."""
+    if len(x) == 0 or len(y) == 0:
+        return 0.0
+    y_sorted = np.sort(y)
+    below = np.searchsorted(y_sorted, x, side="left").sum()
+    above = (len(y) - np.searchsorted(y_sorted, x, side="right")).sum()
+    return float((below - above) / (len(x) * len(y)))
+
+
+def cliffs_magnitude(delta: float) -> str:
+    """Romano et al. (2006) thresholds."""
+    d = abs(delta)
+    if d < 0.147:
+        return "negligible"
+    if d < 0.33:
+        return "small"
+    if d < 0.474:
+        return "medium"
+    return "large"
+
+
+def permutation_test(groups: Sequence[np.ndarray], test: str, permutations: int, seed: int = 42) -> float:
+    """Permutation p-value of the omnibus Kruskal-Wallis (test="kruskal") or ANOVA statistic."""
+    pooled, labels, sizes = _pooled(groups)
+    k, n = len(groups), len(pooled)
+    scores = rankdata(pooled) if test == "kruskal" else pooled
+
+    def between(sums):
+        return (sums ** 2 / sizes).sum(axis=-1)
+
+    observed = between(np.bincount(labels, weights=scores, minlength=k))
+    rng = np.random.default_rng(seed)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    batch = max(1, min(permutations, PERMUTATION_BATCH_ELEMENTS // max(n, 1)))
+    # Reshuffling an already shuffled row is still a uniform permutation, so one buffer serves every batch
+    buffer = np.tile(scores, (batch, 1))
+    extreme = 0
+    done = 0
+    while done < permutations:
+        rows = min(batch, permutations - done)
+        rng.permuted(buffer, axis=1, out=buffer)
+        sums = np.add.reduceat(buffer[:rows], starts, axis=1)
+        # Relative tolerance so permutations tying the observed split count as extreme
+        extreme += int((between(sums) >= observed * (1 - 1e-12)).sum())
+        done += rows
+    return (extreme + 1) / (permutations + 1)
+
+
+def pairwise(groups: Sequence[np.ndarray], correction: str = "holm"):
+    """Dunn results joined with Cliff's delta: (i, j, z, p, adjusted p, delta)."""
+    deltas = {(a, b): cliffs_delta(groups[a], groups[b]) for a, b in combinations(range(len(groups)), 2)}
+    return [(a, b, z, p, pa, deltas[(a, b)]) for a, b, z, p, pa in dunn(groups, correction)]
@@ -0,0 +1,451 @@
+"""
+Research views shared by the API and the scraper's snapshot refresh.
+
+Each view turns one MTTRDataset into the response models the research
+endpoints return. `refresh_research_snapshots` precomputes the standard
+views into research_snapshots after a scraper run, and `stored_snapshot`
+hands a stored payload back to the endpoints while it is current.
+
+The module only needs the database and the stats pool, never the HTTP
+app, so the scraper can use it without the API's configuration (such as
+SECRET_KEY).
+"""
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from scrapers.db.generation import data_marker, database_generation
+from scrapers.db.models import Operator, ResearchSnapshot
+from ..schemas_research import (
+    ConfidenceInterval,
+    DistributionResponse,
+    HistogramBin,
+    PairwiseComparison,
+    PercentileStats,
+    SLAComplianceResult,
+    StatisticalTestResult,
+    ValueScoreComponent,
+    ValueScoreResult,
+)
+from ..sla_standards import CVS_WEIGHTS, DEFAULT_BENCHMARK, SLA_THRESHOLDS_HOURS, get_threshold
+from .bootstrap import bootstrap_ci
+from .mttr import load_mttr_dataset
+from .posthoc import cliffs_magnitude
+from .stats_pool import compare_groups, fit_distributions, stats_pool
+
+BOOTSTRAP_ITERATIONS = 1000
+RANDOM_SEED = 42
+HISTOGRAM_BINS = 20
+SNAPSHOT_WINDOWS = (30, 90, 365, 730)
+STATISTICAL_TESTS = ("kruskal", "anova")
+
+
+def research_operators(db):
+    return [op for op in db.query(Operator).all()
+            if not (op.name and op.name.lower() == "tele2")]
+
+
+def marker_key(marker) -> str:
+    return "|".join(str(part) for part in marker)
+
+
+def stored_snapshot(db, view, days, variant=""):
+    """Stored payload for a standard view, or None if missing or computed from older data."""
+    if days not in SNAPSHOT_WINDOWS:
+        return None
+    row = db.query(ResearchSnapshot.generation, ResearchSnapshot.payload).filter(
+        ResearchSnapshot.view == view,
+        ResearchSnapshot.days == days,
+        ResearchSnapshot.variant == variant,
+    ).first()
+    if row is None or row.generation != marker_key(database_generation(db)):
+        return None
+    return row.payload
+
+
+def _normalize_score(value, best, worst, lower_is_better=True):
+    if worst == best:
+        return 100.0
+    if lower_is_better:
+        score = (worst - value) / (worst - best) * 100
+    else:
+        score = (value - worst) / (best - worst) * 100
+    return float(max(0.0, min(100.0, score)))
+
+
+def _interpret_score(score):
+    if score >= 80:
+        return "Excellent"
+    if score >= 60:
+        return "Good"
+    if score >= 40:
+        return "Fair"
+    return "Poor"
+
+
+def percentiles(data, operators, iterations=BOOTSTRAP_ITERATIONS, ci_method="percentile", statistics=("mean",),
+                 region_id=None):
+    results = []
+    for op in operators:
+        arr = data.hours_for(op.id, region_id)
+        if len(arr) == 0:
+            results.append(PercentileStats(
+                operator_name=op.name, sample_size=0,
+                mean=0.0, median=0.0, p75=0.0, p90=0.0, p95=0.0, p99=0.0,
+                std_dev=0.0, min_value=0.0, max_value=0.0,
+                ci_95_low=0.0, ci_95_high=0.0,
+                ci_method=ci_method, bootstrap_iterations=iterations,
+            ))
+            continue
+        intervals = {
+            st: bootstrap_ci(arr, st, ci_method, iterations, seed=RANDOM_SEED)
+            for st in statistics
+        }
+        ci_low, ci_high = intervals["mean"]
+        results.append(PercentileStats(
+            operator_name=op.name,
+            sample_size=len(arr),
+            mean=round(float(arr.mean()), 2),
+            median=round(float(np.percentile(arr, 50)), 2),
+            p75=round(float(np.percentile(arr, 75)), 2),
+            p90=round(float(np.percentile(arr, 90)), 2),
+            p95=round(float(np.percentile(arr, 95)), 2),
+            p99=round(float(np.percentile(arr, 99)), 2),
+            std_dev=round(float(arr.std(ddof=1)) if len(arr) > 1 else 0.0, 2),
+            min_value=round(float(arr.min()), 2),
+            max_value=round(float(arr.max()), 2),
+            ci_95_low=round(ci_low, 2),
+            ci_95_high=round(ci_high, 2),
+            ci_method=ci_method,
+            bootstrap_iterations=iterations,
+            confidence_intervals={
+                st: ConfidenceInterval(low=round(low, 2), high=round(high, 2))
+                for st, (low, high) in intervals.items()
+            },
+        ))
+    return results
+
+
+def distribution(data, operators, bins=HISTOGRAM_BINS, blocking=False):
+    samples = {op.id: data.hours_for(op.id) for op in operators}
+    # Fitting is the expensive part: one pool job for every operator with enough data
+    fitted = [arr for arr in samples.values() if len(arr) >= 5]
+    fits = iter(stats_pool.run(fit_distributions, fitted, blocking=blocking) if fitted else [])
+    results = []
+    for op in operators:
+        arr = samples[op.id]
+        if len(arr) < 5:
+            results.append(DistributionResponse(
+                operator_name=op.name, sample_size=len(arr), bins=[],
+                distribution_fit=None,
+            ))
+            continue
+        counts, edges = np.histogram(arr, bins=bins)
+        hist_bins = [
+            HistogramBin(
+                bin_start=round(float(edges[i]), 2),
+                bin_end=round(float(edges[i+1]), 2),
+                count=int(counts[i]),
+            )
+            for i in range(len(counts))
+        ]
+        results.append(DistributionResponse(
+            operator_name=op.name,
+            sample_size=len(arr),
+            bins=hist_bins,
+            distribution_fit=next(fits),
+        ))
+    return results
+
+
+def severity_thresholds(benchmark, severities):
+    """Unique severities (in order of first appearance), their thresholds, and row -> level index."""
+    levels, first, inverse = np.unique(severities, return_index=True, return_inverse=True)
+    appearance = np.argsort(first, kind="stable")
+    rank = np.empty_like(appearance)
+    rank[appearance] = np.arange(len(appearance))
+    levels = [str(v) for v in levels[appearance]]
+    thresholds = np.array([get_threshold(benchmark, sev) for sev in levels], dtype=float)
+    return levels, thresholds, rank[inverse].reshape(-1)
+
+
+def sla_matrix(data, operators, benchmarks):
+    """SLA compliance for every (benchmark x operator x severity) cell in one broadcast.
+
+    Severities map to a (benchmarks x levels) threshold matrix; comparing
+    it, gathered per row, against the duration array gives a (benchmarks x
+    outages) compliance mask that bincount reduces to cell counts. Returns
+    {benchmark: [SLAComplianceResult per operator]}.
+    """
+    levels, inverse = np.unique(data.severities.astype(str), return_inverse=True)
+    inverse = inverse.reshape(-1)
+    thresholds = np.array([[get_threshold(b, str(sev)) for sev in levels] for b in benchmarks], dtype=float)
+    n_bench, n_ops, n_levels = len(benchmarks), len(operators), len(levels)
+
+    position = np.full(len(data), -1, dtype=np.int64)
+    for i, op in enumerate(operators):
+        position[data.rows_for(op.id)] = i
+    rows = np.flatnonzero(position >= 0)
+    cell = position[rows] * n_levels + inverse[rows]
+    n_cells = n_ops * n_levels
+
+    hours = data.hours[rows]
+    compliant = hours[None, :] <= thresholds[:, inverse[rows]]
+    incidents = np.bincount(cell, minlength=n_cells).reshape(n_ops, n_levels)
+    hour_sums = np.bincount(cell, weights=hours, minlength=n_cells).reshape(n_ops, n_levels)
+    compliant_counts = np.bincount(
+        (np.arange(n_bench)[:, None] * n_cells + cell[None, :]).ravel(),
+        weights=compliant.ravel(), minlength=n_bench * n_cells,
+    ).reshape(n_bench, n_ops, n_levels).astype(np.int64)
+    # Report severities in order of first appearance, as per-operator dicts always have
+    first_seen = np.full(n_cells, len(rows), dtype=np.int64)
+    np.minimum.at(first_seen, cell, np.arange(len(rows)))
+    first_seen = first_seen.reshape(n_ops, n_levels)
+
+    matrix = {}
+    for b, benchmark in enumerate(benchmarks):
+        results = []
+        for i, op in enumerate(operators):
+            present = [j for j in np.argsort(first_seen[i], kind="stable") if incidents[i, j] > 0]
+            total = int(incidents[i].sum())
+            compliant_total = int(compliant_counts[b, i].sum())
+            by_severity_out = {
+                str(levels[j]): {
+                    "threshold_hours": round(float(thresholds[b, j]), 2),
+                    "actual_mean_hours": round(float(hour_sums[i, j] / incidents[i, j]), 2),
+                    "compliance_pct": round(int(compliant_counts[b, i, j]) / int(incidents[i, j]) * 100, 2),
+                    "incidents": float(incidents[i, j]),
+                }
+                for j in present
+            }
+            rate_total = (compliant_total / total * 100) if total > 0 else 0.0
+            results.append(SLAComplianceResult(
+                operator_name=op.name,
+                benchmark=benchmark,
+                total_incidents=total,
+                compliant_count=compliant_total,
+                non_compliant_count=total - compliant_total,
+                compliance_rate_pct=round(rate_total, 2),
+                by_severity=by_severity_out,
+            ))
+        matrix[benchmark] = results
+    return matrix
+
+
+def sla_compliance(data, operators, benchmark=DEFAULT_BENCHMARK):
+    if benchmark not in SLA_THRESHOLDS_HOURS:
+        benchmark = DEFAULT_BENCHMARK
+    return sla_matrix(data, operators, [benchmark])[benchmark]
+
+
+def operator_metrics(data, op, safe_days):
+    """Compute raw metrics for one operator (helper for value-score)."""
+    mttrs = data.hours_for(op.id)
+    levels, thresholds, inverse = severity_thresholds(DEFAULT_BENCHMARK, data.severities_for(op.id))
+    sla_compliant = int((mttrs <= thresholds[inverse]).sum())
+    months = max(safe_days / 30.0, 0.1)
+    return {
+        "mean_mttr": float(np.mean(mttrs)) if len(mttrs) else 0.0,
+        "frequency": len(mttrs) / months,
+        "total_downtime": float(mttrs.sum()),
+        "service_coverage": len(data.services_for(op.id)),
+        "sla_compliance": (sla_compliant / len(mttrs) * 100) if len(mttrs) > 0 else 0.0,
+        "sample_size": len(mttrs),
+    }
+
+
+# (CVS_WEIGHTS key, raw metric, lower is better)
+CVS_COMPONENTS = [
+    ("mttr", "mean_mttr", True),
+    ("frequency", "frequency", True),
+    ("downtime", "total_downtime", True),
+    ("service_coverage", "service_coverage", False),
+    ("sla_compliance", "sla_compliance", False),
+]
+
+
+def cvs_components(raw):
+    """Min-max normalized component scores (0-100) for operators with data.
+
+    Returns (operator names, matrix of shape operators x CVS_COMPONENTS).
+    """
+    names = [name for name, m in raw.items() if m["sample_size"] > 0]
+    matrix = np.zeros((len(names), len(CVS_COMPONENTS)))
+    if not names:
+        return names, matrix
+    for k, (_, raw_key, lower_better) in enumerate(CVS_COMPONENTS):
+        vals = [raw[name][raw_key] for name in names]
+        best, worst = (min(vals), max(vals)) if lower_better else (max(vals), min(vals))
+        for i, value in enumerate(vals):
+            matrix[i, k] = _normalize_score(value, best, worst, lower_better)
+    return names, matrix
+
+
+def value_score(data, operators, safe_days):
+    raw = {op.name: operator_metrics(data, op, safe_days) for op in operators}
+    if not raw:
+        return []
+    names, normalized = cvs_components(raw)
+    row_of = {name: i for i, name in enumerate(names)}
+    scored = []
+    for op_name, m in raw.items():
+        if m["sample_size"] == 0:
+            scored.append(ValueScoreResult(
+                operator_name=op_name, composite_score=0.0, rank=0,
+                components=[], interpretation="Insufficient data",
+            ))
+            continue
+        components = []
+        composite = 0.0
+        for k, (weight_key, raw_key, _) in enumerate(CVS_COMPONENTS):
+            norm = float(normalized[row_of[op_name], k])
+            w = CVS_WEIGHTS[weight_key]
+            weighted = norm * w
+            composite += weighted
+            components.append(ValueScoreComponent(
+                metric=weight_key,
+                raw_value=round(m[raw_key], 2),
+                normalized_score=round(norm, 2),
+                weight=w,
+                weighted_score=round(weighted, 2),
+            ))
+        scored.append(ValueScoreResult(
+            operator_name=op_name,
+            composite_score=round(composite, 2),
+            rank=0,
+            components=components,
+            interpretation=_interpret_score(composite),
+        ))
+    # Assign ranks (1 = best)
+    scored.sort(key=lambda r: r.composite_score, reverse=True)
+    for i, r in enumerate(scored):
+        r.rank = i + 1
+    return scored
+
+
+def statistical_test(data, operators, test="kruskal", correction="holm", permutations=0, blocking=False):
+    groups = []
+    labels = []
+    sample_sizes = {}
+    for op in operators:
+        mttrs = data.hours_for(op.id)
+        if len(mttrs) >= 5:
+            groups.append(mttrs)
+            labels.append(op.name)
+            sample_sizes[op.name] = len(mttrs)
+    if len(groups) < 2:
+        return StatisticalTestResult(
+            test_name=test,
+            statistic=0.0, p_value=1.0, significant=False,
+            interpretation="Insufficient operators with data (need >=2).",
+            sample_sizes=sample_sizes, effect_size=None,
+        )
+    stat, p, pairs, permutation_p = stats_pool.run(
+        compare_groups, groups, test, correction, permutations, RANDOM_SEED, blocking=blocking,
+    )
+    test_name = "One-way ANOVA (F-test)" if test == "anova" else "Kruskal-Wallis H test"
+    # Eta-squared effect size: H / (n - 1) for Kruskal; SS_between/SS_total for ANOVA
+    total_n = sum(len(g) for g in groups)
+    if test == "kruskal":
+        eta_sq = float(stat / (total_n - 1)) if total_n > 1 else None
+    else:
+        pooled = np.concatenate(groups)
+        grand_mean = float(np.mean(pooled))
+        ss_between = sum(len(g) * (float(np.mean(g)) - grand_mean) ** 2 for g in groups)
+        ss_total = float(((pooled - grand_mean) ** 2).sum())
+        eta_sq = float(ss_between / ss_total) if ss_total > 0 else None
+    sig = bool(p < 0.05)
+    if sig:
+        interp = (
+            f"Significant difference in MTTR between operators (p={p:.4f} < 0.05). "
+            f"Reject H0: at least one operator's distribution differs."
+        )
+    else:
+        interp = (
+            f"No significant difference detected (p={p:.4f} >= 0.05). "
+            f"Fail to reject H0: MTTR distributions are statistically similar."
+        )
+    return StatisticalTestResult(
+        test_name=test_name,
+        statistic=round(float(stat), 4),
+        p_value=round(float(p), 6),
+        significant=sig,
+        interpretation=interp,
+        sample_sizes=sample_sizes,
+        effect_size=round(eta_sq, 4) if eta_sq is not None else None,
+        correction=correction,
+        pairwise=[
+            PairwiseComparison(
+                operator_a=labels[a],
+                operator_b=labels[b],
+                z=round(z, 4),
+                p_value=round(pp, 6),
+                p_adjusted=round(pa, 6),
+                significant=bool(pa < 0.05),
+                cliffs_delta=round(delta, 4),
+                effect_magnitude=cliffs_magnitude(delta),
+            )
+            for a, b, z, pp, pa, delta in pairs
+        ],
+        permutations=permutations,
+        permutation_p_value=round(permutation_p, 6) if permutation_p is not None else None,
+    )
+
+
+def views(data, operators, safe_days, bins=HISTOGRAM_BINS, benchmark=DEFAULT_BENCHMARK, test="kruskal",
+           blocking=False):
+    """Deferred computation of each section over one dataset.
+
+    `blocking` makes pool-backed sections wait for a worker instead of
+    raising StatsPoolBusy (for the background snapshot refresh).
+    """
+    return {
+        "percentiles": lambda: percentiles(data, operators),
+        "distribution": lambda: distribution(data, operators, bins, blocking),
+        "sla_compliance": lambda: sla_compliance(data, operators, benchmark),
+        "value_score": lambda: value_score(data, operators, safe_days),
+        "statistical_test": lambda: statistical_test(data, operators, test, blocking=blocking),
+    }
+
+
+def _store_snapshot(db, view, days, variant, generation, payload, duration_ms):
+    row = db.query(ResearchSnapshot).filter(
+        ResearchSnapshot.view == view,
+        ResearchSnapshot.days == days,
+        ResearchSnapshot.variant == variant,
+    ).first()
+    if row is None:
+        row = ResearchSnapshot(view=view, days=days, variant=variant)
+        db.add(row)
+    row.generation = generation
+    row.payload = payload
+    row.computed_at = datetime.now(timezone.utc)
+    row.duration_ms = duration_ms
+
+
+def refresh_research_snapshots(db: Session) -> int:
+    """Precompute the standard research views; called after each scraper run.
+
+    Covers every window in SNAPSHOT_WINDOWS with default parameters, every
+    SLA benchmark and both statistical tests. Returns the number of
+    snapshots written.
+    """
+    generation = marker_key(data_marker(db))
+    operators = research_operators(db)
+    written = 0
+    for days in SNAPSHOT_WINDOWS:
+        data = load_mttr_dataset(db, days)
+        jobs = [("percentiles", "", {}), ("distribution", "", {}), ("value_score", "", {})]
+        jobs += [("sla_compliance", benchmark, {"benchmark": benchmark}) for benchmark in SLA_THRESHOLDS_HOURS]
+        jobs += [("statistical_test", test, {"test": test}) for test in STATISTICAL_TESTS]
+        for section, variant, kwargs in jobs:
+            started = time.perf_counter()
+            payload = jsonable_encoder(views(data, operators, days, blocking=True, **kwargs)[section]())
+            _store_snapshot(db, section, days, variant, generation, payload,
+                            round((time.perf_counter() - started) * 1000, 2))
+            written += 1
+    db.commit()
+    return written
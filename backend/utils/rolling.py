@@ -0,0 +1,75 @@
+"""
+Rolling-window statistics over event times.
+
+All windows of a series are evaluated together: events are sorted once by
+time, each window (t - W, t] becomes an index range [lo, hi) from two
+`searchsorted` calls, and window sums are differences of one cumulative
+sum. Medians slide a sorted buffer across the ranges; since both bounds
+only move forward, every event is inserted and removed exactly once.
+Covered (merged) time uses the same trick on the union of intervals: a
+cumulative covered-length array answers "hours covered up to x" by binary
+search.
+"""
+from bisect import bisect_left, insort
+from typing import Tuple
+
+import numpy as np
+
+
+def window_bounds(times: np.ndarray, points: np.ndarray, window: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Index ranges [lo, hi) of sorted `times` falling in (t - window, t] for each point t."""
+    return (np.searchsorted(times, points - window, side="right"),
+            np.searchsorted(times, points, side="right"))
+
+
+def window_sums(values: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    return cumulative[hi] - cumulative[lo]
+
+
+def rolling_median(values: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """Median of values[lo:hi] per range (NaN when empty); lo and hi must be non-decreasing."""
+    out = np.full(len(lo), np.nan)
+    vals = values.tolist()
+    window: list = []
+    added = removed = 0
+    for k, (start, stop) in enumerate(zip(lo.tolist(), hi.tolist())):
+        while added < stop:
+            insort(window, vals[added])
+            added += 1
+        while removed < start:
+            del window[bisect_left(window, vals[removed])]
+            removed += 1
+        m = len(window)
+        if m:
+            out[k] = window[m // 2] if m % 2 else (window[m // 2 - 1] + window[m // 2]) / 2
+    return out
+
+
+class Coverage:
+    """Union of [start, end) intervals with O(log n) "covered length up to x" queries."""
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        order = np.argsort(starts, kind="stable")
+        starts, ends = starts[order], ends[order]
+        if len(starts):
+            reach = np.maximum.accumulate(ends)
+            # A new block starts where an interval begins after everything before it ended
+            first = np.flatnonzero(np.concatenate(([True], starts[1:] > reach[:-1])))
+            self.starts = starts[first]
+            self.ends = np.maximum.reduceat(ends, first)
+        else:
+            self.starts = self.ends = np.empty(0)
+        self._before = np.concatenate(([0.0], np.cumsum(self.ends - self.starts)))
+
+    def upto(self, x: np.ndarray) -> np.ndarray:
+        if len(self.starts) == 0:
+            return np.zeros(len(x))
+        block = np.searchsorted(self.starts, x, side="right") - 1
+        safe = np.maximum(block, 0)
+        partial = np.clip(x - self.starts[safe], 0, self.ends[safe] - self.starts[safe])
+        return np.where(block >= 0, self._before[safe] + partial, 0.0)
+
+    def between(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Covered length inside each [a, b]."""
+        return self.upto(b) - self.upto(a)
@@ -0,0 +1,322 @@
+"""
+Mergeable MTTR quantile sketches.
+
+`TDigest` is a merging t-digest (Dunning & Ertl 2019) with the k1 scale
+function: centroids are small at the tails and large around the median,
+so P95/P99 stay accurate with ~COMPRESSION/2 centroids. Compression is a
+single vectorized pass (sort, cumulative weight, bin by scale function),
+which also makes merging any number of digests one concatenate + compress.
+Count, sum, sum of squares, min and max are tracked exactly.
+
+`MTTRSketchIndex` keeps one digest per (operator, month) and per
+(operator, region, month) in memory, bucketed by start month. It follows
+the outages change feed (updated_at, as in /outages/changes), so an
+outage that resolves or is corrected only rebuilds its month bucket.
+Writers stamp updated_at before they commit, so like the SSE stream the
+feed re-reads a trailing SKETCH_LAG_SECONDS window on every sync, skips
+(id, updated_at) pairs it has already applied, and keeps syncing for that
+long after the last change even if the generation looks unchanged. A
+window is answered by merging the whole months it covers plus the raw
+rows of the partial first month, so cost depends on the number of months,
+not the number of outages. Rows deleted by retention cleanup are dropped
+at the periodic full rebuild.
+
+Full rebuilds scan the whole table, so they run as a stats pool job
+(`build_index_state`) rather than in the request. Only the first build
+waits for it; the periodic rebuild runs from a background thread while
+requests keep using the current buckets, which are swapped out once the
+new ones are ready. The first build runs without holding the bucket
+lock; concurrent first requests wait for that one build.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from scrapers.db.connection import SessionLocal
+from scrapers.db.generation import current_generation
+from scrapers.db.models import Outage
+from .mttr import MTTR_SANITY_MAX_HOURS
+from .stats_pool import stats_pool
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION = 500
+FULL_REBUILD_SECONDS = 6 * 3600
+SKETCH_LAG_SECONDS = 300
+ALL_REGIONS = 0  # region key of the operator-wide bucket (region ids start at 1)
+
+
+class TDigest:
+    __slots__ = ("means", "weights", "count", "total", "total_sq", "min", "max")
+
+    def __init__(self, means=None, weights=None, count=0, total=0.0, total_sq=0.0,
+                 min_value=np.inf, max_value=-np.inf):
+        self.means = np.empty(0) if means is None else means
+        self.weights = np.empty(0) if weights is None else weights
+        self.count = count
+        self.total = total
+        self.total_sq = total_sq
+        self.min = min_value
+        self.max = max_value
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, compression: int = COMPRESSION) -> "TDigest":
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return cls()
+        means, weights = _compress(np.sort(values), np.ones(len(values)), compression)
+        return cls(means, weights, len(values), float(values.sum()), float((values ** 2).sum()),
+                   float(values.min()), float(values.max()))
+
+    @classmethod
+    def merge(cls, digests: Iterable["TDigest"], compression: int = COMPRESSION) -> "TDigest":
+        digests = [d for d in digests if d.count]
+        if not digests:
+            return cls()
+        if len(digests) == 1:
+            return digests[0]
+        means = np.concatenate([d.means for d in digests])
+        weights = np.concatenate([d.weights for d in digests])
+        order = np.argsort(means, kind="stable")
+        means, weights = _compress(means[order], weights[order], compression)
+        return cls(
+            means, weights,
+            sum(d.count for d in digests),
+            sum(d.total for d in digests),
+            sum(d.total_sq for d in digests),
+            min(d.min for d in digests),
+            max(d.max for d in digests),
+        )
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile; exact (linear interpolation, like np.percentile) while uncompressed."""
+        if self.count == 0:
+            return float("nan")
+        centers = np.cumsum(self.weights) - self.weights / 2
+        # Order statistic i sits at position i + 0.5, so singletons reproduce np.percentile
+        position = q * (self.count - 1) + 0.5
+        xs = np.concatenate(([0.0], centers, [float(self.count)]))
+        ys = np.concatenate(([self.min], self.means, [self.max]))
+        return float(np.interp(position, xs, ys))
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1)."""
+        if self.count < 2:
+            return 0.0
+        var = (self.total_sq - self.count * self.mean ** 2) / (self.count - 1)
+        return float(np.sqrt(max(var, 0.0)))
+
+
+def _compress(means: np.ndarray, weights: np.ndarray, compression: int):
+    """Merge sorted centroids whose k1-scale positions fall in the same unit bin."""
+    if len(means) <= 1:
+        return means, weights
+    cumulative = np.cumsum(weights)
+    q = (cumulative - weights / 2) / cumulative[-1]
+    k = compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+    bins = np.floor(k - k[0]).astype(np.int64)
+    starts = np.flatnonzero(np.concatenate(([True], bins[1:] != bins[:-1])))
+    merged_weights = np.add.reduceat(weights, starts)
+    return np.add.reduceat(means * weights, starts) / merged_weights, merged_weights
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _month(dt: datetime) -> int:
+    return dt.year * 12 + dt.month - 1
+
+
+def _month_start(month: int) -> datetime:
+    return datetime(month // 12, month % 12 + 1, 1)
+
+
+def _valid_hours(rows):
+    """(rows, hours) for rows with a sane MTTR; rows are (..., start_time, end_time) tuples."""
+    kept, hours = [], []
+    for row in rows:
+        h = (_naive_utc(row[-1]) - _naive_utc(row[-2])).total_seconds() / 3600.0
+        if 0 < h <= MTTR_SANITY_MAX_HOURS:
+            kept.append(row)
+            hours.append(h)
+    return kept, np.array(hours, dtype=float)
+
+
+class MTTRSketchIndex:
+    def __init__(self, compression: int = COMPRESSION):
+        self.compression = compression
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()        # serialises the first build only
+        self._generation = None
+        self._built_at = None
+        self._rebuilding = False
+        self._high_water = None                    # newest updated_at applied
+        self._seen: Dict[int, datetime] = {}       # outage id -> updated_at applied, for the trailing window
+        self._settle_until = 0.0
+        self._buckets: Dict[Tuple[int, int], Dict[int, TDigest]] = {}  # (operator, region) -> month -> digest
+        self._bucket_of: Dict[int, Tuple[int, int]] = {}               # outage id -> (operator, month)
+
+    def _sync(self, db: Session):
+        if self._built_at is None:
+            with self._build_lock:
+                if self._built_at is None:
+                    state = stats_pool.run(build_index_state, self.compression, blocking=True)
+                    with self._lock:
+                        self._install(state)
+        elif time.monotonic() - self._built_at > FULL_REBUILD_SECONDS:
+            self._start_rebuild()
+        generation = current_generation(db)
+        if generation == self._generation and time.monotonic() >= self._settle_until:
+            return
+        with self._lock:
+            self._apply_changes(db)
+            self._generation = generation
+
+    def _install(self, state):
+        """Swap in (buckets, bucket_of, high_water) from build_index_state; caller holds the lock."""
+        self._buckets, self._bucket_of, self._high_water = state
+        self._built_at = time.monotonic()
+        # The scan may predate changes already applied, so the whole window is replayed on the next sync
+        self._seen = {}
+        self._generation = None
+
+    def _start_rebuild(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_in_background, name="mttr-sketch-rebuild", daemon=True).start()
+
+    def _rebuild_in_background(self):
+        try:
+            state = stats_pool.run(build_index_state, self.compression, blocking=True)
+            with self._lock:
+                self._install(state)
+        except Exception:
+            logger.exception("MTTR sketch rebuild failed; keeping the current buckets")
+            # Retry after another full period instead of on every request
+            self._built_at = time.monotonic()
+        finally:
+            self._rebuilding = False
+
+    @staticmethod
+    def _latest_change(db: Session) -> Optional[datetime]:
+        return db.query(func.max(Outage.updated_at)).scalar()
+
+    def _add_digests(self, rows, hours):
+        """Build bucket digests for rows of (id, operator_id, region_id, start_time, end_time)."""
+        groups: Dict[Tuple[int, int, int], list] = {}
+        for (_, operator_id, region_id, start, _), h in zip(rows, hours):
+            month = _month(_naive_utc(start))
+            groups.setdefault((operator_id or 0, ALL_REGIONS, month), []).append(h)
+            if region_id:
+                groups.setdefault((operator_id or 0, region_id, month), []).append(h)
+        for (operator_id, region_id, month), values in groups.items():
+            digest = TDigest.from_values(np.array(values), self.compression)
+            self._buckets.setdefault((operator_id, region_id), {})[month] = digest
+
+    def _query_rows(self, db: Session):
+        return db.query(
+            Outage.id, Outage.operator_id, Outage.region_id, Outage.start_time, Outage.end_time,
+        ).filter(Outage.start_time.isnot(None), Outage.end_time.isnot(None))
+
+    def _rebuild_all(self, db: Session):
+        # Read the high-water mark first: changes made during the scan are re-applied later
+        latest = self._latest_change(db)
+        rows, hours = _valid_hours(self._query_rows(db).all())
+        self._buckets = {}
+        self._add_digests(rows, hours)
+        self._bucket_of = {row[0]: (row[1] or 0, _month(_naive_utc(row[3]))) for row in rows}
+        self._high_water = latest
+        self._built_at = time.monotonic()
+
+    def _apply_changes(self, db: Session):
+        """Rebuild the buckets of rows changed in the trailing window that were not applied yet."""
+        query = db.query(Outage.id, Outage.operator_id, Outage.start_time, Outage.updated_at).filter(
+            Outage.updated_at.isnot(None)
+        )
+        if self._high_water is not None:
+            query = query.filter(Outage.updated_at >= self._high_water - timedelta(seconds=SKETCH_LAG_SECONDS))
+        dirty = set()
+        for outage_id, operator_id, start, updated_at in query.all():
+            if self._seen.get(outage_id) == updated_at:
+                continue
+            self._seen[outage_id] = updated_at
+            if outage_id in self._bucket_of:
+                dirty.add(self._bucket_of.pop(outage_id))
+            if start is not None:
+                dirty.add((operator_id or 0, _month(_naive_utc(start))))
+            if self._high_water is None or updated_at > self._high_water:
+                self._high_water = updated_at
+        for operator_id, month in dirty:
+            self._rebuild_bucket(db, operator_id, month)
+        if dirty:
+            # A writer that started earlier may still commit rows inside the window
+            self._settle_until = time.monotonic() + SKETCH_LAG_SECONDS
+        if self._high_water is not None:
+            horizon = self._high_water - timedelta(seconds=SKETCH_LAG_SECONDS)
+            self._seen = {i: ts for i, ts in self._seen.items() if ts >= horizon}
+
+    def _rebuild_bucket(self, db: Session, operator_id: int, month: int):
+        for (op, _), months in self._buckets.items():
+            if op == operator_id:
+                months.pop(month, None)
+        rows, hours = _valid_hours(self._query_rows(db).filter(
+            Outage.operator_id == (operator_id or None),
+            Outage.start_time >= _month_start(month),
+            Outage.start_time < _month_start(month + 1),
+        ).all())
+        self._add_digests(rows, hours)
+        for row in rows:
+            self._bucket_of[row[0]] = (operator_id, month)
+
+    def window(self, db: Session, operator_id: int, since: datetime,
+               region_id: Optional[int] = None) -> TDigest:
+        """Digest of MTTRs for outages of one operator starting at or after `since`."""
+        self._sync(db)
+        since = _naive_utc(since)
+        region = region_id or ALL_REGIONS
+        first_full = _month(since) + (0 if since == _month_start(_month(since)) else 1)
+        with self._lock:
+            months = self._buckets.get((operator_id, region), {})
+            digests = [d for month, d in months.items() if month >= first_full]
+
+        # The partial first month comes from the raw rows, so windows match the exact path
+        query = self._query_rows(db).filter(
+            Outage.operator_id == operator_id,
+            Outage.start_time >= since,
+            Outage.start_time < _month_start(first_full),
+        )
+        if region_id:
+            query = query.filter(Outage.region_id == region_id)
+        _, hours = _valid_hours(query.all())
+        digests.append(TDigest.from_values(hours, self.compression))
+        return TDigest.merge(digests, self.compression)
+
+
+def build_index_state(compression: int = COMPRESSION):
+    """Stats pool job: full scan into (buckets, bucket_of, high_water) for MTTRSketchIndex._install."""
+    db = SessionLocal()
+    try:
+        index = MTTRSketchIndex(compression)
+        index._rebuild_all(db)
+        return index._buckets, index._bucket_of, index._high_water
+    finally:
+        db.close()
+
+
+mttr_sketch_index = MTTRSketchIndex()
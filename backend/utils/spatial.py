@@ -0,0 +1,290 @@
+"""
+Geospatial helpers for "outages near me" queries.
+
+- `bounding_box` turns a radius into a lat/lon box so SQL can prefilter on the
+  indexed coordinate columns.
+- `haversine_km` computes great-circle distances for a whole candidate array.
+- `ActiveOutageIndex` keeps a KD-tree of active outages in memory and only
+  rebuilds it when the active set changes.
+- `ActiveOutageClusters` keeps a hierarchical grid of the same set for
+  server-side map clustering.
+"""
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from scrapers.db.models import Outage, Operator
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+CLUSTER_MAX_ZOOM = 16
+CLUSTER_CELLS_PER_TILE = 4  # ~64 px cells on 256 px tiles
+
+
+def haversine_km(lat: float, lon: float, lats, lons) -> np.ndarray:
+    """Great-circle distance in km from (lat, lon) to every point in lats/lons."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2 = np.radians(np.asarray(lats, dtype=float))
+    lon2 = np.radians(np.asarray(lons, dtype=float))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def wrap_longitude(lon: float) -> float:
+    """Normalise a longitude to [-180, 180)."""
+    return (lon + 180.0) % 360.0 - 180.0
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """Return (min_lat, max_lat, west, east) enclosing the search circle.
+
+    Longitudes are wrapped to [-180, 180); west > east means the box crosses
+    the antimeridian (see `longitude_between`).
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(lat))
+    # Near the poles a degree of longitude collapses; fall back to the full range.
+    dlon = 180.0 if cos_lat < 1e-6 else min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 180.0)
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    if dlon >= 180.0:
+        return (min_lat, max_lat, -180.0, 180.0)
+    return (min_lat, max_lat, wrap_longitude(lon - dlon), wrap_longitude(lon + dlon))
+
+
+def longitude_between(column, west: float, east: float):
+    """SQL predicate for west <= column <= east, split in two when the range crosses the antimeridian."""
+    if west <= east:
+        return column.between(west, east)
+    return or_(column >= west, column <= east)
+
+
+def _to_unit_xyz(lats, lons) -> np.ndarray:
+    lat_r = np.radians(np.asarray(lats, dtype=float))
+    lon_r = np.radians(np.asarray(lons, dtype=float))
+    return np.column_stack((np.cos(lat_r) * np.cos(lon_r), np.cos(lat_r) * np.sin(lon_r), np.sin(lat_r)))
+
+
+def _chord_for_km(distance_km: float) -> float:
+    """Chord length on the unit sphere matching a great-circle distance."""
+    return 2.0 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2.0)
+
+
+def _mercator_xy(lats, lons) -> Tuple[np.ndarray, np.ndarray]:
+    """Project to Web Mercator unit square (x, y in [0, 1), y grows southwards)."""
+    x = (np.asarray(lons, dtype=float) + 180.0) / 360.0
+    sin_lat = np.clip(np.sin(np.radians(np.asarray(lats, dtype=float))), -0.9999, 0.9999)
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return np.clip(x, 0.0, 1.0 - 1e-12), np.clip(y, 0.0, 1.0 - 1e-12)
+
+
+class _ActiveOutageCache(ABC):
+    """Base for in-memory structures built over non-resolved outages with coordinates.
+
+    The structure is rebuilt only when the (count, max updated_at) signature of
+    the active set changes; readers always see one consistent snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature = None
+        self._snapshot = None
+
+    @staticmethod
+    def _active_filter():
+        return (
+            Outage.status != "resolved",
+            Outage.latitude.isnot(None),
+            Outage.longitude.isnot(None),
+        )
+
+    @abstractmethod
+    def _build(self, rows):
+        """Turn the active rows into the snapshot served to readers."""
+
+    def _fresh_snapshot(self, db: Session):
+        signature = tuple(db.query(func.count(Outage.id), func.max(Outage.updated_at))
+                          .filter(*self._active_filter()).one())
+        if signature == self._signature:
+            return self._snapshot
+        with self._lock:
+            if signature != self._signature:
+                rows = db.query(
+                    Outage.id, Outage.latitude, Outage.longitude, Outage.operator_id,
+                    Operator.name, Outage.status, Outage.severity,
+                ).outerjoin(Operator, Outage.operator_id == Operator.id).filter(*self._active_filter()).all()
+                self._snapshot = self._build(rows) if rows else None
+                self._signature = signature
+            return self._snapshot
+
+
+class ActiveOutageIndex(_ActiveOutageCache):
+    """KD-tree of active outages for radius / k-nearest searches.
+
+    Points are stored as unit-sphere XYZ vectors, so Euclidean chord distance in
+    the tree is monotonic with great-circle distance.
+    """
+
+    def _build(self, rows):
+        lats = np.array([r[1] for r in rows], dtype=float)
+        lons = np.array([r[2] for r in rows], dtype=float)
+        return (
+            cKDTree(_to_unit_xyz(lats, lons)),
+            np.array([r[0] for r in rows], dtype=np.int64),
+            lats,
+            lons,
+            np.array([r[3] or 0 for r in rows], dtype=np.int64),
+            np.array([str(r[5] or "active") for r in rows], dtype=object),
+        )
+
+    def nearest(self, db: Session, lat: float, lon: float, radius_km: float,
+                k: Optional[int] = None, operator_id: Optional[int] = None,
+                status: Optional[str] = None) -> List[Tuple[int, float]]:
+        """Return up to k (outage_id, distance_km) pairs within radius_km, nearest first."""
+        snapshot = self._fresh_snapshot(db)
+        if snapshot is None:
+            return []
+        tree, ids, lats, lons, operator_ids, statuses = snapshot
+        point = _to_unit_xyz([lat], [lon])[0]
+        # Small tolerance so points exactly on the radius survive float rounding
+        idx = np.asarray(tree.query_ball_point(point, r=_chord_for_km(radius_km) * (1 + 1e-9)), dtype=np.int64)
+        if operator_id is not None:
+            idx = idx[operator_ids[idx] == operator_id]
+        if status is not None:
+            idx = idx[statuses[idx] == status]
+        dists = haversine_km(lat, lon, lats[idx], lons[idx])
+        keep = dists <= radius_km
+        idx, dists = idx[keep], dists[keep]
+        order = np.argsort(dists, kind="stable")[:k]
+        return [(int(ids[i]), float(d)) for i, d in zip(idx[order], dists[order])]
+
+
+class ActiveOutageClusters(_ActiveOutageCache):
+    """Hierarchical Web Mercator grid of active outages for map clustering.
+
+    The finest level has CLUSTER_CELLS_PER_TILE x CLUSTER_CELLS_PER_TILE cells
+    per map tile at CLUSTER_MAX_ZOOM. Each coarser level merges 2x2 child cells,
+    carrying counts, coordinate sums (for the centroid) and per-operator counts.
+    Clusters that still hold several outages at CLUSTER_MAX_ZOOM (co-located
+    points) cannot be split further and list their outage ids instead.
+    """
+
+    def _build(self, rows):
+        lats = np.array([r[1] for r in rows], dtype=float)
+        lons = np.array([r[2] for r in rows], dtype=float)
+        operators = sorted({r[4] or "unknown" for r in rows})
+        op_idx = np.array([operators.index(r[4] or "unknown") for r in rows], dtype=np.int64)
+        points = {
+            "ids": np.array([r[0] for r in rows], dtype=np.int64),
+            "operator_names": np.array([r[4] or "unknown" for r in rows], dtype=object),
+            "statuses": np.array([str(r[5] or "active") for r in rows], dtype=object),
+            "severities": np.array([str(r[6]) if r[6] else None for r in rows], dtype=object),
+        }
+
+        x, y = _mercator_xy(lats, lons)
+        grid = (2 ** CLUSTER_MAX_ZOOM) * CLUSTER_CELLS_PER_TILE
+        cx = np.floor(x * grid).astype(np.int64)
+        cy = np.floor(y * grid).astype(np.int64)
+        level = {
+            "cx": cx, "cy": cy,
+            "count": np.ones(len(rows), dtype=np.int64),
+            "lat_sum": lats, "lon_sum": lons,
+            "op_counts": np.eye(len(operators), dtype=np.int64)[op_idx],
+            "first": np.arange(len(rows), dtype=np.int64),
+        }
+
+        # Points grouped by finest cell, in the cell order _merge produces, for leaf listings
+        _, cell = np.unique(cx * grid + cy, return_inverse=True)
+        points["leaves"] = np.argsort(cell.ravel(), kind="stable")
+
+        levels = {}
+        for zoom in range(CLUSTER_MAX_ZOOM, -1, -1):
+            level = self._merge(level, grid)
+            levels[zoom] = level
+            grid //= 2
+            level = dict(level, cx=level["cx"] // 2, cy=level["cy"] // 2)
+        levels[CLUSTER_MAX_ZOOM]["leaf_offsets"] = np.concatenate(([0], np.cumsum(levels[CLUSTER_MAX_ZOOM]["count"])))
+        return operators, points, levels
+
+    @staticmethod
+    def _merge(level, grid):
+        keys = level["cx"] * grid + level["cy"]
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        n = len(uniq)
+        count = np.bincount(inverse, weights=level["count"], minlength=n).astype(np.int64)
+        op_counts = np.zeros((n, level["op_counts"].shape[1]), dtype=np.int64)
+        np.add.at(op_counts, inverse, level["op_counts"])
+        first = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first, inverse, level["first"])
+        lat_sum = np.bincount(inverse, weights=level["lat_sum"], minlength=n)
+        lon_sum = np.bincount(inverse, weights=level["lon_sum"], minlength=n)
+        return {
+            "cx": uniq // grid, "cy": uniq % grid,
+            "count": count, "lat_sum": lat_sum, "lon_sum": lon_sum,
+            "op_counts": op_counts, "first": first,
+            "lat": lat_sum / count, "lon": lon_sum / count,
+        }
+
+    def query(self, db: Session, zoom: int, bbox: Optional[Tuple[float, float, float, float]] = None) -> List[dict]:
+        """Return GeoJSON features for the clusters whose centroid lies in bbox.
+
+        bbox is (min_lon, min_lat, max_lon, max_lat), as in GeoJSON; min_lon >
+        max_lon, or longitudes outside [-180, 180] from a wrapped map, mean the
+        box crosses the antimeridian.
+        """
+        snapshot = self._fresh_snapshot(db)
+        if snapshot is None:
+            return []
+        operators, points, levels = snapshot
+        zoom = max(0, min(zoom, CLUSTER_MAX_ZOOM))
+        level = levels[zoom]
+        selected = np.arange(len(level["count"]))
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            mask = (level["lat"] >= min_lat) & (level["lat"] <= max_lat)
+            if max_lon - min_lon < 360.0:
+                west, east = wrap_longitude(min_lon), wrap_longitude(max_lon)
+                if west <= east:
+                    mask &= (level["lon"] >= west) & (level["lon"] <= east)
+                else:  # bbox crosses the antimeridian
+                    mask &= (level["lon"] >= west) | (level["lon"] <= east)
+            selected = np.flatnonzero(mask)
+
+        features = []
+        for i in selected:
+            count = int(level["count"][i])
+            op_counts = level["op_counts"][i]
+            properties = {
+                "cluster": count > 1,
+                "point_count": count,
+                "operators": {operators[j]: int(op_counts[j]) for j in np.flatnonzero(op_counts)},
+            }
+            if count > 1:
+                properties["cluster_id"] = f"{zoom}/{int(level['cx'][i])}/{int(level['cy'][i])}"
+                if zoom < CLUSTER_MAX_ZOOM:
+                    properties["expansion_zoom"] = zoom + 1
+                else:
+                    offsets = level["leaf_offsets"]
+                    leaves = points["leaves"][offsets[i]:offsets[i + 1]]
+                    properties["outage_ids"] = [int(points["ids"][p]) for p in leaves]
+            else:
+                p = int(level["first"][i])
+                properties["outage_id"] = int(points["ids"][p])
+                properties["operator_name"] = points["operator_names"][p]
+                properties["status"] = points["statuses"][p]
+                properties["severity"] = points["severities"][p]
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [float(level["lon"][i]), float(level["lat"][i])]},
+                "properties": properties,
+            })
+        return features
+
+
+active_outage_index = ActiveOutageIndex()
+active_outage_clusters = ActiveOutageClusters()
@@ -0,0 +1,150 @@
+"""
+Bounded process pool for CPU-heavy research statistics.
+
+Distribution fits and group tests run in worker processes, so the CPU work
+does not hold the API process's GIL. The caller still blocks in
+`future.result()`: the research endpoints are sync, so each request
+waiting on a job occupies one Starlette threadpool thread, and the
+admission limit is what bounds how many can wait.
+
+The pool admits at most STATS_POOL_WORKERS + STATS_POOL_QUEUE_LIMIT jobs at
+a time; beyond that `run` raises StatsPoolBusy instead of queueing without
+bound. A job that exceeds STATS_JOB_TIMEOUT_SECONDS raises
+StatsPoolTimeout; it keeps its admission slot until the worker finishes,
+so runaway jobs still count against the limit. These are plain exceptions
+because the scraper uses the pool too; the API maps them to 503 (with
+Retry-After) and 504.
+
+Workers are spawned (not forked) because the API process runs threads.
+STATS_POOL_WORKERS=0 runs jobs inline, e.g. where subprocesses are not
+allowed.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Sequence
+
+import numpy as np
+from scipy import stats as scistats
+
+from scrapers.config import settings
+from . import posthoc
+
+RETRY_AFTER_SECONDS = 5
+
+
+class StatsPoolError(Exception):
+    """A statistics job could not be run to completion."""
+
+
+class StatsPoolBusy(StatsPoolError):
+    """No admission slot is free, or the workers are restarting; retry after `retry_after` seconds."""
+
+    retry_after = RETRY_AFTER_SECONDS
+
+
+class StatsPoolTimeout(StatsPoolError):
+    """The job ran longer than the pool's timeout."""
+
+
+class StatsPool:
+    def __init__(self, workers: int, queue_limit: int, timeout_seconds: float):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self._slots = threading.BoundedSemaphore(max(1, workers) + queue_limit)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _reset(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, fn, *args, blocking: bool = False):
+        """Run fn(*args) in a worker and return its result.
+
+        Raises StatsPoolBusy when the queue is full (unless `blocking`, used
+        by background jobs that should wait their turn) and StatsPoolTimeout
+        on timeout.
+        """
+        if not self._slots.acquire(blocking=blocking):
+            raise StatsPoolBusy("Statistics workers are busy, please retry shortly")
+        if self.workers == 0:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._reset(executor)
+            raise StatsPoolBusy("Statistics workers restarting, please retry")
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeout:
+            raise StatsPoolTimeout("Statistics computation timed out")
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise StatsPoolBusy("Statistics workers restarting, please retry")
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+stats_pool = StatsPool(
+    settings.STATS_POOL_WORKERS, settings.STATS_POOL_QUEUE_LIMIT, settings.STATS_JOB_TIMEOUT_SECONDS,
+)
+
+
+# Jobs: module-level so they pickle; one job per request keeps IPC to one round trip.
+
+def fit_distributions(samples: Sequence[np.ndarray]) -> List[Optional[str]]:
+    """Better-fitting family (lognormal vs exponential, by log-likelihood) per sample; None below 10 points."""
+    labels = []
+    for arr in samples:
+        label = None
+        try:
+            arr_pos = arr[arr > 0]
+            if len(arr_pos) >= 10:
+                ln_params = scistats.lognorm.fit(arr_pos, floc=0)
+                ln_ll = float(scistats.lognorm.logpdf(arr_pos, *ln_params).sum())
+                ex_params = scistats.expon.fit(arr_pos, floc=0)
+                ex_ll = float(scistats.expon.logpdf(arr_pos, *ex_params).sum())
+                label = "lognormal" if ln_ll > ex_ll else "exponential"
+        except Exception:
+            label = None
+        labels.append(label)
+    return labels
+
+
+def compare_groups(groups: Sequence[np.ndarray], test: str, correction: str = "holm",
+                   permutations: int = 0, seed: int = 42):
+    """One-way ANOVA or Kruskal-Wallis across groups, with post-hoc pairs.
+
+    Returns (statistic, p-value, pairwise rows from posthoc.pairwise,
+    permutation p-value or None when permutations == 0).
+    """
+    if test == "anova":
+        stat, p = scistats.f_oneway(*groups)
+    else:
+        stat, p = scistats.kruskal(*groups)
+    pairs = posthoc.pairwise(groups, correction)
+    permutation_p = posthoc.permutation_test(groups, test, permutations, seed) if permutations else None
+    return float(stat), float(p), pairs, permutation_p
@@ -0,0 +1,19 @@
+"""
+Timestamp normalisation for time-range query parameters.
+
+FastAPI parses ISO 8601 query values into aware datetimes when they carry an
+offset and naive ones when they do not, and the two cannot be compared or
+subtracted. Endpoints document naive bounds as UTC, so every bound goes
+through `as_utc` before it is compared, sampled or used in a filter.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def as_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """`dt` as an aware UTC datetime; naive values are taken to be UTC already."""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
@@ -70,23 +70,28 @@ function useOutageManagement() {
     const [hasMore, setHasMore] = useState(true);
     const PAGE_SIZE = 100;
     const searchTimerRef = useRef(null);
+    // cursorsRef.current[n] is the keyset cursor that starts page n
+    const cursorsRef = useRef([null]);
 
     const fetchOutages = useCallback(async (currentPage = 0, search = searchQuery, operator = filterOperator, status = filterStatus, missingCoords = filterMissingCoords, missingEndDate = filterMissingEndDate) => {
         setOutagesLoading(true);
         try {
-            const params = {
-                limit: PAGE_SIZE,
-                offset: currentPage * PAGE_SIZE,
-            };
+            if (currentPage === 0) {
+                cursorsRef.current = [null];
+            }
+            const params = { limit: PAGE_SIZE };
+            const cursor = cursorsRef.current[currentPage];
+            if (cursor) params.cursor = cursor;
             if (search) params.search = search;
             if (operator) params.operator = operator;
             if (status) params.status = status;
             if (missingCoords) params.missing_coords = true;
             if (missingEndDate) params.missing_end_date = true;
             
-            const data = await api.admin.outages.list(params);
-            setOutages(data);
-            setHasMore(data.length === PAGE_SIZE);
+            const { items, nextCursor } = await api.admin.outages.page(params);
+            cursorsRef.current[currentPage + 1] = nextCursor;
+            setOutages(items);
+            setHasMore(Boolean(nextCursor));
         } catch (err) {
             console.error("Failed to fetch outages:", err);
             addToast(lang === "sv" ? "Kunde inte hämta driftstörningar" : "Failed to fetch outages", "error");
@@ -374,8 +374,20 @@ export default function Home() {
 
   useEffect(() => {
     fetchDashboardData();
-    const interval = setInterval(fetchDashboardData, 5 * 60 * 1000); // 5m
-    return () => clearInterval(interval);
+    if (typeof EventSource === "undefined") {
+      const interval = setInterval(fetchDashboardData, 5 * 60 * 1000); // 5m
+      return () => clearInterval(interval);
+    }
+    // Live updates: refetch once per burst of change events (a scraper run emits many)
+    let refetchTimer = null;
+    const source = api.stream.outages(() => {
+      clearTimeout(refetchTimer);
+      refetchTimer = setTimeout(fetchDashboardData, 2000);
+    });
+    return () => {
+      clearTimeout(refetchTimer);
+      source.close();
+    };
   }, [fetchDashboardData]);
 
   const filteredOutages = useMemo(() => {
@@ -194,15 +194,14 @@ export default function StatisticsPage() {
     const fetchAll = useCallback(async () => {
         setLoading(true);
         try {
-            const params = { days: Number.parseInt(days) };
-            const [pData, dData, tData] = await Promise.all([
-                api.research.mttrPercentiles(params),
-                api.research.mttrDistribution(params),
-                api.research.statisticalTest({ ...params, test: testType }),
-            ]);
-            setPercentiles(pData || []);
-            setDistribution(dData || []);
-            setTestResult(tData);
+            const data = await api.research.bundle({
+                days: Number.parseInt(days),
+                test: testType,
+                sections: "percentiles,distribution,statistical_test",
+            });
+            setPercentiles(data?.percentiles || []);
+            setDistribution(data?.distribution || []);
+            setTestResult(data?.statistical_test ?? null);
         } catch (err) {
             console.error("Statistics fetch failed:", err);
         } finally {
@@ -63,7 +63,24 @@ const fetcher = async (endpoint, options = {}) => {
         return null;
     }
 
-    return response.json().catch(() => null);
+    const data = await response.json().catch(() => null);
+    if (options.withCursor) {
+        // Keyset-paginated endpoints return the next page token in a header
+        return { items: data || [], nextCursor: response.headers.get("X-Next-Cursor") };
+    }
+    return data;
+};
+
+// Listing endpoints return one bounded page at a time; follow X-Next-Cursor to collect every row
+const fetchAllPages = async (endpoint, params = {}) => {
+    const items = [];
+    let cursor = null;
+    do {
+        const page = await fetcher(endpoint, { params: cursor ? { ...params, cursor } : params, withCursor: true });
+        items.push(...page.items);
+        cursor = page.nextCursor;
+    } while (cursor);
+    return items;
 };
 
 export const api = {
@@ -100,20 +117,24 @@ export const api = {
         list: () => fetcher("/api/v1/operators"),
     },
     outages: {
-        list: (params = {}) => {
-            const query = new URLSearchParams(params).toString();
-            const queryString = query ? `?${query}` : "";
-            return fetcher(`/api/v1/outages${queryString}`);
-        },
+        list: (params = {}) => fetchAllPages("/api/v1/outages", params),
         get: (id) => fetcher(`/api/v1/outages/${id}`),
+        clusters: (params) => fetcher("/api/v1/outages/clusters", { params }),
+        changes: (since, params = {}) => fetcher("/api/v1/outages/changes", {
+            params: since ? { ...params, since } : params,
+        }),
+        at: (params) => fetcher("/api/v1/outages/at", { params }),
         history: () => fetcher("/api/v1/analytics/history"),
+        concurrency: (params) => fetcher("/api/v1/analytics/concurrency", { params }),
+        mttrSeries: (params) => fetcher("/api/v1/analytics/mttr-series", { params }),
+        regionMatrix: (params) => fetcher("/api/v1/analytics/region-matrix", { params }),
         reliability: (params) => fetcher("/api/v1/analytics/reliability", { params }),
         mttr: (params) => fetcher("/api/v1/analytics/mttr", { params }),
         mttrDynamic: (params) => fetcher("/api/v1/analytics/mttr-dynamic", { params }),
         locations: (params) => fetcher("/api/v1/analytics/locations", { params }),
     },
     reports: {
-        list: () => fetcher("/api/v1/reports"),
+        list: () => fetchAllPages("/api/v1/reports"),
         hotspots: () => fetcher("/api/v1/reports/hotspots"),
         create: (data) => fetcher("/api/v1/reports", {
             method: "POST",
@@ -123,13 +144,27 @@ export const api = {
     regions: {
         list: () => fetcher("/api/v1/regions"),
     },
+    stream: {
+        // Server-Sent Events; EventSource reconnects and resumes via Last-Event-ID by itself.
+        outages: (onEvent) => {
+            const source = new EventSource(`${BASE_URL}/api/v1/stream/outages`);
+            for (const type of ["created", "status_changed", "resolved", "eta_changed", "resync"]) {
+                source.addEventListener(type, (e) => onEvent(type, e.data ? JSON.parse(e.data) : {}));
+            }
+            return source;
+        },
+    },
     research: {
         benchmarks: () => fetcher("/api/v1/research/benchmarks"),
         mttrPercentiles: (params) => fetcher("/api/v1/research/mttr-percentiles", { params }),
         mttrDistribution: (params) => fetcher("/api/v1/research/mttr-distribution", { params }),
         slaCompliance: (params) => fetcher("/api/v1/research/sla-compliance", { params }),
+        slaMatrix: (params) => fetcher("/api/v1/research/sla-matrix", { params }),
         valueScore: (params) => fetcher("/api/v1/research/value-score", { params }),
+        valueScoreSensitivity: (params) => fetcher("/api/v1/research/value-score/sensitivity", { params }),
         statisticalTest: (params) => fetcher("/api/v1/research/statistical-test", { params }),
+        bundle: (params) => fetcher("/api/v1/research/bundle", { params }),
+        survival: (params) => fetcher("/api/v1/research/survival", { params }),
     },
     admin: {
         scrapers: () => fetcher("/api/v1/admin/scrapers"),
@@ -139,6 +174,7 @@ export const api = {
                 const queryString = query ? `?${query}` : "";
                 return fetcher(`/api/v1/admin/outages${queryString}`);
             },
+            page: (params = {}) => fetcher("/api/v1/admin/outages", { params, withCursor: true }),
             update: (id, data) => fetcher(`/api/v1/admin/outages/${id}`, {
                 method: "PUT",
                 body: JSON.stringify(data),
@@ -146,7 +182,7 @@ export const api = {
             resolvePlace: (query) => fetcher(`/api/v1/admin/resolve-place`, { method: 'POST', body: JSON.stringify({ query }) }),
         },
         reports: {
-            list: () => fetcher("/api/v1/reports"),
+            list: () => fetchAllPages("/api/v1/reports"),
             verify: (id) => fetcher(`/api/v1/admin/reports/${id}/verify`, { method: "POST" }),
             reject: (id) => fetcher(`/api/v1/admin/reports/${id}/reject`, { method: "POST" }),
         }
@@ -14,6 +14,12 @@ class Settings(BaseSettings):
     APP_ENV: str = "development"
     ADMIN_USERNAME: Optional[str] = None
     ADMIN_PASSWORD: Optional[str] = None
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    RESPONSE_CACHE_TTL_SECONDS: int = 600
+    STATS_POOL_WORKERS: int = 2
+    STATS_POOL_QUEUE_LIMIT: int = 8
+    STATS_JOB_TIMEOUT_SECONDS: float = 30.0
+    EXPORT_MAX_CONCURRENT: int = 2
     
     class Config:
         env_file = ".env"
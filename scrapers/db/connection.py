@@ -3,6 +3,7 @@ Database connection configuration.
 """
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
 from ..config import settings
 
 _is_sqlite = "sqlite" in settings.DATABASE_URL
@@ -24,6 +25,15 @@ if _is_sqlite:
         cursor.close()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Bulk exports hold a connection for the whole download, so they get their own
+# unpooled connections instead of tying up the small request pool above.
+export_engine = create_engine(
+    settings.DATABASE_URL,
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
+    poolclass=NullPool,
+)
+ExportSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=export_engine)
+
 Base = declarative_base()
 
 def get_db():
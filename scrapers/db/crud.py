@@ -2,8 +2,11 @@
 Database CRUD operations.
 """
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
 from typing import Optional
-from .models import Outage, RawData, Operator, Region, ScraperRun
+from .models import Outage, OutageEvent, OutageService, RawData, Operator, Region, ScraperRun
+from .generation import bump_generation
+from .partitions import apply_retention, ensure_partitions, is_partitioned
 from ..common.models import NormalizedOutage, OperatorEnum
 from ..common.translation import SWEDISH_COUNTIES
 from ..common.engine import extract_region_from_text
@@ -18,6 +21,84 @@ def get_operator_id(db: Session, operator_name: str) -> Optional[int]:
         return op.id
     return None
 
+def _same_value(stored, scraped) -> bool:
+    """Whether a stored column value equals a freshly scraped one; datetimes compare in UTC."""
+    if isinstance(stored, datetime) and isinstance(scraped, datetime):
+        if stored.tzinfo is not None:
+            stored = stored.astimezone(timezone.utc).replace(tzinfo=None)
+        if scraped.tzinfo is not None:
+            scraped = scraped.astimezone(timezone.utc).replace(tzinfo=None)
+    return stored == scraped
+
+
+def sync_outage_services(outage: Outage, services) -> None:
+    """
+    Mirror a list of affected services into the outage_services association rows.
+    Only the difference is applied, so unchanged outages cause no writes.
+    """
+    wanted = {str(s).lower() for s in (services or [])}
+    current = {row.service for row in outage.services}
+    if wanted == current:
+        return
+    outage.services = [row for row in outage.services if row.service in wanted] + [
+        OutageService(service=s) for s in sorted(wanted - current)
+    ]
+
+
+def backfill_outage_services(db: Session) -> int:
+    """
+    Populate outage_services from the affected_services JSON of existing outages.
+    Only runs when the association table is still empty (fresh table on an old DB).
+    """
+    if db.query(OutageService).first() is not None:
+        return 0
+
+    filled = 0
+    for outage_id, services in db.query(Outage.id, Outage.affected_services).yield_per(1000):
+        for service in {str(s).lower() for s in (services or [])}:
+            db.add(OutageService(outage_id=outage_id, service=service))
+            filled += 1
+
+    if filled:
+        db.commit()
+    return filled
+
+
+def backfill_outage_events(db: Session) -> int:
+    """
+    Seed outage_events for outages that predate the log: a creation event at
+    start time and, for resolved outages, a resolution event at end time.
+    Only runs when the log is still empty (fresh table on an old DB).
+    """
+    if db.query(OutageEvent).first() is not None:
+        return 0
+
+    filled = 0
+    rows = db.query(
+        Outage.id, Outage.status, Outage.estimated_fix_time,
+        Outage.start_time, Outage.end_time, Outage.created_at,
+    ).yield_per(1000)
+    for outage_id, status, eta, start_time, end_time, created_at in rows:
+        resolved = status == 'resolved'
+        db.add(OutageEvent(
+            outage_id=outage_id, event_type="created",
+            new_status='active' if resolved else status, new_eta=eta,
+            occurred_at=start_time or created_at or datetime.now(timezone.utc),
+        ))
+        filled += 1
+        if resolved:
+            db.add(OutageEvent(
+                outage_id=outage_id, event_type="resolved",
+                old_status='active', new_status='resolved', old_eta=eta, new_eta=eta,
+                occurred_at=end_time or created_at or datetime.now(timezone.utc),
+            ))
+            filled += 1
+
+    if filled:
+        db.commit()
+    return filled
+
+
 def save_outage(db: Session, normalized: NormalizedOutage, raw_data_dict: dict):
     """
     Save or update an outage.
@@ -58,31 +139,41 @@ def save_outage(db: Session, normalized: NormalizedOutage, raw_data_dict: dict):
     affected_services_json = [s.value for s in normalized.affected_services]
     
     if existing:
-        # Status Change Detection
-        if existing.status != normalized.status:
-            print(f"INFO: Outage {existing.incident_id} changed status from {existing.status} to {normalized.status}")
-        
-        # Update existing
-        existing.status = normalized.status
-        existing.severity = normalized.severity
-        existing.title = normalized.title
-        existing.description = normalized.description
-        existing.location = normalized.location
-        existing.estimated_fix_time = normalized.estimated_fix_time
-        # end_time = actual resolution time, only set when outage is resolved.
-        # Clear any stale end_time that was set by the old bug (end_time = estimated_fix_time)
-        # so auto_resolve_expired_outages() doesn't fight with live portal data.
-        if normalized.status and normalized.status.value == 'resolved':
-            if not existing.end_time:
-                existing.end_time = datetime.now(timezone.utc)
-        else:
-            existing.end_time = None
-        existing.updated_at = datetime.now(timezone.utc)
+        # Only fields that differ are written, and updated_at moves only when one
+        # does: the /outages/changes feed follows updated_at, so an unchanged
+        # re-scrape must not re-send the outage. Status/ETA transitions are
+        # recorded in outage_events at flush time.
+        now = datetime.now(timezone.utc)
+        resolved = bool(normalized.status and normalized.status.value == 'resolved')
+        scraped = {
+            "status": normalized.status,
+            "severity": normalized.severity,
+            "title": normalized.title,
+            "description": normalized.description,
+            "location": normalized.location,
+            "estimated_fix_time": normalized.estimated_fix_time,
+            # end_time = actual resolution time, only set when outage is resolved.
+            # Clear any stale end_time that was set by the old bug (end_time = estimated_fix_time)
+            # so auto_resolve_expired_outages() doesn't fight with live portal data.
+            "end_time": (existing.end_time or now) if resolved else None,
+            "affected_services": affected_services_json,
+            "region_id": region_id,  # Update region if detected
+            "latitude": normalized.latitude,
+            "longitude": normalized.longitude,
+        }
+        changed = False
+        for name, value in scraped.items():
+            if not _same_value(getattr(existing, name), value):
+                setattr(existing, name, value)
+                changed = True
+        sync_outage_services(existing, affected_services_json)
+        # raw_data_id always points at the latest sighting (auto-resolve reads its scraped_at)
         existing.raw_data_id = raw_entry.id
-        existing.affected_services = affected_services_json
-        existing.region_id = region_id # Update region if detected
-        existing.latitude = normalized.latitude
-        existing.longitude = normalized.longitude
+        if changed:
+            existing.updated_at = now
+        else:
+            # Written explicitly (unchanged) so the raw_data_id update does not fire its onupdate
+            flag_modified(existing, "updated_at")
         return existing
     else:
         # Create new
@@ -102,6 +193,7 @@ def save_outage(db: Session, normalized: NormalizedOutage, raw_data_dict: dict):
             longitude=normalized.longitude,
             affected_services=affected_services_json,
         )
+        sync_outage_services(new_outage, affected_services_json)
         db.add(new_outage)
         return new_outage
 
@@ -142,8 +234,9 @@ def auto_resolve_expired_outages(db: Session):
     # Grace period: only auto-resolve outages whose ETA passed >24 hours ago.
     grace_cutoff = now - timedelta(hours=24)
 
-    # Scraper staleness threshold: skip outages updated within the last 2 hours.
-    # If a scraper just touched an outage (updated_at is fresh), the portal is
+    # Scraper staleness threshold: skip outages seen within the last 2 hours.
+    # If a scraper just touched an outage (updated_at is fresh, or its latest
+    # raw_data sighting is: unchanged re-scrapes keep updated_at), the portal is
     # still actively reporting it — trust the portal, not the stale ETA.
     # Only auto-resolve outages the scraper hasn't seen in >2 hours (zombie outages).
     scraper_active_cutoff = now - timedelta(hours=2)
@@ -155,6 +248,9 @@ def auto_resolve_expired_outages(db: Session):
         Outage.estimated_fix_time != None,
         Outage.estimated_fix_time <= grace_cutoff,
         Outage.updated_at <= scraper_active_cutoff,
+        ~db.query(RawData.id).filter(
+            RawData.id == Outage.raw_data_id, RawData.scraped_at > scraper_active_cutoff,
+        ).exists(),
     ).all()
     
     total_resolved = 0
@@ -294,26 +390,61 @@ def enrich_place_codes(db: Session) -> int:
 def cleanup_old_data(db: Session, days: int = 30):
     """
     Remove resolved outages and raw data older than X days.
+
+    On PostgreSQL with partitioned tables this drops expired monthly
+    partitions (and creates upcoming ones) instead of deleting rows.
+
+    The run is logged as a "cleanup" scraper run: deletions leave
+    max(outages.updated_at) alone, and the new run id is what tells other
+    processes' generation markers that the data changed.
     """
     from datetime import timedelta
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-    
-    # 1. Delete old resolved outages
+    started_at = datetime.now(timezone.utc)
+    cutoff = started_at - timedelta(days=days)
+
+    if is_partitioned(db, "outages"):
+        ensure_partitions(db)
+        deleted_count, deleted_raw = apply_retention(db, cutoff)
+        _log_cleanup(db, started_at, deleted_count)
+        print(f"CLEANUP: Dropped {deleted_count} old outages and {deleted_raw} raw data records.")
+        return
+
+    # 1. Delete old resolved outages (child rows first: bulk delete skips ORM cascades)
+    old_outage_ids = db.query(Outage.id).filter(
+        Outage.status == 'resolved',
+        Outage.end_time < cutoff
+    )
+    for child in (OutageService, OutageEvent):
+        db.query(child).filter(
+            child.outage_id.in_(old_outage_ids.scalar_subquery())
+        ).delete(synchronize_session=False)
     deleted_count = db.query(Outage).filter(
         Outage.status == 'resolved',
         Outage.end_time < cutoff
     ).delete()
     
     # 2. Delete old raw data (orphan or just old)
-    # For simplicity, just old ones
+    # For simplicity, just old ones; outages still pointing at them lose the reference
+    old_raw_ids = db.query(RawData.id).filter(RawData.scraped_at < cutoff)
+    db.query(Outage).filter(
+        Outage.raw_data_id.in_(old_raw_ids.scalar_subquery())
+    ).update({Outage.raw_data_id: None, Outage.updated_at: Outage.updated_at},  # not a change to the outage
+             synchronize_session=False)
     deleted_raw = db.query(RawData).filter(
         RawData.scraped_at < cutoff
     ).delete()
     
     db.commit()
+    _log_cleanup(db, started_at, deleted_count)
     print(f"CLEANUP: Deleted {deleted_count} old outages and {deleted_raw} raw data records.")
 
 
+def _log_cleanup(db: Session, started_at, outages_removed: int):
+    log_scraper_run(db, "cleanup", started_at, datetime.now(timezone.utc), "success",
+                    outages_resolved=outages_removed)
+    bump_generation()
+
+
 def log_scraper_run(db: Session, operator: str, started_at, finished_at,
                     status: str, outages_found: int = 0, outages_resolved: int = 0,
                     retry_count: int = 0, error_message: str = None):
@@ -0,0 +1,69 @@
+"""
+Data generation counter used to invalidate derived caches.
+
+The generation changes whenever outage data may have changed:
+
+- `bump_generation()` is called in-process after a scraper run, admin edit
+  or retention cleanup commits, so this process sees the change immediately.
+- Other processes (the GitHub Actions Playwright runner, other API workers)
+  are picked up by polling a database marker at most once every
+  GENERATION_POLL_SECONDS: max(scraper_runs.id) and max(outages.updated_at),
+  two index lookups. Deletions leave both alone, so cleanup_old_data logs a
+  "cleanup" scraper run; anything else that deletes outages must do the same.
+
+Anything shared across processes (ETags, stored research snapshots) must use
+`database_generation`, the marker alone: the in-process counter differs per
+worker and resets on restart.
+"""
+import threading
+import time
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models import Outage, ScraperRun
+
+GENERATION_POLL_SECONDS = 5.0
+
+_lock = threading.Lock()
+_local_generation = 0
+_db_marker = None
+_polled_at = 0.0
+
+
+def bump_generation() -> int:
+    """Mark all derived data as stale in this process."""
+    global _local_generation, _polled_at
+    with _lock:
+        _local_generation += 1
+        _polled_at = 0.0  # re-read the DB marker on the next lookup
+        return _local_generation
+
+
+def data_marker(db: Session) -> tuple:
+    """The database part of the generation, read now (not polled)."""
+    return (
+        db.query(func.max(ScraperRun.id)).scalar(),
+        db.query(func.max(Outage.updated_at)).scalar(),
+    )
+
+
+def database_generation(db: Session) -> tuple:
+    """The polled database marker: identical in every process looking at the same data."""
+    global _db_marker, _polled_at
+    now = time.monotonic()
+    with _lock:
+        if now - _polled_at < GENERATION_POLL_SECONDS:
+            return _db_marker
+    marker = data_marker(db)
+    with _lock:
+        _db_marker = marker
+        _polled_at = now
+    return marker
+
+
+def current_generation(db: Session) -> tuple:
+    """Return an opaque, hashable token that changes whenever the data does, for in-process caches."""
+    marker = database_generation(db)
+    with _lock:
+        return (_local_generation, marker)
@@ -4,6 +4,8 @@ Creates tables and seeds initial data.
 """
 from .connection import engine, Base, SessionLocal
 from .models import Operator, Region
+from .crud import backfill_outage_events, backfill_outage_services
+from .partitions import ensure_partitions
 from ..common.models import OperatorEnum
 from ..common.translation import SWEDISH_COUNTIES, create_bilingual_text
 import logging
@@ -66,6 +68,15 @@ def init_db():
                 db.add(Region(name=name))
                 
         db.commit()
+
+        services_filled = backfill_outage_services(db)
+        if services_filled:
+            logger.info(f"Backfilled {services_filled} outage service rows")
+        events_filled = backfill_outage_events(db)
+        if events_filled:
+            logger.info(f"Backfilled {events_filled} outage event rows")
+        # No-op unless the tables are partitioned (PostgreSQL after migration a7d3e5f9c214)
+        ensure_partitions(db)
         logger.info("Database initialized successfully.")
     except Exception as e:
         logger.exception(f"Error initializing DB: {e}")
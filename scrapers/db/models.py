@@ -1,11 +1,19 @@
 """
 Database Models (SQLAlchemy).
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, JSON, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, JSON, Boolean, Index, UniqueConstraint, event, inspect
+from sqlalchemy.orm import Session, relationship
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
+import hashlib
+import json
 from .connection import Base
 
+def _utcnow() -> datetime:
+    # Python-side default: SQLite stores it in the same format as bound datetimes,
+    # so keyset cursors compare correctly (CURRENT_TIMESTAMP text would not).
+    return datetime.now(timezone.utc)
+
 class Operator(Base):
     __tablename__ = "operators"
     
@@ -27,6 +35,7 @@ class Region(Base):
 
 class RawData(Base):
     __tablename__ = "raw_data"
+    # Range-partitioned by month of scraped_at on PostgreSQL, like outages
     
     id = Column(Integer, primary_key=True, index=True)
     operator = Column(String, index=True)
@@ -39,10 +48,14 @@ class RawData(Base):
 class Outage(Base):
     __tablename__ = "outages"
     
+    # On PostgreSQL the primary key is (id, start_time); id alone stays unique
+    # (one sequence), so the ORM keeps addressing rows by id.
     id = Column(Integer, primary_key=True, index=True)
     incident_id = Column(String, index=True) # Operator specific ID
     operator_id = Column(Integer, ForeignKey("operators.id"))
     region_id = Column(Integer, ForeignKey("regions.id"), nullable=True)
+    # Declared for the ORM relationship only on PostgreSQL: raw_data is partitioned,
+    # so the database has no foreign key and retention sets this to NULL instead
     raw_data_id = Column(Integer, ForeignKey("raw_data.id"))
     
     title = Column(JSON) # Bilingual {"sv": "...", "en": "..."}
@@ -51,6 +64,8 @@ class Outage(Base):
     status = Column(String, nullable=True)   # e.g. "active", "resolved", "scheduled", "investigating"
     severity = Column(String, nullable=True)  # e.g. "low", "medium", "high", "critical"
     
+    # NOT NULL on PostgreSQL (partition key); nullable here for SQLite databases,
+    # so every write path must set it (save_outage falls back to now)
     start_time = Column(DateTime(timezone=True), nullable=True)
     end_time = Column(DateTime(timezone=True), nullable=True)
     estimated_fix_time = Column(DateTime(timezone=True), nullable=True)
@@ -60,15 +75,143 @@ class Outage(Base):
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
     
-    affected_services = Column(JSON) # List of strings/enums
+    affected_services = Column(JSON) # List of strings/enums (mirrored in outage_services)
     place = Column(String, nullable=True)
+    # Content fingerprint of (title, description, location, start, end); rows that
+    # were scraped twice under different incident IDs share the same key.
+    dedup_key = Column(String(64), index=True, nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), default=_utcnow, server_default=func.now(), onupdate=_utcnow)
     
     operator = relationship("Operator", back_populates="outages")
     region = relationship("Region", back_populates="outages")
     raw_data = relationship("RawData", back_populates="outages")
+    services = relationship("OutageService", back_populates="outage", cascade="all, delete-orphan")
+
+    # On PostgreSQL the table is range-partitioned by month of start_time, with
+    # PRIMARY KEY (id, start_time); see scrapers/db/partitions.py
+    __table_args__ = (
+        # Bounding-box prefilter for "outages near me"
+        Index("ix_outages_lat_lon", "latitude", "longitude"),
+        # Keyset pagination order for listing endpoints
+        Index("ix_outages_updated_at_id", "updated_at", "id"),
+    )
+
+def _utc_iso(dt) -> str:
+    if dt is None:
+        return ""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.isoformat()
+
+def outage_dedup_key(title, description, location, start_time, end_time) -> str:
+    """SHA-256 fingerprint used to collapse duplicate outage rows in analytics."""
+    parts = [
+        json.dumps(title or "", sort_keys=True, ensure_ascii=False),
+        json.dumps(description or "", sort_keys=True, ensure_ascii=False),
+        location or "",
+        _utc_iso(start_time),
+        _utc_iso(end_time),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+@event.listens_for(Outage, "before_insert")
+@event.listens_for(Outage, "before_update")
+def _set_dedup_key(mapper, connection, target):
+    # ORM writes (scrapers, resolvers, enrichment, admin edits) get the key here.
+    # Raw SQL writes bypass this hook and must set it themselves (see
+    # telia/portal_scraper.py); readers still treat a NULL key as unique to its row.
+    target.dedup_key = outage_dedup_key(
+        target.title, target.description, target.location,
+        target.start_time, target.end_time,
+    )
+
+class OutageService(Base):
+    """Normalized copy of Outage.affected_services, one row per (outage, service).
+
+    Kept in sync by crud.sync_outage_services so service filters can run as an
+    indexed predicate instead of scanning the JSON list of every row.
+    """
+    __tablename__ = "outage_services"
+
+    # No foreign key in the database on PostgreSQL (outages is partitioned); retention
+    # deletes these rows itself, see partitions.apply_retention
+    outage_id = Column(Integer, ForeignKey("outages.id", ondelete="CASCADE"), primary_key=True)
+    service = Column(String, primary_key=True, index=True) # lowercase, e.g. "4g", "5g+"
+
+    outage = relationship("Outage", back_populates="services")
+
+class OutageEvent(Base):
+    """Append-only log of outage state transitions.
+
+    One row per creation, status change or ETA change, written by the
+    before_flush hook below in the same transaction as the outage write.
+    """
+    __tablename__ = "outage_events"
+
+    id = Column(Integer, primary_key=True)
+    # As for outage_services: no foreign key in the database on PostgreSQL
+    outage_id = Column(Integer, ForeignKey("outages.id", ondelete="CASCADE"), nullable=False, index=True)
+    event_type = Column(String, nullable=False) # created, status_changed, resolved, eta_changed
+    old_status = Column(String, nullable=True)
+    new_status = Column(String, nullable=True)
+    old_eta = Column(DateTime(timezone=True), nullable=True)
+    new_eta = Column(DateTime(timezone=True), nullable=True)
+    occurred_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False)
+
+    outage = relationship("Outage")
+
+    __table_args__ = (
+        # Change feeds and time-travel queries read the log in order
+        Index("ix_outage_events_occurred_at_id", "occurred_at", "id"),
+    )
+
+def _status_value(status):
+    return status.value if hasattr(status, "value") else status
+
+def _old_and_new(state, attr: str):
+    """(old, new) from attribute history; old is the loaded DB value."""
+    hist = state.attrs[attr].history
+    old = hist.deleted[0] if hist.deleted else (hist.unchanged[0] if hist.unchanged else None)
+    new = hist.added[0] if hist.added else old
+    return old, new
+
+@event.listens_for(Session, "before_flush")
+def _record_outage_events(session, flush_context, instances):
+    # Hooking the flush catches every writer (save_outage, the resolvers, admin
+    # edits) without each one having to remember to log.
+    for obj in list(session.new):
+        if isinstance(obj, Outage):
+            status = _status_value(obj.status)
+            session.add(OutageEvent(
+                outage=obj,
+                event_type="resolved" if status == "resolved" else "created",
+                new_status=status,
+                new_eta=obj.estimated_fix_time,
+            ))
+    for obj in list(session.dirty):
+        if not isinstance(obj, Outage) or obj.id is None:
+            continue
+        state = inspect(obj)
+        old_status, new_status = (_status_value(v) for v in _old_and_new(state, "status"))
+        old_eta, new_eta = _old_and_new(state, "estimated_fix_time")
+        status_changed = old_status != new_status
+        eta_changed = _utc_iso(old_eta) != _utc_iso(new_eta)
+        if not (status_changed or eta_changed):
+            continue
+        if status_changed:
+            event_type = "resolved" if new_status == "resolved" else "status_changed"
+        else:
+            event_type = "eta_changed"
+        session.add(OutageEvent(
+            outage_id=obj.id,
+            event_type=event_type,
+            old_status=old_status,
+            new_status=new_status,
+            old_eta=old_eta,
+            new_eta=new_eta,
+        ))
 
 class UserReport(Base):
     __tablename__ = "user_reports"
@@ -85,11 +228,15 @@ class UserReport(Base):
     
     status = Column(String, default="pending") # pending, verified, rejected
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=_utcnow, server_default=func.now())
     
     operator = relationship("Operator")
     region = relationship("Region", back_populates="user_reports")
 
+    __table_args__ = (
+        Index("ix_user_reports_created_at_id", "created_at", "id"),
+    )
+
 class User(Base):
     __tablename__ = "users"
 
@@ -114,3 +261,25 @@ class ScraperRun(Base):
     retry_count = Column(Integer, default=0)
     error_message = Column(Text, nullable=True)
 
+class ResearchSnapshot(Base):
+    """Precomputed research view, refreshed after each scraper run.
+
+    `view` names the endpoint (e.g. "percentiles"), `variant` its extra
+    parameter ("" when none, otherwise the benchmark or test name).
+    `generation` is the data marker the payload was computed from, so a
+    snapshot is only served while the data is unchanged.
+    """
+    __tablename__ = "research_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    view = Column(String, nullable=False)
+    days = Column(Integer, nullable=False)
+    variant = Column(String, nullable=False, default="")
+    generation = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    computed_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False)
+    duration_ms = Column(Float, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("view", "days", "variant", name="uq_research_snapshots_view_days_variant"),
+    )
@@ -0,0 +1,203 @@
+"""
+Monthly range partitions for outages (start_time) and raw_data (scraped_at).
+
+PostgreSQL only; the migration a7d3e5f9c214 converts the tables and SQLite
+keeps plain tables with row-by-row retention. Partitions are named
+<table>_pYYYY_MM and cover [month start, next month start) in UTC. A
+<table>_default partition catches anything outside them, so inserts never
+fail even if maintenance has not run. Time-window queries that filter on
+start_time only scan the months they cover (partition pruning).
+
+Retention detaches and drops whole months instead of running large
+DELETEs. A month of outages that ended before the cutoff is dropped once
+every row in it has expired (resolved before the cutoff). A month that
+still holds rows to keep falls back to row deletes, like the default
+partition. Rows with a NULL status or end_time are kept. Child rows
+(outage_services, outage_events) of expired outages are deleted first:
+foreign keys to a partitioned table would have to include start_time, so
+on PostgreSQL they are not declared. For the same reason outages.raw_data_id
+has no foreign key there; it is set to NULL before its raw_data row is
+removed.
+
+DETACH needs an ACCESS EXCLUSIVE lock on the parent table. DETACH
+CONCURRENTLY is not allowed while a default partition exists. Each month
+is therefore detached and dropped in its own short transaction, after
+the counting and child deletes have been committed, with
+RETENTION_LOCK_TIMEOUT so a busy table makes retention skip the month
+instead of queueing every query behind it. Under that lock, only rows
+written since the first check (by updated_at, which every write path
+sets) are checked again.
+"""
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+PARTITION_KEYS = {"outages": "start_time", "raw_data": "scraped_at"}
+PARTITION_MONTHS_AHEAD = 3
+RETENTION_LOCK_TIMEOUT = "5s"
+# Writes in flight when a month is first checked can carry an updated_at up to this much older
+RETENTION_RECHECK_MARGIN = timedelta(minutes=10)
+OUTAGE_CHILD_TABLES = ("outage_services", "outage_events")
+_NAME_RE = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+def _month_index(dt: datetime) -> int:
+    return dt.year * 12 + dt.month - 1
+
+
+def _month_start(month: int) -> datetime:
+    return datetime(month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(table: str, month: int) -> str:
+    start = _month_start(month)
+    return f"{table}_p{start.year:04d}_{start.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def is_partitioned(db: Session, table: str) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND c.relnamespace = 'public'::regnamespace"
+    ), {"table": table}).scalar())
+
+
+def list_partitions(db: Session, table: str) -> List[Tuple[str, Optional[int]]]:
+    """(partition name, month index) of every partition; month is None for the default one."""
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:table AS regclass) ORDER BY c.relname"
+    ), {"table": table}).scalars().all()
+    out = []
+    for name in names:
+        match = _NAME_RE.match(name)
+        if match and match.group("table") == table:
+            out.append((name, int(match.group("year")) * 12 + int(match.group("month")) - 1))
+        elif name == default_partition_name(table):
+            out.append((name, None))
+    return out
+
+
+def create_partition(db: Session, table: str, month: int):
+    """Create the partition for `month`, moving any of its rows out of the default partition."""
+    key = PARTITION_KEYS[table]
+    name = partition_name(table, month)
+    default = default_partition_name(table)
+    bounds = {"lower": _month_start(month), "upper": _month_start(month + 1)}
+    in_range = f"{key} >= :lower AND {key} < :upper"
+    # Attaching validates the default partition, so rows already there for this month must move first
+    db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+    db.execute(text(f"WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved"), bounds)
+    db.execute(text(
+        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds['lower'].isoformat()}') TO ('{bounds['upper'].isoformat()}')"
+    ))
+
+
+def ensure_partitions(db: Session, months_ahead: int = PARTITION_MONTHS_AHEAD, now: Optional[datetime] = None) -> int:
+    """Create missing partitions from the current month to `months_ahead` months ahead. Returns the number created."""
+    current = _month_index(now or datetime.now(timezone.utc))
+    created = 0
+    for table in PARTITION_KEYS:
+        if not is_partitioned(db, table):
+            continue
+        existing = {month for _, month in list_partitions(db, table)}
+        for month in range(current, current + months_ahead + 1):
+            if month not in existing:
+                create_partition(db, table, month)
+                created += 1
+    db.commit()
+    if created:
+        logger.info(f"Created {created} partitions")
+    return created
+
+
+# Exact complements: with a NULL status or end_time the bare condition is NULL, which
+# matches neither it nor its NOT, so such rows would be dropped without being counted
+EXPIRED_OUTAGE = "(status = 'resolved' AND end_time < :cutoff) IS TRUE"
+KEPT_OUTAGE = "(status = 'resolved' AND end_time < :cutoff) IS NOT TRUE"
+
+
+def _delete_outage_children(db: Session, source: str, params: dict):
+    for child in OUTAGE_CHILD_TABLES:
+        db.execute(text(f"DELETE FROM {child} WHERE outage_id IN (SELECT id FROM {source} WHERE {EXPIRED_OUTAGE})"),
+                   params)
+
+
+def _clear_raw_data_refs(db: Session, raw_ids: str, params: dict):
+    db.execute(text(f"UPDATE outages SET raw_data_id = NULL WHERE raw_data_id IN ({raw_ids})"), params)
+
+
+def _drop_partition(db: Session, table: str, name: str, recheck: Optional[str] = None, params: Optional[dict] = None) -> bool:
+    """Detach and drop `name` in one short transaction; False (and rolled back) if it was not dropped.
+
+    `recheck` is a query run under the lock; the partition is kept if it returns a row.
+    """
+    try:
+        db.execute(text(f"SET LOCAL lock_timeout = '{RETENTION_LOCK_TIMEOUT}'"))
+        db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if recheck is not None and db.execute(text(recheck), params or {}).first() is not None:
+            db.rollback()
+            return False
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+        return True
+    except OperationalError as exc:
+        db.rollback()
+        logger.warning(f"Retention skipped {name}, will retry next run: {exc.orig}")
+        return False
+
+
+def apply_retention(db: Session, cutoff: datetime) -> Tuple[int, int]:
+    """Drop expired months of outages and raw_data. Returns (outages removed, raw_data removed)."""
+    params = {"cutoff": cutoff}
+    removed = {"outages": 0, "raw_data": 0}
+    cutoff_month = _month_index(cutoff)
+
+    for name, month in list_partitions(db, "outages"):
+        if month is None or month + 1 > cutoff_month:
+            continue
+        checked_at = db.execute(text("SELECT now()")).scalar()
+        _delete_outage_children(db, name, params)
+        if db.execute(text(f"SELECT 1 FROM {name} WHERE {KEPT_OUTAGE} LIMIT 1"), params).first() is None:
+            expired = db.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+            db.commit()
+            recheck = f"SELECT 1 FROM {name} WHERE updated_at >= :since AND {KEPT_OUTAGE} LIMIT 1"
+            if _drop_partition(db, "outages", name, recheck, {**params, "since": checked_at - RETENTION_RECHECK_MARGIN}):
+                removed["outages"] += expired
+                continue
+        # Rows to keep can only live in their month's partition, so delete the expired ones instead
+        removed["outages"] += db.execute(text(f"DELETE FROM {name} WHERE {EXPIRED_OUTAGE}"), params).rowcount
+        db.commit()
+    default = default_partition_name("outages")
+    _delete_outage_children(db, default, params)
+    removed["outages"] += db.execute(text(f"DELETE FROM {default} WHERE {EXPIRED_OUTAGE}"), params).rowcount
+    db.commit()
+
+    # outages.raw_data_id has no foreign key here, so clear it before its raw row goes
+    for name, month in list_partitions(db, "raw_data"):
+        if month is not None and month + 1 <= cutoff_month:
+            _clear_raw_data_refs(db, f"SELECT id FROM {name}", params)
+            expired = db.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+            db.commit()
+            if _drop_partition(db, "raw_data", name):
+                removed["raw_data"] += expired
+    default = default_partition_name("raw_data")
+    _clear_raw_data_refs(db, f"SELECT id FROM {default} WHERE scraped_at < :cutoff", params)
+    removed["raw_data"] += db.execute(text(f"DELETE FROM {default} WHERE scraped_at < :cutoff"), params).rowcount
+
+    db.commit()
+    return removed["outages"], removed["raw_data"]
@@ -19,6 +19,7 @@ from scrapers.telenor.parser import parse_telenor_outage
 from scrapers.telenor.mapper import map_to_normalized as map_telenor_outage
 
 from scrapers.db.connection import SessionLocal
+from scrapers.db.generation import bump_generation
 from scrapers.db.crud import (
     save_outage, auto_resolve_expired_outages, resolve_missing_outages,
     enrich_missing_geodata, enrich_region_ids, enrich_place_codes, log_scraper_run,
@@ -163,6 +164,18 @@ def _run_tre_scraper(db):
                     outages_resolved=resolved, retry_count=retries)
 
 
+def _refresh_research_snapshots(db):
+    """Precompute the standard research views from the data just scraped."""
+    try:
+        # Lazy import: the research stack (numpy/scipy/FastAPI) is not needed to scrape
+        from backend.utils.research import refresh_research_snapshots
+        written = refresh_research_snapshots(db)
+        logger.info("Refreshed %d research snapshots", written)
+    except Exception:
+        db.rollback()
+        logger.exception("Research snapshot refresh failed")
+
+
 def run_scrapers():
     """Main entry point — runs all scrapers then enrichment passes."""
     logger.info("Starting scraper run...")
@@ -183,6 +196,9 @@ def run_scrapers():
         if place_filled:
             logger.info("Filled place code for %d records", place_filled)
     finally:
+        # Each scraper commits on its own, so invalidate caches even after a partial run
+        bump_generation()
+        _refresh_research_snapshots(db)
         db.close()
     logger.info("Scraper run completed.")
 
@@ -251,6 +251,17 @@ def _run_tre(db):
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
+def _refresh_research_snapshots(db):
+    """Precompute the standard research views from the data just scraped."""
+    try:
+        # Lazy import: the research stack (numpy/scipy/FastAPI) is not needed to scrape
+        from backend.utils.research import refresh_research_snapshots
+        written = refresh_research_snapshots(db)
+        logger.info("Refreshed %d research snapshots", written)
+    except Exception:
+        db.rollback()
+        logger.exception("Research snapshot refresh failed")
+
 
 def run():
     logger.info("=== GitHub Actions Scraper Run ===")
@@ -267,6 +278,7 @@ def run():
         enrich_missing_geodata(db)
         enrich_region_ids(db)
         enrich_place_codes(db)
+        _refresh_research_snapshots(db)
     finally:
         db.close()
     logger.info("=== Scraper Run Complete ===")
@@ -17,6 +17,7 @@ from playwright.sync_api import sync_playwright
 from scrapers.common.geocoding import get_county_coordinates
 from scrapers.common.translation import CITY_TO_COUNTY, SWEDISH_COUNTIES
 from scrapers.common.engine import extract_region_from_text, parse_swedish_date
+from scrapers.db.models import outage_dedup_key
 
 logger = logging.getLogger("TeliaPortalScraper")
 
@@ -191,6 +192,13 @@ def _save_raw_data(cursor, telia_id, inc_id, item, timestamp) -> int:
     return cursor.lastrowid
 
 
+def _dedup_key(title, description, location, start_time, end_time) -> str:
+    """outage_dedup_key for rows written here with raw SQL (timestamps are ISO text)."""
+    def parse(value):
+        return datetime.fromisoformat(value) if isinstance(value, str) and value else value
+    return outage_dedup_key(title, description, location, parse(start_time), parse(end_time))
+
+
 def process_single_incident(item, telia_id, region_id_map, timestamp, cursor):
     """Processes and saves a single incident to the DB."""
     inc_id = item.get("ExternalId")
@@ -210,27 +218,37 @@ def process_single_incident(item, telia_id, region_id_map, timestamp, cursor):
     desc_raw = item.get("Description") or item.get("Text") or ""
     services = json.dumps(extract_services(desc_raw + " " + item.get("AffectedServices", "")))
 
-    title_json = json.dumps({"sv": str(inc_id), "en": str(inc_id)})
-    desc_json = json.dumps({"sv": desc_raw, "en": desc_raw})
+    title = {"sv": str(inc_id), "en": str(inc_id)}
+    description = {"sv": desc_raw, "en": desc_raw}
+    title_json = json.dumps(title)
+    desc_json = json.dumps(description)
 
     raw_data_id = _save_raw_data(cursor, telia_id, inc_id, item, timestamp)
 
-    cursor.execute("SELECT id, raw_data_id FROM outages WHERE incident_id = ? AND operator_id = ?", (inc_id, telia_id))
+    cursor.execute("SELECT id, raw_data_id, end_time FROM outages WHERE incident_id = ? AND operator_id = ?",
+                   (inc_id, telia_id))
     row = cursor.fetchone()
 
+    # Raw SQL bypasses the ORM flush hook, so the dedup key is computed here
     if row:
-        existing_id, existing_raw_data_id = row
+        existing_id, existing_raw_data_id, existing_end_time = row
         new_raw_id = raw_data_id if existing_raw_data_id is None else existing_raw_data_id
+        dedup_key = _dedup_key(title, description, location, start_time, existing_end_time)
         cursor.execute("""
             UPDATE outages SET location=?, region_id=?, latitude=?, longitude=?, start_time=?, estimated_fix_time=?,
-            description=?, affected_services=?, title=?, updated_at=?, status='active', raw_data_id=? WHERE id=?
-        """, (location, region_id, lat, lon, start_time, end_time, desc_json, services, title_json, timestamp, new_raw_id, existing_id))
+            description=?, affected_services=?, title=?, updated_at=?, status='active', raw_data_id=?, dedup_key=?
+            WHERE id=?
+        """, (location, region_id, lat, lon, start_time, end_time, desc_json, services, title_json, timestamp, new_raw_id,
+              dedup_key, existing_id))
     else:
+        dedup_key = _dedup_key(title, description, location, start_time, None)
         cursor.execute("""
             INSERT INTO outages (incident_id, operator_id, region_id, title, description, location, latitude, longitude,
-            start_time, estimated_fix_time, status, severity, affected_services, raw_data_id, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'active', 'medium', ?, ?, ?, ?)
-        """, (inc_id, telia_id, region_id, title_json, desc_json, location, lat, lon, start_time, end_time, services, raw_data_id, timestamp, timestamp))
+            start_time, estimated_fix_time, status, severity, affected_services, raw_data_id, created_at, updated_at,
+            dedup_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'active', 'medium', ?, ?, ?, ?, ?)
+        """, (inc_id, telia_id, region_id, title_json, desc_json, location, lat, lon, start_time, end_time, services,
+              raw_data_id, timestamp, timestamp, dedup_key))
 
 
 def scrape_portal_granular():
@@ -0,0 +1,47 @@
+"""
+Shared fixtures. Settings are read when scrapers.config is first imported, so
+the environment points at a throwaway SQLite database (and a test secret)
+before anything from backend or scrapers is imported.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+_DB_DIR = Path(tempfile.mkdtemp(prefix="telecom-outage-tests-"))
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR / 'test.db'}"
+os.environ["SECRET_KEY"] = "test-secret-key-for-the-pytest-suite-only"
+os.environ["ENABLE_SCHEDULER"] = "false"
+os.environ["STATS_POOL_WORKERS"] = "0"
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    from scrapers.db.init_db import init_db
+    from backend.main import app as fastapi_app
+
+    init_db()
+    return fastapi_app
+
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def db(app):
+    """A session on the test database; outages added by the test are removed afterwards."""
+    from scrapers.db.connection import SessionLocal
+    from scrapers.db.models import Outage, OutageEvent, OutageService
+
+    session = SessionLocal()
+    yield session
+    session.rollback()
+    for model in (OutageEvent, OutageService, Outage):
+        session.query(model).delete()
+    session.commit()
+    session.close()
@@ -0,0 +1,29 @@
+"""
+/analytics/mttr-dynamic deduplicates on dedup_key in SQL; rows without a key must not
+collapse into one group.
+"""
+from datetime import datetime, timedelta, timezone
+
+from scrapers.db.models import Operator, Outage
+
+
+def test_mttr_keeps_rows_without_dedup_key_apart(client, db):
+    operator_id = db.query(Operator.id).filter(Operator.name == "tre").scalar()
+    start = datetime.now(timezone.utc) - timedelta(days=2)
+    for i, hours in enumerate((2, 4, 6)):
+        db.add(Outage(incident_id=f"nokey-{i}", operator_id=operator_id, title={"sv": f"t{i}"}, status="resolved",
+                      start_time=start + timedelta(hours=i), end_time=start + timedelta(hours=i + hours)))
+    # A duplicate of the first row (same content, so the same key) is counted once
+    db.add(Outage(incident_id="nokey-dup", operator_id=operator_id, title={"sv": "t0"}, status="resolved",
+                  start_time=start, end_time=start + timedelta(hours=2)))
+    db.commit()
+    # Rows written with raw SQL before the portal scraper set the key
+    db.query(Outage).filter(Outage.incident_id.in_(["nokey-1", "nokey-2"])).update(
+        {Outage.dedup_key: None}, synchronize_session=False)
+    db.commit()
+
+    response = client.get("/api/v1/analytics/mttr-dynamic", params={"days": 7})
+
+    tre = next(r for r in response.json() if r["operator_name"] == "TRE")
+    assert tre["outage_count"] == 3
+    assert tre["average_mttr_hours"] == 4.0
@@ -0,0 +1,42 @@
+"""
+Conditional GETs: a matching If-None-Match is answered with 304 and no body,
+until the data changes.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from scrapers.db.generation import bump_generation
+from scrapers.db.models import Operator, Outage
+
+
+@pytest.mark.parametrize("path", ["/api/v1/outages", "/api/v1/analytics/mttr"])
+def test_matching_etag_is_not_modified(client, path):
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get(path, headers={"If-None-Match": header})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert response.headers["Cache-Control"] == "no-cache"
+
+    assert client.get(path, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_etag_changes_with_the_data(client, db):
+    etag = client.get("/api/v1/outages").headers["ETag"]
+
+    operator = db.query(Operator).filter(Operator.name == "telia").one()
+    now = datetime.now(timezone.utc)
+    db.add(Outage(incident_id="etag", operator_id=operator.id, title={"sv": "etag"}, status="active",
+                  start_time=now - timedelta(hours=1), updated_at=now))
+    db.commit()
+    bump_generation()
+
+    response = client.get("/api/v1/outages", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert "etag" in {item["incident_id"] for item in response.json()}
@@ -0,0 +1,25 @@
+"""
+Generation marker: retention cleanup changes it, so caches and ETags in other
+processes notice deleted outages.
+"""
+from datetime import datetime, timedelta, timezone
+
+from scrapers.db.crud import cleanup_old_data, get_scraper_health
+from scrapers.db.generation import data_marker
+from scrapers.db.models import Operator, Outage
+
+
+def test_cleanup_changes_the_data_marker(db):
+    operator = db.query(Operator).filter(Operator.name == "telia").one()
+    old = datetime.now(timezone.utc) - timedelta(days=60)
+    db.add(Outage(incident_id="expired", operator_id=operator.id, title={"sv": "expired"}, status="resolved",
+                  start_time=old, end_time=old + timedelta(hours=2), updated_at=old))
+    db.commit()
+    before = data_marker(db)
+
+    cleanup_old_data(db, days=30)
+
+    assert db.query(Outage).filter(Outage.incident_id == "expired").count() == 0
+    assert data_marker(db) != before
+    # The cleanup run is not reported as a scraper
+    assert {run["operator"] for run in get_scraper_health(db)} == {"telia", "telenor", "tre"}
@@ -0,0 +1,75 @@
+"""
+Point-in-time queries (OutageIntervalIndex) against a brute-force scan of the
+same outages, including interval boundaries, ongoing and duplicate outages.
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from backend.utils.intervals import OutageIntervalIndex
+from backend.utils.timestamps import as_utc
+from scrapers.db.generation import bump_generation
+from scrapers.db.models import Operator, Outage
+
+BASE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _add_outages(db, rng):
+    operators = [op.id for op in db.query(Operator).filter(Operator.name.in_(["telia", "tre"]))]
+    outages = []
+    for i in range(300):
+        start = BASE + timedelta(minutes=int(rng.integers(0, 10_000)))
+        if i % 25 == 0:
+            end, status = None, "active"       # ongoing
+        elif i % 25 == 1:
+            end, status = None, "resolved"     # end unknown: left out
+        else:
+            end, status = start + timedelta(minutes=int(rng.integers(1, 2_000))), "resolved"
+        outages.append(Outage(incident_id=f"iv-{i}", operator_id=operators[i % 2], title={"sv": "x"},
+                              status=status, start_time=start, end_time=end,
+                              # every tenth row is a re-scraped copy of the row before it
+                              dedup_key=f"key-{i - 1 if i % 10 == 9 else i}"))
+    for i in range(9, len(outages), 10):
+        outages[i].start_time, outages[i].end_time = outages[i - 1].start_time, outages[i - 1].end_time
+        outages[i].status, outages[i].operator_id = outages[i - 1].status, outages[i - 1].operator_id
+    db.add_all(outages)
+    db.commit()
+    bump_generation()
+    return outages
+
+
+def _active(outage, ts):
+    # SQLite hands datetimes back naive
+    start, end, ts = as_utc(outage.start_time), as_utc(outage.end_time), as_utc(ts)
+    if end is None:
+        return outage.status != "resolved" and start <= ts
+    return start <= ts < end
+
+
+def test_point_queries_match_a_scan(db):
+    rng = np.random.default_rng(7)
+    outages = _add_outages(db, rng)
+    index = OutageIntervalIndex()
+
+    probes = [BASE + timedelta(minutes=int(m)) for m in rng.integers(-100, 12_100, 200)]
+    # Boundaries: start is inclusive, end exclusive
+    probes += [o.start_time for o in outages[:20]] + [o.end_time for o in outages[:20] if o.end_time]
+
+    for ts in probes:
+        for operator_id in (None, outages[0].operator_id):
+            expected = sorted(o.id for o in outages
+                              if _active(o, ts) and operator_id in (None, o.operator_id))
+            assert index.active_at(db, ts, operator_id) == expected
+
+    counts = index.concurrency(db, probes)
+    for operator_id in {o.operator_id for o in outages}:
+        expected = [len({o.dedup_key for o in outages if o.operator_id == operator_id and _active(o, ts)})
+                    for ts in probes]
+        assert counts[operator_id].tolist() == expected
+
+
+def test_naive_timestamps_are_utc(db):
+    outages = _add_outages(db, np.random.default_rng(11))
+    index = OutageIntervalIndex()
+    ts = outages[5].start_time
+    assert index.active_at(db, ts.replace(tzinfo=None)) == index.active_at(db, ts)
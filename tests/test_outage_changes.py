@@ -0,0 +1,79 @@
+"""
+Delta sync (/outages/changes): rows committed late behind a cursor are still
+delivered, and an unchanged re-scrape does not re-send an outage.
+"""
+from datetime import datetime, timedelta, timezone
+
+from backend.utils.timestamps import as_utc
+from scrapers.common.models import NormalizedOutage, OperatorEnum, OutageStatus
+from scrapers.db.crud import auto_resolve_expired_outages, save_outage
+from scrapers.db.models import Operator, Outage
+
+
+def _sync(client, since=None):
+    """Follow has_more to the end; returns (ids seen, final cursor)."""
+    ids = []
+    while True:
+        body = client.get("/api/v1/outages/changes", params={"since": since} if since else {}).json()
+        ids += [change["id"] for change in body["changes"]]
+        since = body["cursor"]
+        if not body["has_more"]:
+            return ids, since
+
+
+def _add_outage(db, incident_id, updated_at):
+    operator = db.query(Operator).filter(Operator.name == "telia").one()
+    outage = Outage(incident_id=incident_id, operator_id=operator.id, title={"sv": incident_id}, status="active",
+                    start_time=updated_at - timedelta(hours=1), updated_at=updated_at)
+    db.add(outage)
+    db.commit()
+    return outage.id
+
+
+def test_late_commit_behind_the_cursor_is_delivered(client, db):
+    now = datetime.now(timezone.utc)
+    first = _add_outage(db, "first", now)
+    ids, cursor = _sync(client)
+    assert ids == [first]
+
+    # A slower writer stamped updated_at before `first` but committed after the sync
+    late = _add_outage(db, "late", now - timedelta(seconds=30))
+    ids, _ = _sync(client, cursor)
+    assert late in ids
+
+
+def test_unchanged_rescrape_keeps_updated_at(client, db):
+    normalized = NormalizedOutage(operator=OperatorEnum.TELIA, incident_id="rescrape", title={"sv": "Avbrott"},
+                                  location="Stockholm", status=OutageStatus.ACTIVE,
+                                  started_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+                                  estimated_fix_time=datetime(2026, 1, 2, tzinfo=timezone.utc))
+    outage = save_outage(db, normalized, {})
+    db.commit()
+    stamped = outage.updated_at
+
+    save_outage(db, normalized, {})
+    db.commit()
+    db.refresh(outage)
+    assert outage.updated_at == stamped
+
+    save_outage(db, normalized.model_copy(update={"status": OutageStatus.RESOLVED}), {})
+    db.commit()
+    db.refresh(outage)
+    assert outage.updated_at != stamped and outage.end_time is not None
+
+
+def test_unchanged_rescrape_still_counts_as_a_sighting(db):
+    long_ago = datetime.now(timezone.utc) - timedelta(days=3)
+    normalized = NormalizedOutage(operator=OperatorEnum.TELIA, incident_id="still-listed", title={"sv": "Avbrott"},
+                                  status=OutageStatus.ACTIVE, started_at=long_ago, estimated_fix_time=long_ago)
+    outage = save_outage(db, normalized, {})
+    db.commit()
+    outage.updated_at = long_ago
+    db.commit()
+
+    save_outage(db, normalized, {})
+    db.commit()
+    auto_resolve_expired_outages(db)
+    db.refresh(outage)
+    assert outage.status == "active"
+    assert as_utc(outage.updated_at) == long_ago
@@ -0,0 +1,105 @@
+"""
+Partition-drop retention (PostgreSQL only). Runs against the database in
+TEST_POSTGRES_URL, in a throwaway schema; skipped when it is not set.
+"""
+import os
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from scrapers.db.partitions import _month_index, apply_retention, create_partition, list_partitions
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+SCHEMA = "retention_test"
+
+pytestmark = pytest.mark.skipif(
+    not POSTGRES_URL or not POSTGRES_URL.startswith("postgresql"),
+    reason="TEST_POSTGRES_URL (a scratch PostgreSQL database) is not set",
+)
+
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db():
+    admin = create_engine(POSTGRES_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    engine = create_engine(POSTGRES_URL, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    session = Session(engine)
+    for statement in (
+        "CREATE TABLE outages (id integer NOT NULL, status varchar, start_time timestamptz NOT NULL, "
+        "end_time timestamptz, raw_data_id integer, updated_at timestamptz DEFAULT now(), PRIMARY KEY (id, start_time)) "
+        "PARTITION BY RANGE (start_time)",
+        "CREATE INDEX ix_outages_updated_at_id ON outages (updated_at, id)",
+        "CREATE TABLE outages_default PARTITION OF outages DEFAULT",
+        "CREATE TABLE raw_data (id integer NOT NULL, scraped_at timestamptz NOT NULL, "
+        "PRIMARY KEY (id, scraped_at)) PARTITION BY RANGE (scraped_at)",
+        "CREATE TABLE raw_data_default PARTITION OF raw_data DEFAULT",
+        "CREATE TABLE outage_services (outage_id integer NOT NULL, service varchar NOT NULL)",
+        "CREATE TABLE outage_events (id serial PRIMARY KEY, outage_id integer NOT NULL)",
+    ):
+        session.execute(text(statement))
+    for month in (_month_index(_utc(2026, 3, 1)), _month_index(_utc(2026, 4, 1))):
+        create_partition(session, "outages", month)
+        create_partition(session, "raw_data", month)
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    admin.dispose()
+
+
+def _add_outages(db, rows):
+    for outage_id, status, start_time, end_time in rows:
+        db.execute(text("INSERT INTO outages (id, status, start_time, end_time) VALUES (:id, :status, :start, :end)"),
+                   {"id": outage_id, "status": status, "start": start_time, "end": end_time})
+        db.execute(text("INSERT INTO outage_services VALUES (:id, '4g')"), {"id": outage_id})
+        db.execute(text("INSERT INTO outage_events (outage_id) VALUES (:id)"), {"id": outage_id})
+    db.commit()
+
+
+def _ids(db, table, column="outage_id"):
+    return set(db.execute(text(f"SELECT {column} FROM {table}")).scalars())
+
+
+def test_retention_keeps_rows_with_null_status_or_end_time(db):
+    _add_outages(db, [
+        # March: every row expired, so the partition is dropped
+        (1, "resolved", _utc(2026, 3, 2), _utc(2026, 3, 3)),
+        (2, "resolved", _utc(2026, 3, 20), _utc(2026, 4, 1)),
+        # April: one expired row next to rows that must be kept
+        (3, "resolved", _utc(2026, 4, 2), _utc(2026, 4, 3)),
+        (4, None, _utc(2026, 4, 5), _utc(2026, 4, 6)),
+        (5, "resolved", _utc(2026, 4, 7), None),
+        (6, "active", _utc(2026, 4, 8), None),
+        # Default partition: no monthly partition covers 2020
+        (7, "resolved", _utc(2020, 1, 1), _utc(2020, 1, 2)),
+        (8, None, _utc(2020, 1, 1), None),
+    ])
+    db.execute(text("INSERT INTO raw_data VALUES (1, :march), (2, :april), (3, :recent)"),
+               {"march": _utc(2026, 3, 10), "april": _utc(2026, 4, 10), "recent": _utc(2026, 6, 20)})
+    # Outage 4's latest sighting is in a dropped month, outage 8's in the default partition
+    db.execute(text("UPDATE outages SET raw_data_id = 1 WHERE id = 4"))
+    db.execute(text("UPDATE outages SET raw_data_id = 4 WHERE id = 8"))
+    db.execute(text("UPDATE outages SET raw_data_id = 3 WHERE id = 6"))
+    db.execute(text("INSERT INTO raw_data VALUES (4, :old)"), {"old": _utc(2020, 1, 1)})
+    db.commit()
+
+    removed = apply_retention(db, _utc(2026, 6, 15))
+
+    assert removed == (4, 3)
+    assert _ids(db, "outages", "id") == {4, 5, 6, 8}
+    assert _ids(db, "outage_services") == {4, 5, 6, 8}
+    assert _ids(db, "outage_events") == {4, 5, 6, 8}
+    assert _ids(db, "raw_data", "id") == {3}
+    raw_refs = dict(db.execute(text("SELECT id, raw_data_id FROM outages")).all())
+    assert raw_refs == {4: None, 5: None, 6: 3, 8: None}
+    assert [name for name, _ in list_partitions(db, "outages")] == ["outages_default", "outages_p2026_04"]
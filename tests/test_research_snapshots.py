@@ -0,0 +1,51 @@
+"""
+The scraper refreshes research snapshots in a process that has the database
+but none of the API's configuration (the Actions workflow sets DATABASE_URL
+only), so the refresh must not import the auth stack.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+REFRESH_SCRIPT = """
+import sys
+from datetime import datetime, timedelta, timezone
+
+from scrapers.db.connection import SessionLocal
+from scrapers.db.init_db import init_db
+from scrapers.db.models import Operator, Outage, ResearchSnapshot
+from backend.utils.research import refresh_research_snapshots
+
+init_db()
+db = SessionLocal()
+now = datetime.now(timezone.utc)
+for k, op in enumerate(db.query(Operator).order_by(Operator.id).all()):
+    for i in range(12):
+        start = now - timedelta(days=i + 1, hours=k)
+        db.add(Outage(incident_id=f"{op.name}-{i}", operator_id=op.id, title={"sv": "t"},
+                      status="resolved", severity="medium", start_time=start,
+                      end_time=start + timedelta(hours=1 + (i * (k + 1)) % 7), affected_services=["4g"]))
+db.commit()
+
+written = refresh_research_snapshots(db)
+assert written > 0 and db.query(ResearchSnapshot).count() == written, written
+assert "backend.auth" not in sys.modules
+assert not any(name.startswith("backend.routers") for name in sys.modules)
+print(written)
+"""
+
+
+def test_refresh_research_snapshots_without_secret_key(tmp_path):
+    env = {k: v for k, v in os.environ.items() if k != "SECRET_KEY"}
+    env["DATABASE_URL"] = f"sqlite:///{tmp_path / 'snapshots.db'}"
+    env["PYTHONPATH"] = str(ROOT)
+    # Run from tmp_path so the repository's .env (which may set SECRET_KEY) is not read
+    result = subprocess.run(
+        [sys.executable, "-c", REFRESH_SCRIPT],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=600,
+    )
+    assert result.returncode == 0, result.stderr
+    assert int(result.stdout.strip().splitlines()[-1]) > 0
@@ -0,0 +1,60 @@
+"""
+t-digest accuracy against np.percentile, and the sketch index following
+late-committed changes.
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from backend.utils.sketch import MTTRSketchIndex, TDigest
+from scrapers.db.models import Operator, Outage
+
+
+def test_small_digest_is_exact():
+    values = np.random.default_rng(1).lognormal(1.0, 1.0, size=200)
+    digest = TDigest.from_values(values)
+    for q in (0.0, 0.25, 0.5, 0.9, 0.99, 1.0):
+        assert digest.quantile(q) == pytest.approx(np.percentile(values, q * 100))
+    assert digest.mean == pytest.approx(values.mean())
+    assert digest.std == pytest.approx(values.std(ddof=1))
+
+
+def test_merged_digest_quantiles_within_tolerance():
+    rng = np.random.default_rng(7)
+    parts = [rng.lognormal(1.5, 1.0, size=20_000) for _ in range(6)]
+    values = np.concatenate(parts)
+    digest = TDigest.merge(TDigest.from_values(p) for p in parts)
+    assert digest.count == len(values)
+    assert len(digest.means) < len(values) // 10
+    for q in (0.5, 0.75, 0.9, 0.95, 0.99):
+        # Rank error: the estimate must sit within 0.5 percentile points of the true quantile
+        rank = (values < digest.quantile(q)).mean()
+        assert abs(rank - q) < 0.005, q
+    assert digest.min == values.min() and digest.max == values.max()
+
+
+def _outage(db, operator_id, start, hours, updated_at):
+    outage = Outage(incident_id=f"sk-{start.isoformat()}", operator_id=operator_id, title={"sv": "t"},
+                    status="resolved", start_time=start, end_time=start + timedelta(hours=hours),
+                    updated_at=updated_at)
+    db.add(outage)
+    db.commit()
+    return outage
+
+
+def test_index_applies_change_committed_behind_high_water(db):
+    operator_id = db.query(Operator.id).filter(Operator.name == "telia").scalar()
+    now = datetime.now(timezone.utc)
+    since = now - timedelta(days=90)
+    late = _outage(db, operator_id, now - timedelta(days=40), 2, now - timedelta(minutes=2))
+    _outage(db, operator_id, now - timedelta(days=41), 4, now - timedelta(minutes=1))
+
+    index = MTTRSketchIndex()
+    assert index.window(db, operator_id, since).max == pytest.approx(4)
+
+    # A slower writer commits a correction stamped before the newest change already applied
+    late.end_time = late.start_time + timedelta(hours=10)
+    late.updated_at = now - timedelta(seconds=90)
+    db.commit()
+    assert index.window(db, operator_id, since).max == pytest.approx(10)
@@ -0,0 +1,62 @@
+"""
+SSE broadcaster: the tail starts at the newest event, and a subscriber that
+returns after polling paused is told to resync instead of being flooded with
+the backlog as live events.
+"""
+import asyncio
+from datetime import datetime, timezone
+
+from backend.routers import stream
+from scrapers.db.generation import bump_generation
+from scrapers.db.models import Operator, Outage
+
+
+def _add_outage(db, incident_id):
+    operator_id = db.query(Operator.id).filter(Operator.name == "telia").scalar()
+    db.add(Outage(incident_id=incident_id, operator_id=operator_id, title={"sv": incident_id}, status="active",
+                  start_time=datetime.now(timezone.utc)))
+    db.commit()
+    bump_generation()
+
+
+async def _settle():
+    for _ in range(20):
+        await asyncio.sleep(0.05)
+
+
+def _drain(subscriber):
+    frames = []
+    while not subscriber.queue.empty():
+        frames.append(subscriber.queue.get_nowait())
+    return frames
+
+
+def test_tail_seeds_at_newest_event_and_resyncs_after_pause(db, monkeypatch):
+    monkeypatch.setattr(stream, "POLL_SECONDS", 0.01)
+    _add_outage(db, "before-subscribe")
+
+    async def scenario():
+        broadcaster = stream.OutageBroadcaster()
+        first, replay = broadcaster.subscribe(None)
+        assert replay == []
+        await _settle()
+        assert _drain(first) == []  # existing events are not published as live
+
+        _add_outage(db, "live")
+        await _settle()
+        frames = _drain(first)
+        assert len(frames) == 1 and "event: created" in frames[0] and '"live"' in frames[0]
+        last_event_id = frames[0].split("\n")[0].removeprefix("id: ")
+
+        broadcaster.unsubscribe(first)
+        await broadcaster._task
+        _add_outage(db, "while-paused")
+
+        second, replay = broadcaster.subscribe(last_event_id)
+        assert len(replay) == 1 and "event: resync" in replay[0]
+        await _settle()
+        assert _drain(second) == []
+        broadcaster.unsubscribe(second)
+        await broadcaster._task
+
+    asyncio.run(scenario())
@@ -0,0 +1,58 @@
+"""
+Kaplan-Meier, log-rank and Holm against values worked out by hand.
+"""
+import math
+
+import numpy as np
+import pytest
+from scipy.stats import chi2, norm
+
+from backend.utils.survival import KMCurve, holm, logrank
+
+
+def test_kaplan_meier_product_limit():
+    # Censored at 2 (tied with an event) and at 4
+    curve = KMCurve(np.array([2.0, 1.0, 5.0, 2.0, 4.0, 3.0]), np.array([1, 1, 1, 0, 0, 1]))
+
+    assert (curve.n, curve.events, curve.censored) == (6, 4, 2)
+    assert curve.times.tolist() == [1.0, 2.0, 3.0, 5.0]
+    assert curve.at_risk.tolist() == [6, 5, 3, 1]
+    assert curve.survival == pytest.approx([5 / 6, 2 / 3, 4 / 9, 0.0])
+    assert curve.median() == 3.0
+    assert (curve.at(0.5), curve.at(2.5), curve.at(3.0)) == pytest.approx((1.0, 2 / 3, 4 / 9))
+
+    # Greenwood on the log(-log) scale: S ** exp(+-z * se) at the first event
+    s, se = 5 / 6, math.sqrt(1 / 30) / abs(math.log(5 / 6))
+    z = norm.ppf(0.975)
+    assert curve.ci_low[0] == pytest.approx(s ** math.exp(z * se))
+    assert curve.ci_high[0] == pytest.approx(s ** math.exp(-z * se))
+    # Undefined at S = 0, where the band collapses onto the estimate
+    assert curve.ci_low[-1] == curve.ci_high[-1] == 0.0
+
+
+def test_kaplan_meier_median_not_reached():
+    curve = KMCurve(np.array([1.0, 2.0, 3.0]), np.array([1, 0, 0]))
+    assert curve.survival.tolist() == pytest.approx([2 / 3])
+    assert curve.median() is None
+
+
+def test_logrank_two_groups():
+    # Every event in the first group precedes the second group's:
+    # O - E = 2 - 5/6, V = 1/4 + 2/9, so chi2 = (7/6)^2 / (17/36) = 49/17
+    statistic, df, p = logrank([(np.array([1.0, 2.0]), np.ones(2)), (np.array([3.0, 4.0]), np.ones(2))])
+    assert statistic == pytest.approx(49 / 17)
+    assert df == 1
+    assert p == pytest.approx(chi2.sf(49 / 17, 1))
+
+
+def test_logrank_identical_groups():
+    group = (np.array([1.0, 2.0, 2.0, 5.0]), np.array([1, 1, 0, 1]))
+    statistic, df, p = logrank([group, group, group])
+    assert statistic == pytest.approx(0.0, abs=1e-12)
+    assert (df, p) == (2, pytest.approx(1.0))
+
+
+def test_holm():
+    assert holm([0.01, 0.04, 0.03]) == pytest.approx([0.03, 0.06, 0.06])
+    assert holm([0.5, 0.9]) == [1.0, 1.0]
+    assert holm([]) == []
@@ -0,0 +1,54 @@
+"""
+Time-range endpoints accept bounds with and without a UTC offset; naive
+bounds are UTC, so mixing the two must not fail.
+"""
+from datetime import datetime, timezone
+
+from scrapers.db.models import Operator, Outage
+
+
+def _add_outage(db, start, end):
+    operator = db.query(Operator).filter(Operator.name == "telia").one()
+    db.add(Outage(incident_id=f"tz-{start.isoformat()}", operator_id=operator.id, title={"sv": "t"},
+                  status="resolved", start_time=start, end_time=end))
+    db.commit()
+
+
+def test_concurrency_accepts_aware_and_naive_bounds(client, db):
+    _add_outage(db, datetime(2026, 1, 1, 12, tzinfo=timezone.utc), datetime(2026, 1, 2, 12, tzinfo=timezone.utc))
+
+    mixed = client.get("/api/v1/analytics/concurrency",
+                       params={"from": "2026-01-01T00:00:00Z", "to": "2026-01-03T00:00:00", "step": "1h"})
+    aware = client.get("/api/v1/analytics/concurrency",
+                       params={"from": "2026-01-01T00:00:00Z", "to": "2026-01-03T00:00:00Z", "step": "1h"})
+
+    assert mixed.status_code == 200, mixed.text
+    assert mixed.json() == aware.json()
+    telia = next(s for s in mixed.json()["series"] if s["operator_name"] == "telia")
+    assert len(telia["counts"]) == 49
+    assert telia["counts"][11:14] == [0, 1, 1]
+
+
+def test_concurrency_compares_mixed_bounds_in_utc(client):
+    # 2026-01-01T02:00+02:00 is 00:00 UTC, which is after the naive (UTC) 'to' bound
+    response = client.get("/api/v1/analytics/concurrency",
+                          params={"from": "2026-01-01T02:00:00+02:00", "to": "2025-12-31T23:00:00"})
+    assert response.status_code == 400
+
+
+def test_export_accepts_aware_and_naive_bounds(client, db):
+    _add_outage(db, datetime(2026, 1, 10, tzinfo=timezone.utc), datetime(2026, 1, 11, tzinfo=timezone.utc))
+    _add_outage(db, datetime(2026, 3, 1, tzinfo=timezone.utc), datetime(2026, 3, 2, tzinfo=timezone.utc))
+
+    response = client.get("/api/v1/export/outages",
+                          params={"format": "ndjson", "from": "2026-01-01T00:00:00Z", "to": "2026-02-01T00:00:00"})
+
+    assert response.status_code == 200, response.text
+    rows = response.text.splitlines()
+    assert len(rows) == 1 and '"2026-01-10' in rows[0]
+
+
+def test_export_compares_mixed_bounds_in_utc(client):
+    response = client.get("/api/v1/export/outages",
+                          params={"from": "2026-01-01T02:00:00+02:00", "to": "2025-12-31T23:00:00"})
+    assert response.status_code == 400